@@ -0,0 +1,170 @@
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from parsing.checkpoint import clear_checkpoint, is_checkpoint_finished
+from parsing.selector_health import SelectorDriftError, format_selector_report, save_selector_report
+
+
+# Наборы данных для сводных таблиц: какие парсеры запускать и куда сохранять общий результат.
+# У каждого парсера свой журнал контрольных точек (CHECKPOINT_FILE в модуле парсера),
+# поэтому парсеры можно запускать параллельно, в том числе из разных наборов.
+DATASETS = {
+    'dog_food': {
+        'output': 'food_for_sausge_dogs_all_markets.xlsx',
+        'name_column': 'Название товара',
+        'jobs': [
+            ('Wildberries', 'parsing.wildberries_market.dry_food_for_sausage_dogs', 'parse_wildberries_dog_food'),
+            ('Ozon', 'parsing.ozon_market.food_dry_for_sausage_dogs', 'parse_ozon_dachshund_dry_food'),
+            ('Yandex_market', 'parsing.yandex_market.dry_food_for_sausage_dogs', 'parse_dog_food')
+        ]
+    },
+    'gas_stoves': {
+        'output': 'Gefest_gas_cookers.xlsx',
+        'name_column': 'Модель',
+        # Сводные таблицы строятся по кодам моделей GEFEST
+        'brand_keywords': ['gefest', 'гефест'],
+        'jobs': [
+            ('Wildberries', 'parsing.wildberries_market.wildberries_gas_stoves_main_2scroll',
+             'parse_wildberries_gas_stoves'),
+            ('Ozon', 'parsing.ozon_market.ozon_gas_stoves_main_search', 'parse_ozon_kitchen_gas_stoves'),
+            ('Yandex_market', 'parsing.yandex_market.gas_cookers_yandex_market_search', 'parse_gas_stoves')
+        ]
+    }
+}
+
+
+def market_journal(module_name):
+    """Журнал контрольных точек парсера (None, если парсер журнал не ведет)"""
+    return getattr(importlib.import_module(module_name), 'CHECKPOINT_FILE', None)
+
+
+def needs_resume(journal):
+    """Возобновлять стоит только журнал без отметки о завершении сбора"""
+    return bool(journal) and not is_checkpoint_finished(journal)
+
+
+def clear_market_journals(dataset_name):
+    """Удаляет журналы парсеров набора, сбор которых завершен, после сохранения общего результата
+
+    Журналы без отметки о завершении остаются, чтобы недособранный маркетплейс можно было продолжить --resume.
+    """
+    for source, module_name, _ in DATASETS[dataset_name]['jobs']:
+        journal = market_journal(module_name)
+        if not journal:
+            continue
+        if is_checkpoint_finished(journal):
+            clear_checkpoint(journal)
+        elif os.path.exists(journal):
+            print(f"💡 {source}: сбор не завершен, журнал {journal} оставлен для --resume")
+
+
+def run_market_job(module_name, function_name, resume=False):
+    """Запуск парсера одного маркетплейса (выполняется в отдельном процессе)"""
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)(resume=resume)
+
+
+def normalize_market_data(records, source, name_column):
+    """Приводит данные маркетплейса к общему виду: название, цена, источник"""
+    df = pd.DataFrame(records)
+    if df.empty or name_column not in df.columns or 'Цена' not in df.columns:
+        return pd.DataFrame(columns=[name_column, 'Цена', 'Источник'])
+
+    df = df[[name_column, 'Цена']].copy()
+    df['Цена'] = pd.to_numeric(df['Цена'], errors='coerce')
+    df = df.dropna(subset=[name_column, 'Цена'])
+    df['Цена'] = df['Цена'].astype(int)
+    df['Источник'] = source
+    return df.drop_duplicates(subset=[name_column, 'Цена'], keep='first')
+
+
+def merge_market_data(market_data, dataset):
+    """Объединяет данные всех маркетплейсов в одну таблицу"""
+    name_column = dataset['name_column']
+    frames = [normalize_market_data(records, source, name_column) for source, records in market_data.items()]
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=[name_column, 'Цена', 'Источник'])
+
+    brand_keywords = dataset.get('brand_keywords')
+    if brand_keywords and not merged.empty:
+        pattern = '|'.join(brand_keywords)
+        merged = merged[merged[name_column].str.lower().str.contains(pattern, regex=True)]
+
+    return merged.reset_index(drop=True)
+
+
+def collect_dataset(dataset_name, resume=False, max_workers=None):
+    """Параллельный сбор набора данных со всех маркетплейсов
+
+    Каждый парсер работает в своем процессе со своим браузером, поэтому общее время
+    примерно равно времени самого медленного маркетплейса. Ошибка одного маркетплейса
+    не останавливает остальные. Маркетплейс, у которого после первой страницы не сработали
+    селекторы, прерывается сразу; итоги прогона по маркетплейсам сохраняются
+    в selector_health_<набор>.json.
+    resume=True возобновляет только парсеры, чей журнал не отмечен как завершенный.
+    """
+    dataset = DATASETS[dataset_name]
+    jobs = dataset['jobs']
+    market_data = {}
+    health = {}
+
+    print(f"🚀 Сбор набора '{dataset_name}': {', '.join(source for source, _, _ in jobs)}")
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        futures = {
+            executor.submit(run_market_job, module_name, function_name,
+                            resume and needs_resume(market_journal(module_name))): source
+            for source, module_name, function_name in jobs
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                market_data[source] = future.result() or []
+                health[source] = {'status': 'ok', 'rows': len(market_data[source])}
+                print(f"✅ {source}: собрано {len(market_data[source])} записей "
+                      f"({time.time() - start_time:.0f} с от начала)")
+            except SelectorDriftError as e:
+                health[source] = e.report
+                print(f"🛑 {source}: сбор прерван после первой страницы "
+                      f"({time.time() - start_time:.0f} с от начала)")
+                print(format_selector_report(e.report))
+            except Exception as e:
+                health[source] = {'status': 'error', 'error': str(e)}
+                print(f"🚨 {source}: парсер завершился с ошибкой: {e}")
+
+    save_selector_report(health, f'selector_health_{dataset_name}.json')
+    merged = merge_market_data(market_data, dataset)
+    print(f"⏱️ Набор '{dataset_name}' собран за {time.time() - start_time:.2f} секунд")
+    return merged
+
+
+def save_dataset(df, filename):
+    """Сохраняет общую таблицу для сводных таблиц"""
+    if df is None or df.empty:
+        print(f"📭 Нет данных для сохранения в {filename}")
+        return None
+
+    df.to_excel(filename, index=False)
+    print(f"💾 Сохранено {len(df)} записей в файл {filename}")
+    print(df.groupby('Источник')['Цена'].agg(['count', 'mean', 'min', 'max']).round(2))
+    return filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dataset', choices=list(DATASETS) + ['all'], default='all',
+                        help='какой набор данных собрать')
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванный сбор с последних контрольных точек журналов')
+    args = parser.parse_args()
+
+    dataset_names = list(DATASETS) if args.dataset == 'all' else [args.dataset]
+    for dataset_name in dataset_names:
+        if save_dataset(collect_dataset(dataset_name, resume=args.resume), DATASETS[dataset_name]['output']):
+            clear_market_journals(dataset_name)
@@ -0,0 +1,92 @@
+class CardContext:
+    """Карточка товара поверх WebElement: текст, атрибуты и дочерние элементы
+    читаются из браузера один раз и переиспользуются всеми этапами обработки
+
+    Поддерживает ту часть интерфейса WebElement, которой пользуются функции извлечения
+    (text, get_attribute, find_element(s), is_displayed); для execute_script нужен
+    исходный элемент - card.element или unwrap_element(card).
+    derived - кэш производных значений (название, полное название и т.п.), см. card_memo.
+    Цена и название догружаются, когда карточка попадает в видимую область, поэтому после
+    scrollIntoView кэш карточки, в которой их не было, нужно сбросить (refresh_card) - иначе
+    останутся пустые значения до прокрутки.
+    """
+
+    def __init__(self, element):
+        self.element = element
+        self.attributes = {}
+        self.children = {}
+        self.derived = {}
+        # Значения из других источников (API, страница товара) - не зависят от DOM и не сбрасываются
+        self.remembered = set()
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.element.text
+        return self._text
+
+    def get_attribute(self, name):
+        if name not in self.attributes:
+            self.attributes[name] = self.element.get_attribute(name)
+        return self.attributes[name]
+
+    def find_elements(self, by, selector):
+        key = (by, selector)
+        if key not in self.children:
+            self.children[key] = [CardContext(child) for child in self.element.find_elements(by, selector)]
+        return self.children[key]
+
+    def find_element(self, by, selector):
+        found = self.find_elements(by, selector)
+        if not found:
+            # Исходный элемент выбросит NoSuchElementException, как и без обертки
+            return CardContext(self.element.find_element(by, selector))
+        return found[0]
+
+    def is_displayed(self):
+        return self.element.is_displayed()
+
+    def memo(self, key, compute):
+        if key not in self.derived:
+            self.derived[key] = compute()
+        return self.derived[key]
+
+    def remember(self, key, value):
+        self.derived[key] = value
+        self.remembered.add(key)
+
+    def refresh(self):
+        """Сбрасывает прочитанные из DOM текст, атрибуты, дочерние элементы и значения, посчитанные по ним"""
+        self._text = None
+        self.attributes = {}
+        self.children = {}
+        self.derived = {key: value for key, value in self.derived.items() if key in self.remembered}
+
+
+def unwrap_element(element):
+    """Исходный WebElement (для передачи в execute_script)"""
+    return element.element if isinstance(element, CardContext) else element
+
+
+def card_memo(element, key, compute):
+    """Производное значение карточки: для CardContext считается один раз, для WebElement - каждый раз"""
+    if isinstance(element, CardContext):
+        return element.memo(key, compute)
+    return compute()
+
+
+def card_remember(element, key, value):
+    """Подставляет производное значение карточки (например, полное название из другого источника)"""
+    if isinstance(element, CardContext):
+        element.remember(key, value)
+
+
+def refresh_card(element, is_loaded=None):
+    """Сброс кэша CardContext после прокрутки к карточке (WebElement и так читается заново)
+
+    is_loaded(card) - проверка по кэшу, что цена и название были в карточке еще до прокрутки;
+    у таких карточек кэш остается.
+    """
+    if isinstance(element, CardContext) and not (is_loaded and is_loaded(element)):
+        element.refresh()
@@ -0,0 +1,172 @@
+import time
+
+
+# Наблюдатель за карточками выдачи. MutationObserver пересчитывает карточки при изменениях DOM
+# и считает "готовыми" только те, у которых уже есть цена; IntersectionObserver следит,
+# видна ли последняя готовая карточка (признак конца списка). Повторная установка
+# с тем же селектором ничего не меняет, с другим - отключает наблюдателей прежней установки.
+CARD_WATCH_JS = """
+var cardSelector = arguments[0];
+var priceSelector = arguments[1];
+var watch = window.__cardWatch;
+if (watch && watch.cardSelector === cardSelector) {
+    return watch.total;
+}
+if (watch) {
+    watch.mutationObserver.disconnect();
+    watch.tailObserver.disconnect();
+}
+
+watch = {
+    cardSelector: cardSelector,
+    priceSelector: priceSelector,
+    marked: new WeakSet(),
+    fresh: 0,
+    total: 0,
+    lastChange: Date.now(),
+    tail: null,
+    tailVisible: false,
+    scheduled: false
+};
+window.__cardWatch = watch;
+
+function hasPrice(card) {
+    if (priceSelector) {
+        var node = card.querySelector(priceSelector);
+        return !!(node && /\\d/.test(node.textContent || ''));
+    }
+    return /\\d[\\d\\s\\u00a0\\u2009]*\\u20bd/.test(card.textContent || '');
+}
+
+var tailObserver = new IntersectionObserver(function (entries) {
+    for (var i = 0; i < entries.length; i++) {
+        if (entries[i].target === watch.tail) {
+            watch.tailVisible = entries[i].isIntersecting;
+        }
+    }
+});
+watch.tailObserver = tailObserver;
+
+function scan() {
+    watch.scheduled = false;
+    var nodes = document.querySelectorAll(cardSelector);
+    var newest = null;
+    for (var i = 0; i < nodes.length; i++) {
+        var card = nodes[i];
+        if (watch.marked.has(card)) {
+            continue;
+        }
+        // Вложенные совпадения дублируют внешнюю карточку
+        if (card.parentElement && card.parentElement.closest(cardSelector)) {
+            continue;
+        }
+        if (!hasPrice(card)) {
+            continue;
+        }
+        watch.marked.add(card);
+        watch.fresh += 1;
+        watch.total += 1;
+        newest = card;
+    }
+    if (newest) {
+        watch.lastChange = Date.now();
+        if (watch.tail) {
+            tailObserver.unobserve(watch.tail);
+        }
+        watch.tail = newest;
+        watch.tailVisible = false;
+        tailObserver.observe(newest);
+    }
+}
+
+watch.mutationObserver = new MutationObserver(function () {
+    if (!watch.scheduled) {
+        watch.scheduled = true;
+        setTimeout(scan, 50);
+    }
+});
+watch.mutationObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+
+scan();
+return watch.total;
+"""
+
+# Ожидание в браузере: K новых готовых карточек, тишина idle мс или max мс.
+# Счетчик новых карточек обнуляется - следующее ожидание считает с нуля.
+CARD_WAIT_JS = """
+var minNew = arguments[0];
+var idleMs = arguments[1];
+var maxMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+
+function check() {
+    var watch = window.__cardWatch;
+    if (!watch) {
+        done(null);
+        return;
+    }
+    var now = Date.now();
+    var idle = now - Math.max(watch.lastChange, start) >= idleMs;
+    if (watch.fresh >= minNew || idle || now - start >= maxMs) {
+        var atBottom = window.innerHeight + window.scrollY >= document.documentElement.scrollHeight - 10;
+        var result = {
+            new: watch.fresh,
+            total: watch.total,
+            idle: idle,
+            ended: idle && watch.fresh === 0 && (atBottom || watch.tailVisible)
+        };
+        watch.fresh = 0;
+        done(result);
+        return;
+    }
+    setTimeout(check, 100);
+}
+
+check();
+"""
+
+# Таймаут execute_async_script по умолчанию в WebDriver, если драйвер не сообщает текущий
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+
+def get_script_timeout(driver):
+    """Текущий таймаут асинхронных скриптов драйвера в секундах"""
+    try:
+        return driver.timeouts.script
+    except Exception:
+        return DEFAULT_SCRIPT_TIMEOUT
+
+
+def install_card_watch(driver, card_selector, price_selector=None):
+    """Устанавливает наблюдатель за карточками; возвращает число готовых карточек на странице"""
+    return driver.execute_script(CARD_WATCH_JS, card_selector, price_selector)
+
+
+def wait_for_new_cards(driver, card_selector, price_selector=None, min_new=8, idle_timeout=1.5, max_wait=10):
+    """Ждет, пока на странице появятся min_new новых карточек с ценой или лента затихнет
+
+    Возвращает словарь: new - новых карточек с прошлого ожидания, total - всего готовых карточек,
+    idle - новые карточки перестали появляться, ended - лента кончилась (тишина, новых нет
+    и последняя карточка видна или страница прокручена до низа), waited - время ожидания в секундах.
+    После перехода на другую страницу наблюдатель устанавливается заново автоматически.
+    Таймаут асинхронных скриптов драйвера на время ожидания увеличивается и затем восстанавливается.
+    """
+    start_time = time.time()
+    previous_timeout = get_script_timeout(driver)
+    driver.set_script_timeout(max_wait + 5)
+
+    state = None
+    try:
+        for _ in range(2):
+            state = driver.execute_async_script(CARD_WAIT_JS, min_new, int(idle_timeout * 1000),
+                                                int(max_wait * 1000))
+            if state is not None:
+                break
+            install_card_watch(driver, card_selector, price_selector)
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+    state = state or {'new': 0, 'total': 0, 'idle': True, 'ended': False}
+    state['waited'] = round(time.time() - start_time, 2)
+    return state
@@ -0,0 +1,200 @@
+import json
+import os
+import time
+
+from parsing.scroll_state import ScrollProgress
+
+
+# Служебная строка журнала с состоянием прокрутки (для --resume), в данные не попадает
+CHECKPOINT_STATE_KEY = '__checkpoint__'
+
+
+def checkpoint_filename(job):
+    """Имя журнала задачи сбора: у каждого парсера свой файл, чтобы они не перетирали друг друга"""
+    return f"temp_{job}.ndjson"
+
+
+class CheckpointWriter:
+    """Журнал контрольных точек: дозапись записей в NDJSON (одна запись - одна строка)
+
+    Файл никогда не перечитывается и не перезаписывается: стоимость сохранения
+    пропорциональна числу новых записей. Буфер сбрасывается на диск (flush + fsync)
+    каждые flush_every записей или flush_interval секунд, а также при close().
+    """
+
+    def __init__(self, filename, flush_every=50, flush_interval=5.0, fsync=True):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.pending = 0
+        self.written = 0
+        self.last_flush = time.monotonic()
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def write(self, records):
+        """Дописывает записи в журнал"""
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.pending += 1
+            self.written += 1
+
+        if self.pending >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Сбрасывает накопленные записи на диск"""
+        if self.file.closed:
+            return
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def append_checkpoint(filename, records, state=None):
+    """Дописывает пакет записей в журнал и сразу сбрасывает его на диск
+
+    state - состояние прокрутки после этого пакета; пишется последней строкой,
+    поэтому пакет без строки состояния при возобновлении считается недописанным.
+    """
+    try:
+        with CheckpointWriter(filename) as writer:
+            writer.write(records)
+            if state is not None:
+                writer.write([{CHECKPOINT_STATE_KEY: state}])
+        print(f"💾 Дописано {len(records)} записей в журнал {filename}")
+        return True
+    except Exception as e:
+        print(f"❌ Ошибка записи в журнал {filename}: {e}")
+        return False
+
+
+def iter_checkpoint(filename):
+    """Строки журнала по порядку; оборванная последняя строка (падение при записи) пропускается"""
+    if not os.path.exists(filename):
+        return
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                print(f"⚠️ Пропущена поврежденная строка {line_number} в журнале {filename}")
+
+
+def is_checkpoint_state(entry):
+    return isinstance(entry, dict) and CHECKPOINT_STATE_KEY in entry
+
+
+def read_checkpoint(filename):
+    """Читает все записи журнала без служебных строк состояния"""
+    return [entry for entry in iter_checkpoint(filename) if not is_checkpoint_state(entry)]
+
+
+def load_checkpoint(filename):
+    """Записи и последнее сохраненное состояние прокрутки для возобновления
+
+    Возвращаются только записи до последней строки состояния: все они уже учтены
+    в сохраненных seen_ids, а хвост недописанного пакета будет собран заново.
+    Строки состояния хранят только новые seen_ids, поэтому в возвращаемом состоянии
+    seen_ids - объединение всех строк до последней.
+    """
+    records = []
+    committed = []
+    seen_ids = set()
+    state = None
+
+    for entry in iter_checkpoint(filename):
+        if is_checkpoint_state(entry):
+            state = entry[CHECKPOINT_STATE_KEY]
+            seen_ids.update(state.get('seen_ids') or [])
+            committed = list(records)
+        else:
+            records.append(entry)
+
+    if state is None:
+        return records, None
+
+    state = dict(state, seen_ids=sorted(seen_ids))
+
+    if len(records) > len(committed):
+        print(f"⚠️ В журнале {filename} {len(records) - len(committed)} записей без состояния, будут собраны заново")
+    return committed, state
+
+
+def finish_checkpoint(filename, job=None):
+    """Дописывает отметку о завершении сбора: такой журнал больше не возобновляется"""
+    with CheckpointWriter(filename) as writer:
+        writer.write([{CHECKPOINT_STATE_KEY: {'job': job, 'finished': True}}])
+    print(f"🏁 Сбор завершен, отметка записана в журнал {filename}")
+
+
+def is_checkpoint_finished(filename):
+    """Последняя строка состояния журнала - отметка о завершении сбора"""
+    state = None
+    for entry in iter_checkpoint(filename):
+        if is_checkpoint_state(entry):
+            state = entry[CHECKPOINT_STATE_KEY]
+    return bool(state and state.get('finished'))
+
+
+def clear_checkpoint(filename):
+    """Удаляет журнал"""
+    if os.path.exists(filename):
+        os.remove(filename)
+        print(f"🗑️ Журнал {filename} очищен")
+
+
+def rewrite_checkpoint(filename, records, state):
+    """Атомарно перезаписывает журнал: записи и одна строка состояния"""
+    temp_filename = f"{filename}.tmp"
+    with CheckpointWriter(temp_filename) as writer:
+        writer.write(records)
+        writer.write([{CHECKPOINT_STATE_KEY: state}])
+    os.replace(temp_filename, filename)
+
+
+def resume_checkpoint(filename, job=None):
+    """Записи и ScrollProgress из журнала для режима --resume
+
+    job - задача сбора; журнал, записанный другой задачей, не используется.
+    Если состояния в журнале нет, задача не совпала или сбор по журналу уже завершен (finish_checkpoint),
+    возвращает ([], None) - сбор начинается заново.
+    """
+    records, state = load_checkpoint(filename)
+    if state is None:
+        print(f"⚠️ В журнале {filename} нет сохраненного состояния, начинаем сбор заново")
+        return [], None
+
+    if job is not None and state.get('job') != job:
+        print(f"⚠️ Журнал {filename} записан другой задачей ({state.get('job')}), а не {job}, "
+              f"начинаем сбор заново")
+        return [], None
+
+    if state.get('finished'):
+        print(f"⚠️ Сбор по журналу {filename} уже завершен, начинаем сбор заново")
+        return [], None
+
+    # Отбрасываем недописанный хвост, чтобы он не попал в итоговые данные дважды
+    rewrite_checkpoint(filename, records, state)
+
+    progress = ScrollProgress.from_state(state)
+    print(f"♻️ Возобновляем сбор: {len(records)} записей, {len(progress.seen_ids)} товаров, "
+          f"{progress.scroll_count} прокруток")
+    return records, progress
@@ -0,0 +1,137 @@
+import threading
+from contextlib import contextmanager
+
+
+class PooledDriver:
+    """Драйвер из пула: все вызовы передаются исходному драйверу, загрузки страниц (get) считаются"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def get(self, url):
+        self.pages += 1
+        return self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class DriverPool:
+    """Пул "прогретых" драйверов Chrome, общий для нескольких запусков парсеров
+
+    factory - функция создания драйвера (setup_driver парсера, со stealth и прочими настройками),
+    size - сколько драйверов держать одновременно,
+    max_pages - после стольких загрузок страниц драйвер пересоздается,
+    reset_between_jobs - по умолчанию закрывать лишние вкладки и удалять cookies при возврате в пул.
+    Перед выдачей драйвер проверяется; неживой драйвер заменяется новым.
+    """
+
+    def __init__(self, factory, size=2, max_pages=200, reset_between_jobs=True):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.reset_between_jobs = reset_between_jobs
+        self.idle = []
+        self.busy = set()
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def create_driver(self):
+        print("🚗 Запускаем новый драйвер для пула...")
+        return PooledDriver(self.factory())
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def quit_driver(self, driver):
+        try:
+            driver.driver.quit()
+        except Exception:
+            pass
+
+    def reset_driver(self, driver):
+        """Закрывает все вкладки кроме одной и очищает cookies"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.driver.get('about:blank')
+        except Exception as e:
+            print(f"⚠️ Ошибка сброса драйвера: {e}")
+
+    def acquire(self, timeout=None):
+        """Выдает исправный драйвер; если все заняты - ждет освобождения"""
+        with self.condition:
+            while not self.idle and len(self.busy) >= self.size:
+                if not self.condition.wait(timeout):
+                    raise TimeoutError("Нет свободных драйверов в пуле")
+
+            driver = self.idle.pop() if self.idle else None
+            if driver is not None and (driver.pages >= self.max_pages or not self.is_healthy(driver)):
+                print(f"♻️ Пересоздаем драйвер (загружено страниц: {driver.pages})")
+                self.quit_driver(driver)
+                driver = None
+
+            if driver is None:
+                driver = self.create_driver()
+
+            self.busy.add(driver)
+            return driver
+
+    def release(self, driver, reset=None):
+        """Возвращает драйвер в пул"""
+        if reset is None:
+            reset = self.reset_between_jobs
+        if reset:
+            self.reset_driver(driver)
+
+        with self.condition:
+            self.busy.discard(driver)
+            if self.closed:
+                self.quit_driver(driver)
+            else:
+                self.idle.append(driver)
+            self.condition.notify()
+
+    @contextmanager
+    def driver(self, reset=None):
+        """with pool.driver() as driver: ... - драйвер возвращается в пул даже при ошибке"""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver, reset)
+
+    def close(self):
+        """Завершает все свободные драйверы; занятые будут завершены при возврате"""
+        with self.condition:
+            self.closed = True
+            for driver in self.idle:
+                self.quit_driver(driver)
+            self.idle.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def acquire_driver(factory, pool=None):
+    """Драйвер из пула, а без пула - новый драйвер"""
+    return pool.acquire() if pool else factory()
+
+
+def release_driver(driver, pool=None):
+    """Возвращает драйвер в пул, а без пула - завершает его"""
+    if pool:
+        pool.release(driver)
+    else:
+        driver.quit()
@@ -0,0 +1,119 @@
+import os
+import re
+import sys
+import time
+
+import lxml.html
+
+
+def take_page_snapshot(driver):
+    """Снимок текущей страницы одним запросом к драйверу"""
+    return driver.page_source
+
+
+def save_page_snapshot(driver, filename):
+    """Сохраняет HTML страницы в файл (для отладки и проверки парсеров без браузера)"""
+    try:
+        html = take_page_snapshot(driver)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"📸 Снимок страницы сохранен: {filename}")
+        return html
+    except Exception as e:
+        print(f"❌ Ошибка сохранения снимка страницы: {e}")
+        return None
+
+
+def load_snapshot(filename):
+    """Загружает сохраненный HTML снимок"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_html(html):
+    """Разбор HTML в дерево lxml"""
+    return lxml.html.fromstring(html or '<html></html>')
+
+
+def node_text(node):
+    """Текст узла построчно, примерно как element.text в Selenium"""
+    if node is None:
+        return ''
+    lines = [part.strip() for part in node.itertext()]
+    return '\n'.join(line for line in lines if line)
+
+
+def first_text(node, selectors):
+    """Текст первого непустого узла по списку CSS селекторов"""
+    for selector in selectors:
+        try:
+            for found in node.cssselect(selector):
+                text = re.sub(r'\s+', ' ', found.text_content()).strip()
+                if text:
+                    return text
+        except Exception:
+            continue
+    return None
+
+
+def first_attr(node, selectors, attribute):
+    """Значение атрибута первого узла по списку CSS селекторов"""
+    for selector in selectors:
+        try:
+            for found in node.cssselect(selector):
+                value = found.get(attribute)
+                if value:
+                    return value
+        except Exception:
+            continue
+    return None
+
+
+def outermost(nodes):
+    """Оставляет только внешние узлы, отбрасывая вложенные друг в друга"""
+    node_set = set(nodes)
+    result = []
+    for node in nodes:
+        parent = node.getparent()
+        nested = False
+        while parent is not None:
+            if parent in node_set:
+                nested = True
+                break
+            parent = parent.getparent()
+        if not nested:
+            result.append(node)
+    return result
+
+
+def benchmark_snapshot(parser, filename, repeat=10):
+    """Замер времени разбора сохраненного снимка без браузера"""
+    html = load_snapshot(filename)
+    start_time = time.perf_counter()
+    items = []
+    for _ in range(repeat):
+        items = parser(html)
+    elapsed = (time.perf_counter() - start_time) / repeat
+    print(f"⏱️ {os.path.basename(filename)}: {len(items)} товаров, {elapsed * 1000:.1f} мс на разбор")
+    return items
+
+
+if __name__ == "__main__":
+    # Пример: python -m parsing.html_snapshot wildberries snapshot.html
+    from parsing.wildberries_market.wildberries_cards import parse_wildberries_cards_html
+    from parsing.ozon_market.ozon_tiles import parse_ozon_tiles_html
+    from parsing.yandex_market.yandex_snippets import parse_yandex_snippets_html
+
+    parsers = {
+        'wildberries': parse_wildberries_cards_html,
+        'ozon': parse_ozon_tiles_html,
+        'yandex': parse_yandex_snippets_html
+    }
+
+    if len(sys.argv) < 3 or sys.argv[1] not in parsers:
+        print(f"Использование: python -m parsing.html_snapshot {{{'|'.join(parsers)}}} файл.html [...]")
+        sys.exit(1)
+
+    for snapshot_file in sys.argv[2:]:
+        for item in benchmark_snapshot(parsers[sys.argv[1]], snapshot_file)[:5]:
+            print(f"   • {item}")
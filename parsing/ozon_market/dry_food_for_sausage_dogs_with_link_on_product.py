@@ -9,10 +9,33 @@ import time
 import re
 import random
 import os
-
-
-def setup_driver():
-    """Настройка драйвера"""
+import argparse
+
+from parsing.ozon_market.ozon_tiles import (OZON_HEALTH_FIELDS, OZON_TILE_SELECTORS, extract_ozon_tiles_snapshot,
+                                           find_ozon_tiles)
+from parsing.ozon_market.ozon_widget_state import extract_ozon_tiles_state
+from parsing.ozon_market.ozon_facets import resolve_ozon_facet_url
+from parsing.scroll_state import ScrollProgress, restore_scroll_depth
+from parsing.driver_pool import acquire_driver, release_driver
+from parsing.resource_policy import apply_resource_options, apply_resource_policy
+from parsing.rate_control import get_rate_controller
+from parsing.selector_health import SelectorDriftError, SelectorHealthCheck
+from parsing.checkpoint import (
+    append_checkpoint, clear_checkpoint, resume_checkpoint, finish_checkpoint, checkpoint_filename
+)
+
+# Фильтры категории (см. OZON_FACET_INTENTS)
+FACET_INTENTS = ['dry_food', 'dachshund']
+# Задача сбора: по ней называется журнал контрольных точек и сверяется --resume
+CHECKPOINT_JOB = 'ozon_dog_food_links'
+CHECKPOINT_FILE = checkpoint_filename(CHECKPOINT_JOB)
+
+
+def setup_driver(resource_policy='ozon'):
+    """Настройка драйвера
+
+    resource_policy - какие ресурсы не загружать (см. parsing.resource_policy; None - загружать все)
+    """
     options = Options()
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
@@ -25,7 +48,14 @@ def setup_driver():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
 
+    # Журнал производительности: по нему темп запросов замечает ответы HTTP 429
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Картинки, шрифты, видео и счетчики карточкам не нужны
+    apply_resource_options(options, resource_policy)
+
     driver = webdriver.Chrome(options=options)
+    apply_resource_policy(driver, resource_policy)
 
     stealth(driver,
             languages=["ru-RU", "ru"],
@@ -41,10 +71,6 @@ def setup_driver():
     return driver
 
 
-def human_like_delay(min_seconds=1, max_seconds=3):
-    time.sleep(random.uniform(min_seconds, max_seconds))
-
-
 def wait_for_page_load(driver, timeout=10):
     """Ожидание загрузки страницы"""
     WebDriverWait(driver, timeout).until(
@@ -52,45 +78,84 @@ def wait_for_page_load(driver, timeout=10):
     )
 
 
-def scroll_all(driver, max_scrolls=20, scroll_delay_min=2, scroll_delay_max=4):
+def scroll_all(driver, max_scrolls=20, extraction_mode='state', progress=None, products_data=None):
     """
     Полная прокрутка страницы до конца с обнаружением новых товаров
+
+    extraction_mode='state' - данные плиток из встроенного JSON виджетов (догруженные плитки - как 'snapshot'),
+    extraction_mode='snapshot' - разбор одного снимка page_source через lxml,
+    extraction_mode='elements' - старый режим с обходом каждого элемента
+
+    progress и products_data передаются при возобновлении сбора из журнала;
+    паузы между прокрутками задает контроллер темпа Ozon
     """
     print("📜 Начинаем полную прокрутку страницы...")
+    pacer = get_rate_controller('ozon')
+
+    products_data = list(products_data or [])
+    # Уже обработанные товары (по SKU) - на каждой прокрутке берем только новые
+    progress = progress or ScrollProgress(job=CHECKPOINT_JOB)
+    progress.url = driver.current_url
+
+    # При возобновлении подгружаем ленту до места остановки
+    restore_scroll_depth(driver, progress.scroll_count)
+
+    # После первой страницы нового сбора сверяем селекторы с базовыми значениями
+    health = None if progress.scroll_count else SelectorHealthCheck('ozon', OZON_TILE_SELECTORS, OZON_HEALTH_FIELDS)
 
     last_height = driver.execute_script("return document.body.scrollHeight")
-    scroll_attempts = 0
+    scroll_attempts = progress.scroll_count
     no_new_content_count = 0
     max_no_new_content = 3  # Максимум попыток без нового контента
 
-    all_products_count = 0
-    products_data = []
-
     while scroll_attempts < max_scrolls and no_new_content_count < max_no_new_content:
         # Прокручиваем вниз
         scroll_height = random.randint(800, 1200)
         driver.execute_script(f"window.scrollBy(0, {scroll_height});")
 
-        human_like_delay(scroll_delay_min, scroll_delay_max)
+        pacer.pace('scroll')
         scroll_attempts += 1
+        progress.scroll_count = scroll_attempts
 
         # Проверяем высоту страницы
         new_height = driver.execute_script("return document.body.scrollHeight")
 
-        # Ищем товары после каждой прокрутки
-        current_products = find_dachshund_dry_food(driver)
-        current_count = len(current_products)
+        # Собираем данные с товаров
+        if extraction_mode in ('state', 'snapshot'):
+            new_data = extract_products_data_snapshot(driver, len(products_data), progress,
+                                                      from_state=extraction_mode == 'state')
+            print(f"📊 После прокрутки {scroll_attempts}: извлечено {len(new_data)} новых товаров")
+        else:
+            # Ищем товары после каждой прокрутки
+            current_products, current_skus = find_dachshund_dry_food(driver)
+            current_count = len(current_products)
+
+            # Отбрасываем товары, обработанные на прошлых прокрутках
+            new_products = []
+            for product, sku in zip(current_products, current_skus):
+                if not progress.is_seen(sku):
+                    progress.mark_seen(sku)
+                    new_products.append(product)
+            current_products = new_products
+
+            print(f"📊 После прокрутки {scroll_attempts}: найдено {current_count} товаров, новых {len(current_products)}")
 
-        print(f"📊 После прокрутки {scroll_attempts}: найдено {current_count} товаров")
+            new_data = []
+            if current_products:
+                new_data = extract_products_data(driver, current_products, len(products_data))
 
-        # Собираем данные с новых товаров
-        if current_products:
-            new_data = extract_products_data(driver, current_products, all_products_count)
-            if new_data:
-                products_data.extend(new_data)
-                # Немедленное сохранение во временный файл
-                save_temp_data(products_data, 'temp_ozon_data.xlsx')
-                print(f"💾 Сразу сохранено {len(new_data)} новых товаров")
+        if new_data:
+            products_data.extend(new_data)
+            # Немедленное сохранение во временный файл
+            save_temp_data(new_data, CHECKPOINT_FILE, progress)
+            print(f"💾 Сразу сохранено {len(new_data)} новых товаров")
+
+        # Первая страница без товаров - разметка изменилась, дальше не крутим
+        if health and health.due(scroll_attempts):
+            health.check(driver, len(products_data))
+
+        # Капча, HTTP 429 или пустая выдача - замедляемся, иначе ускоряемся
+        pacer.check(driver, empty_listing=not progress.seen_ids)
 
         # Проверяем, появился ли новый контент
         if new_height == last_height:
@@ -100,9 +165,6 @@ def scroll_all(driver, max_scrolls=20, scroll_delay_min=2, scroll_delay_max=4):
             no_new_content_count = 0
             last_height = new_height
 
-        # Случайная пауза между прокрутками
-        human_like_delay(1, 2)
-
         # Пытаемся найти кнопку "Показать еще" или пагинацию
         try:
             load_more_buttons = [
@@ -120,7 +182,7 @@ def scroll_all(driver, max_scrolls=20, scroll_delay_min=2, scroll_delay_max=4):
                     if button.is_displayed():
                         driver.execute_script("arguments[0].click();", button)
                         print("🔘 Нажата кнопка 'Показать еще'")
-                        human_like_delay(3, 5)
+                        pacer.pace('click')
                         break
                 except:
                     continue
@@ -199,9 +261,30 @@ def extract_product_url(element, driver):
         return None
 
 
+def is_dry_dog_food(name):
+    """Проверка что это сухой корм для собак"""
+    name_lower = name.lower()
+    return (
+            any(word in name_lower for word in ['корм', 'food', 'питание']) and
+            any(word in name_lower for word in ['собак', 'dog', 'для взрослых собак', 'для щенков']) and
+            not any(word in name_lower for word in ['консерв', 'влажн', 'паштет', 'желе', 'пауч'])
+    )
+
+
+def build_product_record(name, price, url=None):
+    """Формирование записи о товаре"""
+    return {
+        'Название товара': name,
+        'Цена': price,
+        'Ссылка на товар': url if url else 'Не найдена',
+        'Источник': 'Ozon'
+    }
+
+
 def extract_products_data(driver, products, existing_count=0):
     """Извлечение данных из списка товаров"""
     products_data = []
+    pacer = get_rate_controller('ozon')
 
     for i, product in enumerate(products, existing_count + 1):
         try:
@@ -209,7 +292,7 @@ def extract_products_data(driver, products, existing_count=0):
 
             # Прокручиваем к товару
             driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", product)
-            human_like_delay(1, 2)
+            pacer.pace('card')
 
             # Извлекаем информацию
             name = extract_product_name(product)
@@ -221,22 +304,8 @@ def extract_products_data(driver, products, existing_count=0):
             print(f"🔗 Ссылка: {url if url else 'Не найдена'}")
 
             if name and price:
-                # Проверка что это сухой корм для собак (не строгая фильтрация по породе)
-                name_lower = name.lower()
-                is_dog_food = (
-                        any(word in name_lower for word in ['корм', 'food', 'питание']) and
-                        any(word in name_lower for word in ['собак', 'dog', 'для взрослых собак', 'для щенков']) and
-                        not any(word in name_lower for word in ['консерв', 'влажн', 'паштет', 'желе', 'пауч'])
-                )
-
-                if is_dog_food:
-                    product_data = {
-                        'Название товара': name,
-                        'Цена': price,
-                        'Ссылка на товар': url if url else 'Не найдена',
-                        'Источник': 'Ozon'
-                    }
-                    products_data.append(product_data)
+                if is_dry_dog_food(name):
+                    products_data.append(build_product_record(name, price, url))
                     print(f"✅ Добавлен корм для собак: {name[:80]}... - {price} руб.")
                 else:
                     print(f"❌ Пропущено (не сухой корм для собак): {name[:60]}...")
@@ -250,19 +319,42 @@ def extract_products_data(driver, products, existing_count=0):
     return products_data
 
 
-def save_temp_data(data, filename):
-    """Сохранение временных данных"""
+def extract_products_data_snapshot(driver, existing_count=0, progress=None, from_state=True):
+    """Извлечение данных всех плиток из одного снимка page_source (без обращений к элементам)
+
+    from_state=True - сначала из встроенного JSON виджетов выдачи, False - только разбор узлов плиток
+    """
+    products_data = []
+    extract_tiles = extract_ozon_tiles_state if from_state else extract_ozon_tiles_snapshot
+    tiles = extract_tiles(driver, min_price=100, max_price=100000, progress=progress)
+
+    for i, tile in enumerate(tiles, existing_count + 1):
+        name = tile['name']
+        price = tile['price']
+
+        if name and price:
+            if is_dry_dog_food(name):
+                products_data.append(build_product_record(name, price, tile['url']))
+                print(f"✅ Добавлен корм для собак: {name[:80]}... - {price} руб.")
+            else:
+                print(f"❌ Пропущено (не сухой корм для собак): {name[:60]}...")
+        else:
+            print(f"❌ [{i}] Неполные данные для SKU {tile['sku']}")
+
+    return products_data
+
+
+def save_temp_data(data, filename, progress=None):
+    """Дозапись новых данных и состояния прокрутки в журнал контрольных точек (NDJSON)"""
     if data:
-        try:
-            df = pd.DataFrame(data)
-            # Сохраняем все данные без удаления дубликатов
-            df.to_excel(filename, index=False)
-        except Exception as e:
-            print(f"⚠️ Ошибка сохранения временных данных: {e}")
+        append_checkpoint(filename, data, progress.to_state() if progress else None)
 
 
 def find_dachshund_dry_food(driver):
-    """Поиск сухого корма для собак с улучшенной логикой"""
+    """Поиск сухого корма для собак с улучшенной логикой
+
+    Возвращает плитки и их SKU
+    """
     print("🔍 Ищем сухой корм для собак...")
 
     # Ждем загрузки товаров
@@ -274,56 +366,15 @@ def find_dachshund_dry_food(driver):
     except:
         print("⏳ Товары загружаются медленно...")
 
-    # Более специфичные селекторы для Ozon
-    selectors = [
-        "div[class*='tile-root']",
-        "article[class*='tile-root']",
-        "div[class*='widget-search-result'] div[class*='tile']",
-        "div[class*='search-result'] div[class*='tile']",
-        "div[class*='tile']",
-        "article[class*='tile']",
-        "div[class*='card']",
-        "div[class*='item']"
-    ]
-
-    products = []
-
-    for selector in selectors:
-        try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elements:
-                print(f"Найдено элементов с селектором {selector}: {len(elements)}")
-
-            for element in elements:
-                try:
-                    text = element.text.lower()
-                    if len(text) > 20:  # Минимальная длина текста
-                        # Признаки корма для собак
-                        is_dog_food = (
-                                any(word in text for word in ['корм', 'собак', 'dog', 'для собак']) and
-                                not any(word in text for word in [
-                                    'консерв', 'влажн', 'паштет', 'желе', 'пауч', 'кошк', 'cat', 'кот'
-                                ])
-                        )
-
-                        if is_dog_food:
-                            # Проверяем, нет ли уже этого элемента
-                            element_id = element.id
-                            if not any(p.id == element_id for p in products):
-                                products.append(element)
-                                print(f"Найден корм для собак: {text[:100]}...")
-                except:
-                    continue
-
-            if products:
-                print(f"✅ Найдено кормов для собак: {len(products)}")
-                break
-
-        except Exception as e:
-            print(f"Ошибка при поиске по селектору {selector}: {e}")
-            continue
-
-    return products
+    # Один вызов JavaScript: внешняя плитка на каждую ссылку на товар, фильтр по словам в браузере
+    products, skus = find_ozon_tiles(
+        driver,
+        include_words=['корм', 'собак', 'dog', 'для собак'],
+        exclude_words=['консерв', 'влажн', 'паштет', 'желе', 'пауч', 'кошк', 'cat', 'кот'],
+        min_text_length=20
+    )
+    print(f"✅ Найдено кормов для собак: {len(products)}")
+    return products, skus
 
 
 def extract_accurate_price(element, driver):
@@ -510,68 +561,59 @@ def extract_product_name(element):
         return "Неизвестный товар"
 
 
-def apply_category_filters(driver):
-    """Применение фильтров на странице категории"""
-    try:
-        # Ждем загрузки фильтров
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='filter'], aside[class*='filter']"))
-        )
-
-        # Фильтр по типу корма - пытаемся найти и выбрать "Сухой"
-        filter_selectors = [
-            "label:contains('Сухой')",
-            "span:contains('Сухой')",
-            "div:contains('Сухой')",
-            "a[href*='dry']",
-            "input[value*='сух']"
-        ]
-
-        for selector in filter_selectors:
-            try:
-                # Используем XPath для поиска по тексту
-                filter_element = driver.find_element(By.XPATH, f"//*[contains(text(), 'Сухой')]")
-                if filter_element.is_displayed():
-                    driver.execute_script("arguments[0].click();", filter_element)
-                    print("✅ Применен фильтр 'Сухой'")
-                    human_like_delay(3, 5)
-                    break
-            except:
-                continue
+def parse_ozon_dachshund_dry_food(resume=False, pool=None):
+    """Парсинг сухого корма для такс
 
-    except Exception as e:
-        print(f"⚠️ Фильтры не применены: {e}")
+    resume=True - продолжить прерванный сбор с последней контрольной точки журнала
+    pool - пул драйверов (DriverPool); без него создается и закрывается свой драйвер
+    """
+    driver = acquire_driver(setup_driver, pool)
+    pacer = get_rate_controller('ozon')
+    temp_filename = CHECKPOINT_FILE
 
+    resumed_data, progress = resume_checkpoint(temp_filename, job=CHECKPOINT_JOB) if resume else ([], None)
+    if progress is None:
+        # Журнал пополняется по мере прокрутки, поэтому начинаем с пустого
+        clear_checkpoint(temp_filename)
 
-def parse_ozon_dachshund_dry_food():
-    """Парсинг сухого корма для такс"""
-    driver = setup_driver()
     all_data = []
 
     try:
         # URL категории сухих кормов для собак с поиском для такс
         url = "https://www.ozon.ru/category/suhie-korma-dlya-sobak-12303/?category_was_predicted=true&deny_category_prediction=true&from_global=true&text=%D1%81%D1%83%D1%85%D0%BE%D0%B9+%D0%BA%D0%BE%D1%80%D0%BC+%D0%B4%D0%BB%D1%8F+%D1%82%D0%B0%D0%BA%D1%81%D1%8B"
 
+        # При возобновлении открываем ту страницу (с фильтрами), с которой шел сбор
+        if progress and progress.url:
+            url = progress.url
+        else:
+            # Фильтры категории - параметрами адреса, без кликов по панели фильтров
+            url = resolve_ozon_facet_url(url, FACET_INTENTS, driver=driver)
+
         print(f"\n🌐 Используем URL категории сухих кормов для собак: {url}")
         driver.get(url)
         wait_for_page_load(driver)
-        human_like_delay(5, 8)
-
-        # Пытаемся применить фильтры
-        apply_category_filters(driver)
+        pacer.pace('page')
 
         # Используем улучшенную функцию полной прокрутки
-        all_data = scroll_all(driver, max_scrolls=15, scroll_delay_min=2, scroll_delay_max=4)
+        all_data = scroll_all(driver, max_scrolls=15, progress=progress, products_data=resumed_data)
+        # Прокрутка дошла до конца - журнал не нужно возобновлять
+        finish_checkpoint(temp_filename, CHECKPOINT_JOB)
 
         print(f"\n📊 Полная прокрутка завершена. Всего собрано: {len(all_data)} кормов для собак")
 
+    except SelectorDriftError:
+        # Сбор прерывается целиком: отчет о селекторах уже напечатан и уходит вызывающему коду
+        driver.save_screenshot('ozon_error.png')
+        raise
     except Exception as e:
         print(f"🚨 Критическая ошибка: {e}")
+        print(f"💡 Собранное сохранено в {temp_filename}, продолжить сбор: --resume")
         import traceback
         traceback.print_exc()
         driver.save_screenshot('ozon_error.png')
     finally:
-        driver.quit()
+        pacer.report()
+        release_driver(driver, pool)
 
     return all_data
 
@@ -624,8 +666,8 @@ def save_to_excel(data, filename='ozon_dachshund_dry_food_with_link_on_product.x
         print(f"💾 Сохранено {len(df_clean)} кормов для собак (без дубликатов) в файл {filename}")
 
         # Удаляем временный файл если он существует
-        if os.path.exists('temp_ozon_data.xlsx'):
-            os.remove('temp_ozon_data.xlsx')
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
             print("🗑️ Временный файл удален")
 
         # Выводим результаты (только очищенные данные)
@@ -658,13 +700,18 @@ def save_to_excel(data, filename='ozon_dachshund_dry_food_with_link_on_product.x
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванный сбор с последней контрольной точки журнала')
+    args = parser.parse_args()
+
     print("🚀 Запускаем парсинг сухого корма для такс с Ozon...")
     print("⏳ Используем категорию сухих кормов для собак...")
     print("=" * 80)
 
     start_time = time.time()
 
-    dog_food_data = parse_ozon_dachshund_dry_food()
+    dog_food_data = parse_ozon_dachshund_dry_food(resume=args.resume)
 
     end_time = time.time()
     execution_time = end_time - start_time
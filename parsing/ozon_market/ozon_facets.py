@@ -0,0 +1,134 @@
+import json
+import time
+from urllib.parse import urljoin
+
+from parsing.html_snapshot import parse_html
+
+
+# Наши намерения -> подписи значений фильтра Ozon, которые им соответствуют.
+# Среди подходящих берется самая короткая подпись ("Газовые", а не "Газовые варочные панели").
+OZON_FACET_INTENTS = {
+    'gas': ['газовая', 'газовые'],
+    'dry_food': ['сухой', 'сухие'],
+    'dachshund': ['такса', 'таксы']
+}
+
+OZON_FACET_CACHE_FILE = 'ozon_facets_cache.json'
+OZON_FACET_CACHE_TTL = 14 * 24 * 3600
+
+# Подпись и ссылка значения фильтра в JSON виджетов (названия полей у разных виджетов разные)
+FACET_TEXT_KEYS = ('value', 'title', 'text', 'name')
+FACET_LINK_KEYS = ('link', 'url', 'href')
+
+
+def load_facet_cache(filename=OZON_FACET_CACHE_FILE):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_facet_cache(cache, filename=OZON_FACET_CACHE_FILE):
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ Не удалось сохранить кэш фильтров: {e}")
+
+
+def facet_cache_key(url, intents):
+    return f"{url}|{','.join(intents)}"
+
+
+def iter_facet_values(data):
+    """Пары (подпись, ссылка) из JSON панели фильтров, на любой глубине"""
+    if isinstance(data, dict):
+        text = next((data[key] for key in FACET_TEXT_KEYS if isinstance(data.get(key), str)), None)
+        link = next((data[key] for key in FACET_LINK_KEYS if isinstance(data.get(key), str)), None)
+        if link is None and isinstance(data.get('action'), dict):
+            link = data['action'].get('link')
+        if text and link:
+            yield text.strip(), link
+        for value in data.values():
+            yield from iter_facet_values(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from iter_facet_values(value)
+
+
+def find_ozon_facet_values(tree):
+    """Значения фильтров страницы: из data-state виджетов фильтров, а без них - ссылки боковой панели"""
+    values = []
+    for node in tree.xpath('//*[@data-state][starts-with(@id, "state-")]'):
+        if 'filter' not in node.get('id').lower():
+            continue
+        try:
+            values.extend(iter_facet_values(json.loads(node.get('data-state'))))
+        except (TypeError, ValueError):
+            continue
+
+    if not values:
+        for link in tree.cssselect('aside a[href], [data-widget*="filter"] a[href]'):
+            text = link.text_content().strip()
+            if text:
+                values.append((text, link.get('href')))
+    return values
+
+
+def match_facet(values, words):
+    """Ссылка значения фильтра с самой короткой подходящей подписью"""
+    matches = [(text, link) for text, link in values if any(word in text.lower() for word in words)]
+    if not matches:
+        return None
+    return min(matches, key=lambda match: len(match[0]))[1]
+
+
+def resolve_ozon_facet_url(url, intents, driver=None, factory=None, cache_file=OZON_FACET_CACHE_FILE,
+                           ttl=OZON_FACET_CACHE_TTL):
+    """Адрес категории с фильтрами intents в параметрах (вместо кликов по панели фильтров)
+
+    Адрес берется из кэша; при промахе страница категории открывается один раз (в driver,
+    а без него - в драйвере из factory), ссылки значений фильтров читаются из JSON виджетов,
+    результат сохраняется в кэш. Ненайденные фильтры пропускаются - их отсеют ключевые слова;
+    такой неполный адрес в кэш не попадает, и на следующем запуске фильтры ищутся заново
+    (иначе одна неудачная загрузка - капча, медленная панель фильтров - закрепилась бы на весь ttl).
+    """
+    cache = load_facet_cache(cache_file)
+    key = facet_cache_key(url, intents)
+    entry = cache.get(key)
+    if entry and time.time() - entry['resolved_at'] < ttl:
+        print(f"📌 Фильтры {', '.join(intents)} из кэша: {entry['url']}")
+        return entry['url']
+
+    own_driver = driver is None
+    if own_driver:
+        if factory is None:
+            return url
+        driver = factory()
+
+    resolved_url = url
+    unresolved = []
+    try:
+        for intent in intents:
+            driver.get(resolved_url)
+            link = match_facet(find_ozon_facet_values(parse_html(driver.page_source)), OZON_FACET_INTENTS[intent])
+            if not link:
+                print(f"⚠️ Фильтр '{intent}' не найден на странице категории")
+                unresolved.append(intent)
+                continue
+            resolved_url = urljoin('https://www.ozon.ru', link)
+            print(f"✅ Фильтр '{intent}' переведен в адрес: {resolved_url}")
+    except Exception as e:
+        print(f"⚠️ Ошибка определения фильтров: {e}")
+        return resolved_url
+    finally:
+        if own_driver:
+            driver.quit()
+
+    if unresolved:
+        print(f"⚠️ Адрес без фильтров {', '.join(unresolved)} не кэшируется")
+    elif resolved_url != url:
+        cache[key] = {'url': resolved_url, 'resolved_at': time.time()}
+        save_facet_cache(cache, cache_file)
+    return resolved_url
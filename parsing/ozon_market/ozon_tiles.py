@@ -0,0 +1,278 @@
+import re
+
+from parsing.html_snapshot import parse_html, first_text, node_text, outermost
+
+
+OZON_TILE_SELECTORS = [
+    "div[class*='tile-root']",
+    "article[class*='tile-root']",
+    "div[class*='widget-search-result'] div[class*='tile']",
+    "div[class*='search-result'] div[class*='tile']"
+]
+
+OZON_TITLE_SELECTORS = [
+    "a[class*='tile-title'] span",
+    "span[class*='tsBody500Medium']",
+    "a[class*='title']",
+    "span[class*='title']",
+    "div[class*='title']",
+    "h3", "h4", "h5",
+    "a[class*='name']",
+    "span[class*='name']"
+]
+
+OZON_PRICE_SELECTORS = [
+    "span[class*='tsHeadline500Large']",
+    "span[class*='price']",
+    "div[class*='price']",
+    "span[class*='tsHeadline']",
+    "[class*='tile-price']",
+    "[data-testid*='price']"
+]
+
+# Списки селекторов, которые проверяются после первой страницы (см. selector_health)
+OZON_HEALTH_FIELDS = {
+    'title': OZON_TITLE_SELECTORS,
+    'price': OZON_PRICE_SELECTORS,
+    'link': ["a[href*='/product/']"]
+}
+
+# Поиск плиток одним вызовом JavaScript: от каждой ссылки на товар к внешней плитке
+# (по селекторам плиток, а если они не подошли - вверх по DOM, пока в узле ссылки только на этот товар),
+# фильтр по ключевым словам в браузере. Возвращает плитки и их SKU.
+OZON_DISCOVERY_JS = """
+var tileSelector = arguments[0];
+var includeWords = arguments[1];
+var excludeWords = arguments[2];
+var minTextLength = arguments[3];
+var maxClimb = 8;
+
+function skuOf(href) {
+    var match = (href || '').match(/\\/product\\/(?:[^\\/?#]*-)?(\\d+)\\/?/);
+    return match ? match[1] : null;
+}
+
+function hasOtherProduct(node, sku) {
+    var links = node.querySelectorAll('a[href*="/product/"]');
+    for (var i = 0; i < links.length; i++) {
+        if (skuOf(links[i].href) !== sku) {
+            return true;
+        }
+    }
+    return false;
+}
+
+function findTile(link, sku) {
+    var tile = link.closest(tileSelector);
+    if (tile) {
+        var outer = tile.parentElement ? tile.parentElement.closest(tileSelector) : null;
+        while (outer) {
+            tile = outer;
+            outer = tile.parentElement ? tile.parentElement.closest(tileSelector) : null;
+        }
+        return tile;
+    }
+    tile = link;
+    for (var depth = 0; depth < maxClimb && tile.parentElement && tile.parentElement !== document.body; depth++) {
+        if (hasOtherProduct(tile.parentElement, sku)) {
+            break;
+        }
+        tile = tile.parentElement;
+    }
+    return tile;
+}
+
+function containsAny(text, words) {
+    for (var i = 0; i < words.length; i++) {
+        if (text.indexOf(words[i]) !== -1) {
+            return true;
+        }
+    }
+    return false;
+}
+
+var links = document.querySelectorAll('a[href*="/product/"]');
+var seen = {};
+var tiles = [];
+var skus = [];
+var candidates = 0;
+
+for (var i = 0; i < links.length; i++) {
+    var sku = skuOf(links[i].href);
+    if (!sku || seen[sku]) {
+        continue;
+    }
+    seen[sku] = true;
+    candidates++;
+
+    var tile = findTile(links[i], sku);
+    var text = (tile.innerText || '').toLowerCase();
+    if (text.length <= minTextLength) {
+        continue;
+    }
+    if (includeWords.length && !containsAny(text, includeWords)) {
+        continue;
+    }
+    if (containsAny(text, excludeWords)) {
+        continue;
+    }
+    tiles.push(tile);
+    skus.push(sku);
+}
+
+return {tiles: tiles, skus: skus, candidates: candidates};
+"""
+
+
+def extract_ozon_sku(url):
+    """SKU товара из ссылки вида /product/nazvanie-123456789/"""
+    if not url:
+        return None
+    match = re.search(r'/product/(?:[^/?#]*-)?(\d+)/?', url)
+    return match.group(1) if match else None
+
+
+def parse_ozon_price_text(text, min_price=1000, max_price=500000):
+    """Цена из текста узла, если она попадает в допустимый диапазон"""
+    if not text or ('₽' not in text and 'руб' not in text.lower()):
+        return None
+    # Рассрочку ("× 12 мес", "в месяц") за цену товара не принимаем
+    if re.search(r'мес|×|x\s*\d', text.lower()):
+        return None
+    clean_text = re.sub(r'[^\d]', '', text.split('₽')[0])
+    if len(clean_text) >= 2:
+        price = int(clean_text)
+        if min_price <= price <= max_price:
+            return price
+    return None
+
+
+def parse_ozon_tile_name(node):
+    """Название товара из плитки: сначала селекторы, затем самая длинная информативная строка"""
+    title = first_text(node, OZON_TITLE_SELECTORS)
+    if title and len(title) > 10:
+        return title
+
+    lines = node_text(node).split('\n')
+    filtered_lines = [
+        line for line in lines
+        if len(line) > 15 and
+        not re.search(r'\d{1,3}[\s\u00a0]?\d{3}[\s\u00a0]?\d{0,3}[\s\u00a0]?₽', line) and
+        not re.search(r'отзыв|в корзину|купить|₽|руб|доставка', line.lower())
+    ]
+    return max(filtered_lines, key=len) if filtered_lines else None
+
+
+def parse_ozon_tile_price(node, min_price=1000, max_price=500000):
+    """Текущая цена из плитки по селекторам цены"""
+    for selector in OZON_PRICE_SELECTORS:
+        try:
+            for price_node in node.cssselect(selector):
+                price = parse_ozon_price_text(price_node.text_content(), min_price, max_price)
+                if price:
+                    return price
+        except Exception:
+            continue
+    return None
+
+
+def find_ozon_tile_nodes(tree):
+    """Внешние узлы плиток с SKU и ссылкой, без вложенных и повторов"""
+    nodes = []
+    for selector in OZON_TILE_SELECTORS:
+        nodes = tree.cssselect(selector)
+        if nodes:
+            break
+
+    entries = []
+    seen = set()
+
+    for node in outermost(nodes):
+        links = node.cssselect("a[href*='/product/']")
+        url = links[0].get('href') if links else None
+        if url and url.startswith('/'):
+            url = f"https://www.ozon.ru{url}"
+
+        sku = extract_ozon_sku(url)
+        if not sku or sku in seen:
+            continue
+        seen.add(sku)
+        entries.append((sku, url.split('?')[0], node))
+
+    return entries
+
+
+def parse_ozon_tile_node(sku, url, node, min_price=1000, max_price=500000):
+    """Данные одной плитки из узла lxml"""
+    return {
+        'sku': sku,
+        'url': url,
+        'name': parse_ozon_tile_name(node),
+        'price': parse_ozon_tile_price(node, min_price, max_price),
+        'text': node_text(node)[:1000]
+    }
+
+
+def is_ozon_tile_loaded(tile):
+    """Плитка прогрузилась: есть название и цена в тексте"""
+    return bool(tile['name']) and '₽' in tile['text']
+
+
+def parse_ozon_tiles_html(html, min_price=1000, max_price=500000, start_index=0):
+    """Разбор всех плиток товаров из снимка page_source без обращений к браузеру"""
+    entries = find_ozon_tile_nodes(parse_html(html))
+    return [parse_ozon_tile_node(*entry, min_price, max_price) for entry in entries[start_index:]]
+
+
+def extract_ozon_tiles_snapshot(driver, min_price=1000, max_price=500000, progress=None):
+    """Извлекает плитки по одному снимку page_source
+
+    Если передан progress (ScrollProgress), возвращаются только плитки после
+    водяного знака и с SKU, не встречавшимися ранее.
+    """
+    try:
+        entries = find_ozon_tile_nodes(parse_html(driver.page_source))
+        start_index = progress.start_index(len(entries)) if progress else 0
+
+        tiles = [parse_ozon_tile_node(*entry, min_price, max_price) for entry in entries[start_index:]]
+        if progress:
+            tiles = progress.accept(tiles, key=lambda tile: tile['sku'], start_index=start_index,
+                                    is_complete=is_ozon_tile_loaded)
+        print(f"📸 Разбор снимка страницы: {len(tiles)} новых плиток из {len(entries)}")
+        return tiles
+    except Exception as e:
+        print(f"⚠️ Ошибка разбора снимка страницы: {e}")
+        return []
+
+
+def extract_ozon_element_skus(driver, elements):
+    """SKU для списка WebElement одним вызовом JavaScript"""
+    if not elements:
+        return []
+    try:
+        urls = driver.execute_script("""
+            return arguments[0].map(function(tile) {
+                var link = tile.querySelector('a[href*="/product/"]');
+                return link ? link.href : null;
+            });
+        """, elements)
+        return [extract_ozon_sku(url) for url in urls]
+    except Exception as e:
+        print(f"⚠️ Ошибка получения SKU плиток: {e}")
+        return [None] * len(elements)
+
+
+def find_ozon_tiles(driver, include_words=(), exclude_words=(), min_text_length=30):
+    """Плитки товаров страницы и их SKU одним вызовом JavaScript
+
+    Плитка берется внешняя, по одной на товар; include_words/exclude_words - фильтр
+    по тексту плитки (в нижнем регистре), проверяется в браузере.
+    """
+    try:
+        result = driver.execute_script(OZON_DISCOVERY_JS, ', '.join(OZON_TILE_SELECTORS),
+                                       list(include_words), list(exclude_words), min_text_length)
+        print(f"🔎 Плиток товаров: {result['candidates']}, подходящих: {len(result['tiles'])}")
+        return result['tiles'], result['skus']
+    except Exception as e:
+        print(f"⚠️ Ошибка поиска плиток: {e}")
+        return [], []
@@ -0,0 +1,155 @@
+import json
+import re
+
+from parsing.html_snapshot import parse_html
+from parsing.ozon_market.ozon_tiles import extract_ozon_sku, find_ozon_tile_nodes, parse_ozon_tile_node
+
+
+# Виджеты выдачи, в атрибуте data-state которых лежат данные плиток
+OZON_STATE_WIDGET_PATTERN = re.compile(r'^state-(?:searchResultsV2|tileGridDesktop|tileGrid|skuGrid)')
+
+
+def parse_ozon_state_number(text):
+    digits = re.sub(r'[^\d]', '', text or '')
+    return int(digits) if digits else None
+
+
+def iter_ozon_atoms(item):
+    """Атомы плитки: mainState и вложенные списки (порядок как на странице)"""
+    for state in item.get('mainState') or []:
+        atom = state.get('atom') or {}
+        yield state.get('id'), atom
+        for nested in (atom.get(atom.get('type')) or {}).get('items') or []:
+            if isinstance(nested, dict) and 'atom' in nested:
+                yield nested.get('id'), nested['atom']
+
+
+def parse_ozon_state_prices(atom_data):
+    """Текущая и старая цена из атома priceV2: рассрочка и "в месяц" сюда не попадают"""
+    price = original_price = None
+    for part in atom_data.get('price') or []:
+        style = (part.get('textStyle') or '').upper()
+        value = parse_ozon_state_number(part.get('text'))
+        if style == 'PRICE' and price is None:
+            price = value
+        elif style == 'ORIGINAL_PRICE' and original_price is None:
+            original_price = value
+    return price, original_price
+
+
+def parse_ozon_state_labels(atom_data):
+    """Рейтинг и число отзывов из атома labelList"""
+    rating = reviews = None
+    for label in atom_data.get('items') or []:
+        title = re.sub(r'<[^>]+>', '', str(label.get('title') or '')).strip()
+        if rating is None and re.fullmatch(r'[0-5][.,]\d{1,2}', title):
+            rating = float(title.replace(',', '.'))
+        elif reviews is None and 'отзыв' in title.lower():
+            reviews = parse_ozon_state_number(title)
+    return rating, reviews
+
+
+def parse_ozon_state_item(item, min_price=1000, max_price=500000):
+    """Плитка из JSON виджета в том же виде, что и parse_ozon_tile_node (плюс старая цена и рейтинг)"""
+    link = (item.get('action') or {}).get('link') or ''
+    url = f"https://www.ozon.ru{link}" if link.startswith('/') else link
+    url = url.split('?')[0] or None
+    sku = str(item['skuId']) if item.get('skuId') else extract_ozon_sku(url)
+
+    name = price = original_price = rating = reviews = None
+    texts = []
+    for atom_id, atom in iter_ozon_atoms(item):
+        atom_type = atom.get('type')
+        atom_data = atom.get(atom_type) or {}
+
+        if atom_type in ('priceV2', 'price') and price is None:
+            price, original_price = parse_ozon_state_prices(atom_data)
+        elif atom_type == 'labelList':
+            label_rating, label_reviews = parse_ozon_state_labels(atom_data)
+            rating = rating if rating is not None else label_rating
+            reviews = reviews if reviews is not None else label_reviews
+        elif atom_type == 'textAtom':
+            text = re.sub(r'<[^>]+>', '', atom_data.get('text') or '').strip()
+            if text:
+                texts.append(text)
+                if atom_id == 'name' and not name:
+                    name = text
+
+    if not name and texts:
+        name = max(texts, key=len)
+
+    if price is not None and not min_price <= price <= max_price:
+        price = None
+
+    return {
+        'sku': sku,
+        'url': url,
+        'name': name,
+        'price': price,
+        'original_price': original_price,
+        'rating': rating,
+        'reviews': reviews,
+        'text': '\n'.join(texts)[:1000]
+    }
+
+
+def find_ozon_state_items(tree):
+    """Все плитки из атрибутов data-state виджетов выдачи"""
+    items = []
+    for node in tree.xpath('//*[@data-state][starts-with(@id, "state-")]'):
+        if not OZON_STATE_WIDGET_PATTERN.match(node.get('id')):
+            continue
+        try:
+            state = json.loads(node.get('data-state'))
+        except (TypeError, ValueError):
+            continue
+        items.extend(item for item in state.get('items') or [] if isinstance(item, dict))
+    return items
+
+
+def parse_ozon_widget_state_html(html, min_price=1000, max_price=500000):
+    """Разбор плиток из JSON виджетов одного снимка page_source"""
+    items = find_ozon_state_items(parse_html(html))
+    return [parse_ozon_state_item(item, min_price, max_price) for item in items]
+
+
+def accept_new_ozon_tiles(tiles, progress=None):
+    """Новые полные плитки (по SKU); водяной знак DOM не трогаем - порядок JSON другой,
+    а неполные плитки будут разобраны на следующей прокрутке"""
+    fresh_tiles = []
+    for tile in tiles:
+        if not tile['sku'] or not tile['name'] or tile['price'] is None:
+            continue
+        if progress is not None:
+            if progress.is_seen(tile['sku']):
+                continue
+            progress.mark_seen(tile['sku'])
+        fresh_tiles.append(tile)
+    return fresh_tiles
+
+
+def extract_ozon_tiles_state(driver, min_price=1000, max_price=500000, progress=None):
+    """Плитки из встроенного JSON виджетов, а для плиток, догруженных прокруткой, - из DOM
+
+    Виджеты с data-state отрисовываются сервером, поэтому плитки следующих страниц
+    ленты (подгруженные прокруткой) берутся из того же снимка разбором узлов плиток.
+    """
+    try:
+        tree = parse_html(driver.page_source)
+        state_tiles = [parse_ozon_state_item(item, min_price, max_price) for item in find_ozon_state_items(tree)]
+        tiles = accept_new_ozon_tiles(state_tiles, progress)
+
+        # Узлы плиток, уже взятых из JSON или с прошлых прокруток, не разбираем
+        taken = {tile['sku'] for tile in state_tiles}
+        entries = [entry for entry in find_ozon_tile_nodes(tree)
+                   if entry[0] not in taken and not (progress and progress.is_seen(entry[0]))]
+        dom_tiles = accept_new_ozon_tiles([parse_ozon_tile_node(*entry, min_price, max_price) for entry in entries],
+                                          progress)
+        tiles.extend(dom_tiles)
+
+        print(f"🧩 Разбор JSON виджетов: {len(state_tiles)} плиток в JSON, "
+              f"новых {len(tiles) - len(dom_tiles)} из JSON и {len(dom_tiles)} из DOM")
+        return tiles
+    except Exception as e:
+        print(f"⚠️ Ошибка разбора JSON виджетов: {e}")
+        return []
@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from parsing.driver_pool import DriverPool
+
+
+# Наибольший номер страницы среди ссылок пагинации (?page=N) или null
+LAST_PAGE_JS = """
+var param = arguments[0];
+var last = null;
+var links = document.querySelectorAll('a[href*="' + param + '="]');
+for (var i = 0; i < links.length; i++) {
+    try {
+        var value = parseInt(new URL(links[i].href, location.href).searchParams.get(param), 10);
+        if (value && (last === null || value > last)) {
+            last = value;
+        }
+    } catch (e) {}
+}
+return last;
+"""
+
+
+def page_number(url, param='page'):
+    """Номер страницы выдачи из параметра page (по умолчанию 1)"""
+    for key, value in parse_qsl(urlsplit(url or '').query):
+        if key == param and value.isdigit():
+            return int(value)
+    return 1
+
+
+def replace_query_params(url, params):
+    """Адрес с замененными параметрами запроса; параметр со значением None удаляется"""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key not in params]
+    query.extend((key, str(value)) for key, value in params.items() if value is not None)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def page_url(url, page, param='page'):
+    """Адрес той же выдачи с параметром page=N (первая страница - без параметра)"""
+    return replace_query_params(url, {param: page if page > 1 else None})
+
+
+def discover_last_page(driver, param='page'):
+    try:
+        return driver.execute_script(LAST_PAGE_JS, param)
+    except Exception as e:
+        print(f"⚠️ Не удалось прочитать пагинацию: {e}")
+        return None
+
+
+class PageCrawler:
+    """Параллельный обход нумерованных страниц выдачи (&page=N) на пуле драйверов
+
+    Каждая страница открывается в своем драйвере из пула и разбирается независимо:
+    extract_page(driver, page) возвращает товары уже открытой страницы, key(item) - ключ
+    для объединения (SKU, id сниппета; товары без ключа сохраняются все).
+    Последняя страница определяется по ссылкам пагинации (и уточняется на каждой странице);
+    без пагинации страницы раздаются до первой пустой или до max_pages.
+    Одновременно открыто не больше workers страниц.
+    health - SelectorHealthCheck: селекторы проверяются на первой странице, и при сломанной
+    разметке обход прерывается SelectorDriftError до раздачи остальных страниц.
+    """
+
+    def __init__(self, pool, url, extract_page, key, max_pages=20, workers=None, pacer=None, settle=None,
+                 param='page', health=None):
+        self.pool = pool
+        self.url = url
+        self.extract_page = extract_page
+        self.key = key
+        self.max_pages = max_pages
+        self.workers = workers or pool.size
+        self.pacer = pacer
+        self.settle = settle
+        self.param = param
+        self.health = health
+        self.pages = {}
+        self.seen = set()
+        self.duplicates = 0
+        self.lock = threading.Lock()
+
+    def crawl_page(self, page):
+        """Товары одной страницы и номер последней страницы по ее пагинации"""
+        with self.pool.driver() as driver:
+            if self.pacer:
+                self.pacer.pace('page')
+            driver.get(page_url(self.url, page, self.param))
+            if self.settle:
+                self.settle(driver)
+
+            items = self.extract_page(driver, page)
+            if page == 1 and self.health and self.health.report is None:
+                self.health.check(driver, len(items))
+            last_page = discover_last_page(driver, self.param)
+            if self.pacer:
+                self.pacer.check(driver, empty_listing=not items)
+
+        print(f"📄 Страница {page}: {len(items)} товаров")
+        return items, last_page
+
+    def merge(self, page, items):
+        """Товары страницы без уже собранных с других страниц"""
+        fresh_items = []
+        with self.lock:
+            for item in items:
+                item_key = self.key(item)
+                if item_key is not None:
+                    if item_key in self.seen:
+                        self.duplicates += 1
+                        continue
+                    self.seen.add(item_key)
+                fresh_items.append(item)
+            self.pages[page] = fresh_items
+        return fresh_items
+
+    def page_limit(self, last_page):
+        return min(last_page, self.max_pages) if last_page else self.max_pages
+
+    def crawl(self):
+        """Все товары выдачи в порядке страниц"""
+        start_time = time.time()
+
+        items, last_page = self.crawl_page(1)
+        self.merge(1, items)
+        if not items:
+            print("❌ Первая страница выдачи пуста")
+            return []
+
+        limit = self.page_limit(last_page)
+        print(f"📑 Страниц к обходу: {limit}" + (" (по пагинации)" if last_page else " (до первой пустой)"))
+
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+            while running or next_page <= limit:
+                while next_page <= limit and len(running) < self.workers:
+                    running[executor.submit(self.crawl_page, next_page)] = next_page
+                    next_page += 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = running.pop(future)
+                    try:
+                        items, last_page = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Ошибка обхода страницы {page}: {e}")
+                        continue
+
+                    self.merge(page, items)
+                    if not items:
+                        # Выдача кончилась: дальше этой страницы не идем
+                        limit = min(limit, page - 1)
+                    elif last_page and self.page_limit(last_page) > limit:
+                        # Пагинация показывает только соседние страницы - граница сдвинулась
+                        limit = self.page_limit(last_page)
+
+        merged = [item for page in sorted(self.pages) for item in self.pages[page]]
+        print(f"📚 Обход страниц: {len(self.pages)} страниц, {len(merged)} товаров, "
+              f"повторов {self.duplicates}, время {time.time() - start_time:.1f} с")
+        return merged
+
+
+def crawl_pages(factory, url, extract_page, key, pool=None, workers=3, max_pages=20, pacer=None, settle=None,
+                health=None):
+    """Обход страниц выдачи на пуле драйверов; без пула создается и закрывается свой"""
+    own_pool = pool is None
+    pool = pool or DriverPool(factory, size=workers)
+    try:
+        crawler = PageCrawler(pool, url, extract_page, key, max_pages=max_pages, workers=min(workers, pool.size),
+                              pacer=pacer, settle=settle, health=health)
+        return crawler.crawl()
+    finally:
+        if own_pool:
+            pool.close()
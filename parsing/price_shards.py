@@ -0,0 +1,194 @@
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from parsing.driver_pool import DriverPool
+from parsing.page_crawler import PageCrawler, discover_last_page, replace_query_params
+
+
+# Фильтр выдачи по цене (в рублях, границы включительно) в параметрах адреса маркетплейса
+PRICE_RANGE_PARAMS = {
+    'wildberries': lambda low, high: {'priceU': f'{low * 100};{high * 100}'},
+    'ozon': lambda low, high: {'currency_price': f'{low}.000;{high}.000'},
+    'yandex': lambda low, high: {'pricefrom': low, 'priceto': high}
+}
+
+# Примерное число товаров на странице выдачи (для оценки полосы по пагинации)
+RESULTS_PER_PAGE = {'wildberries': 100, 'ozon': 36, 'yandex': 48}
+
+# Где на странице написано общее число найденных товаров: JSON заголовка выдачи Ozon,
+# заголовок поиска Яндекс Маркета
+RESULT_TOTAL_SELECTORS = {
+    'ozon': '[id*="esultsHeader"][data-state], [data-widget*="esultsHeader"]',
+    'yandex': '[data-auto="SerpTitle"], [data-auto="searchTitle"], [data-zone-name="SearchTitle"], h1'
+}
+
+RESULT_TOTAL_PATTERN = re.compile(r'(\d[\d \u00a0\u202f]*)\s*(?:товар|предложени|результат)', re.IGNORECASE)
+
+# Тексты (для виджетов с data-state - их JSON) узлов, где может быть число найденных товаров
+RESULT_TOTAL_JS = """
+var nodes = document.querySelectorAll(arguments[0]);
+var texts = [];
+for (var i = 0; i < nodes.length; i++) {
+    texts.push(nodes[i].getAttribute('data-state') || nodes[i].innerText || '');
+}
+return texts;
+"""
+
+
+def price_band_url(url, market, low, high):
+    """Адрес выдачи, суженной до цен от low до high"""
+    return replace_query_params(url, PRICE_RANGE_PARAMS[market](low, high))
+
+
+def parse_result_total(texts):
+    """Число найденных товаров из текста вроде "Найдено 1 234 товара"; None, если его нет"""
+    for text in texts or []:
+        match = RESULT_TOTAL_PATTERN.search(re.sub(r'<[^>]+>', ' ', text or ''))
+        if match:
+            return int(re.sub(r'\D', '', match.group(1)))
+    return None
+
+
+def read_result_total(driver, market):
+    """Общее число товаров выдачи, как его показывает страница маркетплейса"""
+    selector = RESULT_TOTAL_SELECTORS.get(market)
+    if not selector:
+        return None
+    try:
+        return parse_result_total(driver.execute_script(RESULT_TOTAL_JS, selector))
+    except Exception as e:
+        print(f"⚠️ Не удалось прочитать число товаров выдачи: {e}")
+        return None
+
+
+def estimate_band_results(total, last_page, max_pages, page_size):
+    """Число товаров полосы: счетчик страницы, а без него - оценка по пагинации
+
+    Пагинация показывает только соседние страницы, поэтому полоса, у которой видна страница max_pages
+    и дальше, считается переполненной (больше max_pages * page_size товаров) и будет разделена.
+    """
+    if total is not None:
+        return total
+    last_page = last_page or 1
+    if last_page >= max_pages:
+        return max_pages * page_size + 1
+    return last_page * page_size
+
+
+def split_price_band(low, high):
+    """Граница деления полосы: среднее геометрическое - дешевых товаров обычно больше, чем дорогих"""
+    middle = int(math.sqrt(max(low, 1) * high))
+    return min(max(middle, low), high - 1)
+
+
+class PriceShardPlanner:
+    """Разбиение диапазона цен на полосы, в каждой из которых не больше max_results товаров
+
+    Полосы уточняются уровнями: pending - полосы, для которых нужно узнать число товаров,
+    update(counts) делит переполненные полосы надвое и возвращает, остались ли такие полосы.
+    Число товаров None (неизвестно) полосу не делит; полосы уже min_width не делятся.
+    Готовые полосы с числом товаров лежат в shards.
+    """
+
+    def __init__(self, low, high, max_results, min_width=1):
+        self.max_results = max_results
+        self.min_width = min_width
+        self.pending = [(low, high)]
+        self.shards = []
+        self.counted = 0
+
+    def update(self, counts):
+        next_pending = []
+        for (low, high), count in zip(self.pending, counts):
+            self.counted += 1
+            if count is None or count <= self.max_results or high - low <= self.min_width:
+                if count != 0:
+                    self.shards.append((low, high, count))
+                if count and count > self.max_results:
+                    print(f"⚠️ Полоса {low}-{high} руб. не делится дальше: {count} > {self.max_results}")
+                continue
+
+            middle = split_price_band(low, high)
+            next_pending.extend([(low, middle), (middle + 1, high)])
+
+        self.pending = next_pending
+        return bool(self.pending)
+
+    def report(self):
+        print(f"🧮 Диапазон цен разбит на {len(self.shards)} полос за {self.counted} подсчетов:")
+        for low, high, count in sorted(self.shards):
+            print(f"   • {low}-{high} руб.: {count if count is not None else '?'}")
+
+
+def plan_price_shards(count_band, low, high, max_results, workers=3, min_width=1):
+    """Полосы цен [(low, high, count)]; count_band(low, high) вызывается параллельно для полос уровня"""
+    planner = PriceShardPlanner(low, high, max_results, min_width)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while planner.pending:
+            counts = list(executor.map(lambda band: count_band(*band), planner.pending))
+            planner.update(counts)
+    planner.report()
+    return sorted(planner.shards)
+
+
+def crawl_price_shards(factory, url, market, extract_page, key, price_range, pool=None, workers=3, max_pages=20,
+                       pacer=None, settle=None, health=None):
+    """Обход выдачи по полосам цен на пуле драйверов
+
+    Число товаров полосы берется из счетчика на ее первой странице (read_result_total), а если его нет -
+    оценивается по пагинации (estimate_band_results); полоса, не помещающаяся в max_pages страниц
+    по RESULTS_PER_PAGE товаров, делится. Затем полосы обходятся
+    параллельно (по PageCrawler на полосу), результаты объединяются по key.
+    health - SelectorHealthCheck: проверяется на первой подсчитанной полосе (весь диапазон цен),
+    при сломанной разметке SelectorDriftError прерывает сбор до деления на полосы.
+    """
+    own_pool = pool is None
+    pool = pool or DriverPool(factory, size=workers)
+    workers = min(workers, pool.size)
+    page_size = RESULTS_PER_PAGE[market]
+
+    def count_results(low, high):
+        with pool.driver() as driver:
+            if pacer:
+                pacer.pace('page')
+            driver.get(price_band_url(url, market, low, high))
+            if settle:
+                settle(driver)
+            items = extract_page(driver, 1)
+            if health and health.report is None:
+                health.check(driver, len(items))
+            if not items:
+                return 0
+            return estimate_band_results(read_result_total(driver, market), discover_last_page(driver), max_pages,
+                                         page_size)
+
+    def crawl_band(shard):
+        low, high, _ = shard
+        crawler = PageCrawler(pool, price_band_url(url, market, low, high), extract_page, key,
+                              max_pages=max_pages, workers=1, pacer=pacer, settle=settle)
+        return crawler.crawl()
+
+    try:
+        shards = plan_price_shards(count_results, *price_range, max_results=max_pages * page_size, workers=workers)
+
+        items_by_key = {}
+        keyless_items = []
+        duplicates = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for items in executor.map(crawl_band, shards):
+                for item in items:
+                    item_key = key(item)
+                    if item_key is None:
+                        keyless_items.append(item)
+                    elif item_key in items_by_key:
+                        duplicates += 1
+                    else:
+                        items_by_key[item_key] = item
+
+        merged = list(items_by_key.values()) + keyless_items
+        print(f"🧩 Полос цен: {len(shards)}, товаров: {len(merged)}, повторов между полосами: {duplicates}")
+        return merged
+    finally:
+        if own_pool:
+            pool.close()
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import time
+
+
+class ProductCache:
+    """Дисковый кэш данных страниц товаров: (маркетплейс, id товара) -> данные
+
+    Названия и бренды товаров почти не меняются, поэтому страница товара открывается
+    только при промахе кэша. Записи старше ttl секунд считаются устаревшими,
+    при превышении max_entries вытесняются давно не использованные (LRU).
+    """
+
+    def __init__(self, filename='product_cache.sqlite', ttl=30 * 24 * 3600, max_entries=50000):
+        self.filename = filename
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(filename, isolation_level=None)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                market TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (market, product_id)
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS products_used_at ON products (used_at)")
+
+    def get(self, market, product_id):
+        """Данные товара из кэша или None, если их нет или они устарели"""
+        if not product_id:
+            return None
+
+        row = self.connection.execute(
+            "SELECT data, fetched_at FROM products WHERE market = ? AND product_id = ?",
+            (market, str(product_id))
+        ).fetchone()
+
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            self.misses += 1
+            return None
+
+        self.connection.execute(
+            "UPDATE products SET used_at = ? WHERE market = ? AND product_id = ?",
+            (now, market, str(product_id))
+        )
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, market, product_id, data):
+        """Сохраняет данные товара и при необходимости вытесняет старые записи"""
+        if not product_id or not data:
+            return
+
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO products (market, product_id, data, fetched_at, used_at) VALUES (?, ?, ?, ?, ?)",
+            (market, str(product_id), json.dumps(data, ensure_ascii=False), now, now)
+        )
+        self.evict()
+
+    def evict(self):
+        """Удаляет давно не использованные записи сверх max_entries"""
+        count = self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM products WHERE rowid IN (SELECT rowid FROM products ORDER BY used_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def purge_expired(self):
+        """Удаляет устаревшие записи"""
+        self.connection.execute("DELETE FROM products WHERE fetched_at < ?", (time.time() - self.ttl,))
+
+    def close(self):
+        if self.hits or self.misses:
+            print(f"🗃️ Кэш товаров: {self.hits} попаданий, {self.misses} промахов")
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,197 @@
+import json
+import random
+import threading
+import time
+
+
+# Настройки темпа по маркетплейсам:
+# rate - начальный темп (токенов в секунду), min_rate/max_rate - границы,
+# burst - сколько токенов можно накопить, increase - прибавка темпа после успешного шага,
+# decrease - множитель темпа при признаках блокировки, penalty - пауза после блокировки (с),
+# costs - стоимость действий в токенах
+MARKET_RATE_SETTINGS = {
+    'wildberries': {
+        'rate': 1.0, 'min_rate': 0.1, 'max_rate': 3.0, 'burst': 2.0,
+        'increase': 0.1, 'decrease': 0.5, 'penalty': 30,
+        'costs': {'page': 4.0, 'click': 2.0, 'scroll': 1.5, 'card': 0.3}
+    },
+    'ozon': {
+        'rate': 0.7, 'min_rate': 0.05, 'max_rate': 2.0, 'burst': 2.0,
+        'increase': 0.05, 'decrease': 0.5, 'penalty': 60,
+        'costs': {'page': 4.0, 'click': 2.0, 'scroll': 1.5, 'card': 0.3}
+    },
+    'yandex': {
+        'rate': 0.8, 'min_rate': 0.05, 'max_rate': 2.0, 'burst': 2.0,
+        'increase': 0.05, 'decrease': 0.5, 'penalty': 60,
+        'costs': {'page': 4.0, 'click': 1.0, 'scroll': 2.0, 'card': 0.2}
+    }
+}
+
+# Признаки страницы с капчей или блокировкой (в адресе или заголовке)
+THROTTLE_MARKERS = [
+    'captcha', 'showcaptcha', 'blocked', 'access denied', 'too many requests',
+    'вы не робот', 'подтвердите, что запросы', 'доступ ограничен', 'доступ запрещен'
+]
+
+THROTTLE_STATUSES = (429, 503)
+
+EMPTY_LISTING_REASON = "пустая выдача"
+
+
+class RateController:
+    """Темп запросов к одному маркетплейсу: token bucket с AIMD
+
+    pace(action) ждет, пока в корзине накопится стоимость действия. Темп растет
+    на increase после каждого успешного шага и умножается на decrease при признаках
+    блокировки (капча, HTTP 429/503 в журнале производительности, пустая выдача).
+    Суммарное время ожидания накапливается для отчета.
+    Один контроллер можно делить между потоками (см. PageCrawler): под блокировкой токены
+    только резервируются (корзина уходит в минус), а спит каждый поток сам, поэтому общий
+    темп маркетплейса не растет с числом драйверов, но потоки не ждут друг друга.
+    """
+
+    def __init__(self, market, rate=1.0, min_rate=0.1, max_rate=3.0, burst=2.0,
+                 increase=0.1, decrease=0.5, penalty=30, costs=None, jitter=0.2):
+        self.market = market
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.penalty = penalty
+        self.costs = costs or {}
+        self.jitter = jitter
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.waited = 0.0
+        self.waits = 0
+        self.throttle_events = []
+        self.lock = threading.RLock()
+
+    def refill(self):
+        # updated_at в будущем - идет пауза после блокировки, токены до ее конца не копятся
+        now = time.monotonic()
+        if now > self.updated_at:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def reserve(self, cost):
+        """Списывает стоимость действия и возвращает, сколько ждать до него (вызывается под блокировкой)"""
+        self.refill()
+        self.tokens -= cost
+        delay = max(0.0, self.updated_at - time.monotonic())
+        if self.tokens < 0:
+            delay += -self.tokens / self.rate * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if delay > 0:
+            self.waited += delay
+            self.waits += 1
+        return delay
+
+    def pace(self, action='scroll'):
+        """Ожидание перед действием (page, click, scroll, card) с учетом текущего темпа"""
+        with self.lock:
+            delay = self.reserve(self.costs.get(action, 1.0))
+        # Спим без блокировки: остальные потоки тем временем резервируют свои токены
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self, reason, penalty=None):
+        """Признак блокировки: снижаем темп, обнуляем корзину и выдерживаем паузу
+
+        Пауза общая: до ее конца pace() задерживает все потоки маркетплейса.
+        penalty=0 - только снизить темп (например, при пустой выдаче, которая может быть настоящей).
+        """
+        penalty = self.penalty if penalty is None else penalty
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            self.throttle_events.append(reason)
+            print(f"🐢 {self.market}: признак блокировки ({reason}), темп снижен до {self.rate:.2f}/с, "
+                  f"пауза {penalty} с")
+            self.refill()
+            self.updated_at = max(self.updated_at, time.monotonic() + penalty)
+            delay = max(0.0, self.updated_at - time.monotonic())
+            if delay > 0:
+                self.waited += delay
+                self.waits += 1
+        if delay > 0:
+            time.sleep(delay)
+
+    def detect_throttling(self, driver, empty_listing=False, log_entries=None):
+        """Причина блокировки или None
+
+        log_entries - записи журнала производительности (driver.get_log('performance')),
+        если их уже прочитал вызывающий код; иначе журнал читается здесь.
+        """
+        try:
+            page_marker = f"{driver.current_url} {driver.title}".lower()
+            for marker in THROTTLE_MARKERS:
+                if marker in page_marker:
+                    return f"капча/блокировка: {marker}"
+        except Exception:
+            pass
+
+        if log_entries is None:
+            try:
+                log_entries = driver.get_log('performance')
+            except Exception:
+                log_entries = []
+
+        for entry in log_entries:
+            try:
+                message = json.loads(entry['message'])['message']
+                if message.get('method') == 'Network.responseReceived':
+                    status = message['params']['response'].get('status')
+                    if status in THROTTLE_STATUSES:
+                        return f"HTTP {status}"
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        if empty_listing:
+            return EMPTY_LISTING_REASON
+
+        return None
+
+    def check(self, driver, empty_listing=False, log_entries=None):
+        """Проверка после шага: снижает темп при блокировке, иначе повышает. Возвращает True при блокировке
+
+        Пустая выдача бывает и настоящей, поэтому за нее темп снижается без паузы
+        """
+        reason = self.detect_throttling(driver, empty_listing, log_entries)
+        if reason:
+            self.record_throttle(reason, penalty=0 if reason == EMPTY_LISTING_REASON else None)
+            return True
+        self.record_success()
+        return False
+
+    def report(self):
+        """Сводка: сколько времени ушло на ожидание"""
+        print(f"⏱️ Темп {self.market}: ожидание {self.waited:.1f} с ({self.waits} пауз), "
+              f"блокировок {len(self.throttle_events)}, текущий темп {self.rate:.2f}/с")
+        return {
+            'market': self.market,
+            'waited': round(self.waited, 2),
+            'waits': self.waits,
+            'throttle_events': list(self.throttle_events),
+            'rate': round(self.rate, 3)
+        }
+
+
+RATE_CONTROLLERS = {}
+RATE_CONTROLLERS_LOCK = threading.Lock()
+
+
+def get_rate_controller(market):
+    """Общий для процесса RateController маркетплейса (настройки из MARKET_RATE_SETTINGS)
+
+    Потоки пула драйверов получают контроллер одновременно, поэтому создание - под блокировкой.
+    """
+    with RATE_CONTROLLERS_LOCK:
+        if market not in RATE_CONTROLLERS:
+            RATE_CONTROLLERS[market] = RateController(market, **MARKET_RATE_SETTINGS.get(market, {}))
+        return RATE_CONTROLLERS[market]
@@ -0,0 +1,143 @@
+import argparse
+import importlib
+import json
+import time
+
+
+# Шаблоны адресов для Network.setBlockedURLs (звездочка - любая подстрока).
+# Картинки, шрифты и видео карточкам не нужны: название и цена приходят текстом.
+BLOCKED_IMAGES = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico']
+BLOCKED_FONTS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+BLOCKED_MEDIA = ['*.mp4', '*.webm', '*.m3u8', '*.mov']
+BLOCKED_TRACKERS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*top-fwz1.mail.ru*', '*vk.com/rtrg*', '*ads.adfox.ru*', '*an.yandex.ru*'
+]
+
+# Политики загрузки ресурсов: images - загружать ли картинки вообще (blink-settings),
+# blocked - шаблоны адресов, которые браузер не запрашивает.
+# Скрипты, стили и XHR не блокируются - от них зависит отрисовка карточек.
+RESOURCE_POLICIES = {
+    'off': {'images': True, 'blocked': []},
+    'default': {
+        'images': False,
+        'blocked': BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_MEDIA + BLOCKED_TRACKERS
+    },
+    'wildberries': {
+        'images': False,
+        'blocked': BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_MEDIA + BLOCKED_TRACKERS + [
+            '*/video/*', '*mc.yandex.ru*'
+        ]
+    },
+    'ozon': {
+        'images': False,
+        'blocked': BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_MEDIA + BLOCKED_TRACKERS + [
+            '*mc.yandex.ru*'
+        ]
+    },
+    # Метрику на Яндекс Маркете не блокируем: без нее чаще показывается капча
+    'yandex': {
+        'images': False,
+        'blocked': BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_MEDIA + BLOCKED_TRACKERS
+    }
+}
+
+# Парсеры, на которых сравнивается загрузка страниц с политикой и без нее
+MARKET_DRIVER_FACTORIES = {
+    'wildberries': ('parsing.wildberries_market.wildberries_gas_stoves_main_2scroll', 'setup_driver'),
+    'ozon': ('parsing.ozon_market.ozon_gas_stoves_main_search', 'setup_driver'),
+    'yandex': ('parsing.yandex_market.gas_cookers_yandex_market_search', 'setup_driver')
+}
+
+# Сводка по загруженным ресурсам текущей страницы
+PAGE_RESOURCES_JS = """
+var resources = performance.getEntriesByType('resource');
+var navigation = performance.getEntriesByType('navigation')[0];
+var transferred = navigation ? navigation.transferSize : 0;
+for (var i = 0; i < resources.length; i++) {
+    transferred += resources[i].transferSize || 0;
+}
+return JSON.stringify({
+    requests: resources.length + 1,
+    transferred: transferred,
+    load_time: navigation ? navigation.loadEventEnd - navigation.startTime : null
+});
+"""
+
+
+def get_resource_policy(policy):
+    """Политика по имени (маркетплейс, 'default' или 'off'); неизвестное имя - 'default'"""
+    if isinstance(policy, dict):
+        return policy
+    if policy is None or policy is False:
+        return RESOURCE_POLICIES['off']
+    return RESOURCE_POLICIES.get(policy, RESOURCE_POLICIES['default'])
+
+
+def apply_resource_options(options, policy='default'):
+    """Настройки Chrome до запуска драйвера (отключение картинок)"""
+    if not get_resource_policy(policy)['images']:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+    return options
+
+
+def apply_resource_policy(driver, policy='default'):
+    """Блокировка ресурсов через CDP после запуска драйвера"""
+    blocked = get_resource_policy(policy)['blocked']
+    if not blocked:
+        return driver
+
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+        print(f"🚫 Заблокировано шаблонов ресурсов: {len(blocked)}")
+    except Exception as e:
+        print(f"⚠️ Не удалось включить блокировку ресурсов: {e}")
+    return driver
+
+
+def measure_page_resources(driver):
+    """Число запросов, переданные байты и время загрузки текущей страницы"""
+    try:
+        return json.loads(driver.execute_script(PAGE_RESOURCES_JS))
+    except Exception as e:
+        print(f"❌ Ошибка замера ресурсов страницы: {e}")
+        return None
+
+
+def measure_page_load(factory, url, settle=5):
+    """Открывает url в новом драйвере и замеряет загрузку страницы"""
+    driver = factory()
+    try:
+        start_time = time.time()
+        driver.get(url)
+        time.sleep(settle)
+        stats = measure_page_resources(driver) or {}
+        stats['wall_time'] = round(time.time() - start_time - settle, 2)
+        return stats
+    finally:
+        driver.quit()
+
+
+def compare_resource_policy(market, url, settle=5):
+    """Загрузка одной страницы без политики и с политикой маркетплейса"""
+    module_name, function_name = MARKET_DRIVER_FACTORIES[market]
+    setup_driver = getattr(importlib.import_module(module_name), function_name)
+
+    results = {}
+    for policy in ('off', market):
+        results[policy] = measure_page_load(lambda: setup_driver(resource_policy=policy), url, settle)
+        stats = results[policy]
+        print(f"📊 Политика '{policy}': запросов {stats.get('requests')}, "
+              f"передано {stats.get('transferred', 0) / 1024:.0f} КБ, "
+              f"загрузка {stats.get('load_time')} мс, время {stats.get('wall_time')} с")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--market', choices=list(MARKET_DRIVER_FACTORIES), required=True)
+    parser.add_argument('--url', required=True, help='страница выдачи для замера')
+    args = parser.parse_args()
+
+    compare_resource_policy(args.market, args.url)
@@ -0,0 +1,107 @@
+import time
+
+
+class ScrollProgress:
+    """Состояние прокрутки: уже обработанные товары и водяной знак DOM
+
+    seen_ids - стабильные идентификаторы товаров (nm-id, SKU, id сниппета),
+    watermark - сколько карточек в порядке DOM уже полностью обработано,
+    scroll_count - сколько прокруток выполнено,
+    url - адрес страницы, с которой идет сбор (для возобновления),
+    job - задача сбора, которой принадлежит журнал (см. resume_checkpoint)
+    """
+
+    def __init__(self, seen_ids=None, watermark=0, scroll_count=0, url=None, job=None):
+        self.seen_ids = set(seen_ids or [])
+        # Идентификаторы, добавленные после последней записи состояния в журнал
+        self.unsaved_ids = set()
+        self.watermark = watermark
+        self.scroll_count = scroll_count
+        self.url = url
+        self.job = job
+
+    def to_state(self):
+        """Состояние для записи в журнал контрольных точек
+
+        В seen_ids пишутся только товары, добавленные с прошлой записи состояния: полный набор
+        на каждой прокрутке делал бы журнал квадратичным по размеру. load_checkpoint собирает
+        набор заново как объединение всех строк состояния.
+        """
+        new_ids, self.unsaved_ids = self.unsaved_ids, set()
+        return {
+            'seen_ids': sorted(str(item_id) for item_id in new_ids),
+            'scroll_count': self.scroll_count,
+            'url': self.url,
+            'job': self.job
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Восстановление из журнала
+
+        Водяной знак не восстанавливается: после перезагрузки страницы порядок карточек
+        в DOM может отличаться, поэтому повторы отсекаются только по seen_ids.
+        """
+        state = state or {}
+        return cls(seen_ids=state.get('seen_ids'), scroll_count=state.get('scroll_count', 0), url=state.get('url'),
+                   job=state.get('job'))
+
+    def start_index(self, total):
+        """Позиция в DOM, с которой продолжать обработку"""
+        if total < self.watermark:
+            # Список перестроен (фильтр, виртуализация) - проходим заново, дубликаты отсечет seen_ids
+            print(f"♻️ Карточек в DOM стало меньше ({total} < {self.watermark}), водяной знак сброшен")
+            self.watermark = 0
+        return self.watermark
+
+    def accept(self, items, key, start_index=None, is_complete=None):
+        """Отбирает новые товары и сдвигает водяной знак
+
+        items - карточки начиная с start_index в порядке DOM.
+        Водяной знак сдвигается только за непрерывный ряд полностью загруженных карточек,
+        чтобы карточки без цены были обработаны на следующей прокрутке.
+        """
+        watermark = self.watermark if start_index is None else start_index
+        contiguous = True
+        fresh_items = []
+
+        for item in items:
+            complete = is_complete(item) if is_complete else True
+            if contiguous and complete:
+                watermark += 1
+            else:
+                contiguous = False
+
+            if not complete:
+                continue
+
+            item_id = key(item)
+            if item_id is not None:
+                if item_id in self.seen_ids:
+                    continue
+                self.mark_seen(item_id)
+            fresh_items.append(item)
+
+        self.watermark = watermark
+        return fresh_items
+
+    def is_seen(self, item_id):
+        return item_id is not None and item_id in self.seen_ids
+
+    def mark_seen(self, item_id):
+        if item_id is not None and item_id not in self.seen_ids:
+            self.seen_ids.add(item_id)
+            self.unsaved_ids.add(item_id)
+
+
+def restore_scroll_depth(driver, scroll_count, pause=1.5):
+    """Прокручивает заново открытую страницу до глубины, достигнутой до сбоя
+
+    Карточки при этом не разбираются: нужно только, чтобы подгрузилась лента.
+    """
+    if not scroll_count:
+        return
+    print(f"⏩ Восстанавливаем глубину прокрутки: {scroll_count} прокруток")
+    for _ in range(scroll_count):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(pause)
@@ -0,0 +1,213 @@
+import json
+import time
+
+
+# Чего ждем от первой страницы выдачи каждого маркетплейса:
+# min_rows - хотя бы столько товаров должно быть извлечено (иначе сбор маркетплейса прерывается),
+# min_cards - столько карточек находят селекторы карточек на рабочей странице,
+# hit_rates - в какой доле карточек срабатывает хотя бы один селектор списка полей,
+# check_after - после какой прокрутки проверять
+SELECTOR_BASELINES = {
+    'wildberries': {'min_rows': 1, 'min_cards': 8, 'hit_rates': {'title': 0.5, 'price': 0.5}, 'check_after': 1},
+    # Плитки Ozon часто берутся из JSON виджетов, поэтому к селекторам плиток требования мягче
+    'ozon': {'min_rows': 1, 'min_cards': 4, 'hit_rates': {'title': 0.3, 'price': 0.5}, 'check_after': 1},
+    'yandex': {'min_rows': 1, 'min_cards': 4, 'hit_rates': {'name': 0.5}, 'check_after': 1}
+}
+
+# Поле, селекторы которого сработали меньше чем в такой доле от ожидаемого (или ни разу),
+# считается сломанным, а не просто просевшим
+BROKEN_HIT_RATE_SHARE = 0.5
+
+# Сколько узлов находит каждый селектор карточек и в скольких карточках срабатывает каждый селектор полей.
+# Невалидный селектор считается несработавшим. Карточки, вложенные в другие карточки, не считаются.
+SELECTOR_HITS_JS = """
+var cardSelectors = arguments[0];
+var fieldSelectors = arguments[1];
+
+function queryAll(root, selector) {
+    try {
+        return root.querySelectorAll(selector);
+    } catch (e) {
+        return [];
+    }
+}
+
+function hasMatch(root, selector) {
+    try {
+        return !!root.querySelector(selector);
+    } catch (e) {
+        return false;
+    }
+}
+
+var cardHits = {};
+var found = [];
+for (var i = 0; i < cardSelectors.length; i++) {
+    var nodes = queryAll(document, cardSelectors[i]);
+    cardHits[cardSelectors[i]] = nodes.length;
+    for (var j = 0; j < nodes.length; j++) {
+        if (found.indexOf(nodes[j]) === -1) {
+            found.push(nodes[j]);
+        }
+    }
+}
+
+var cards = [];
+for (var i = 0; i < found.length; i++) {
+    var nested = false;
+    for (var parent = found[i].parentElement; parent && !nested; parent = parent.parentElement) {
+        nested = found.indexOf(parent) !== -1;
+    }
+    if (!nested) {
+        cards.push(found[i]);
+    }
+}
+
+var fields = {};
+for (var name in fieldSelectors) {
+    var hits = {};
+    var covered = 0;
+    for (var i = 0; i < fieldSelectors[name].length; i++) {
+        hits[fieldSelectors[name][i]] = 0;
+    }
+    for (var j = 0; j < cards.length; j++) {
+        var matched = false;
+        for (var i = 0; i < fieldSelectors[name].length; i++) {
+            if (hasMatch(cards[j], fieldSelectors[name][i])) {
+                hits[fieldSelectors[name][i]]++;
+                matched = true;
+            }
+        }
+        if (matched) {
+            covered++;
+        }
+    }
+    fields[name] = {hits: hits, cards: covered};
+}
+
+return {url: location.href, title: document.title, cards: cards.length, card_hits: cardHits, fields: fields};
+"""
+
+
+class SelectorDriftError(RuntimeError):
+    """Первая страница выдачи не похожа на рабочую: разметка маркетплейса изменилась
+
+    report - отчет build_selector_report (передается и между процессами all_markets)
+    """
+
+    def __init__(self, report):
+        super().__init__(report)
+        self.report = report
+
+    def __str__(self):
+        return f"{self.report['market']}: {'; '.join(self.report['problems'])}"
+
+
+def probe_selectors(driver, card_selectors, field_selectors):
+    """Срабатывания селекторов карточек и полей на текущей странице"""
+    try:
+        return driver.execute_script(SELECTOR_HITS_JS, list(card_selectors),
+                                     {name: list(selectors) for name, selectors in field_selectors.items()})
+    except Exception as e:
+        print(f"⚠️ Ошибка проверки селекторов: {e}")
+        return None
+
+
+def build_selector_report(market, probe, rows, baseline=None):
+    """Отчет о состоянии селекторов: status 'ok', 'degraded' (сбор продолжается) или 'broken'
+
+    'broken' - товаров меньше min_rows, карточек меньше min_cards или селекторы обязательного поля
+    сработали ни разу либо меньше чем в BROKEN_HIT_RATE_SHARE от ожидаемой доли карточек.
+    """
+    baseline = baseline or SELECTOR_BASELINES[market]
+    probe = probe or {'url': None, 'title': None, 'cards': 0, 'card_hits': {}, 'fields': {}}
+    cards = probe['cards']
+
+    selectors = {'cards': probe['card_hits']}
+    selectors.update({name: field['hits'] for name, field in probe['fields'].items()})
+    hit_rates = {name: round(field['cards'] / cards, 2) if cards else 0.0
+                 for name, field in probe['fields'].items()}
+    empty_lists = [name for name, hits in selectors.items() if not any(count > 0 for count in hits.values())]
+
+    problems = []
+    broken = False
+    if rows < baseline['min_rows']:
+        problems.append(f"извлечено товаров: {rows} (нужно не меньше {baseline['min_rows']})")
+        broken = True
+    if cards < baseline['min_cards']:
+        problems.append(f"карточек на странице: {cards} (обычно не меньше {baseline['min_cards']})")
+        broken = True
+    for name, expected_rate in baseline['hit_rates'].items():
+        hit_rate = hit_rates.get(name, 0.0)
+        if hit_rate < expected_rate:
+            problems.append(f"селекторы '{name}' сработали в {hit_rate:.0%} карточек "
+                            f"(обычно не меньше {expected_rate:.0%})")
+            if not hit_rate or hit_rate < expected_rate * BROKEN_HIT_RATE_SHARE:
+                broken = True
+
+    if broken:
+        status = 'broken'
+    else:
+        status = 'degraded' if problems else 'ok'
+
+    return {
+        'market': market,
+        'status': status,
+        'checked_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'url': probe['url'],
+        'title': probe['title'],
+        'rows': rows,
+        'cards': cards,
+        'hit_rates': hit_rates,
+        'empty_lists': empty_lists,
+        'problems': problems,
+        'selectors': selectors
+    }
+
+
+def format_selector_report(report):
+    """Отчет для консоли: итог, проблемы и списки селекторов, не нашедшие ничего"""
+    icons = {'ok': '✅', 'degraded': '⚠️', 'broken': '🛑'}
+    lines = [f"{icons[report['status']]} Селекторы {report['market']}: {report['status']} "
+             f"(товаров {report['rows']}, карточек {report['cards']}) - {report['url']}"]
+    lines.extend(f"   • {problem}" for problem in report['problems'])
+    for name in report['empty_lists']:
+        lines.append(f"   ❌ Список '{name}' не нашел ничего: {', '.join(report['selectors'][name])}")
+    return '\n'.join(lines)
+
+
+def save_selector_report(reports, filename):
+    """Сохраняет отчеты прогона в JSON"""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"🩺 Отчет о состоянии селекторов сохранен в {filename}")
+    except OSError as e:
+        print(f"❌ Ошибка сохранения отчета о селекторах: {e}")
+
+
+class SelectorHealthCheck:
+    """Проверка селекторов после первой страницы выдачи
+
+    Если первая страница не дала ни одного товара, check() печатает отчет и бросает
+    SelectorDriftError, чтобы не крутить заведомо мертвую выдачу до max_scrolls.
+    Отклонения от базовых значений при найденных товарах только печатаются.
+    """
+
+    def __init__(self, market, card_selectors, field_selectors, baseline=None):
+        self.market = market
+        self.card_selectors = card_selectors
+        self.field_selectors = field_selectors
+        self.baseline = baseline or SELECTOR_BASELINES[market]
+        self.report = None
+
+    def due(self, scroll_count):
+        return self.report is None and scroll_count >= self.baseline['check_after']
+
+    def check(self, driver, rows):
+        probe = probe_selectors(driver, self.card_selectors, self.field_selectors)
+        self.report = build_selector_report(self.market, probe, rows, self.baseline)
+        print(format_selector_report(self.report))
+        if self.report['status'] == 'broken':
+            raise SelectorDriftError(self.report)
+        return self.report
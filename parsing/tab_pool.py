@@ -0,0 +1,127 @@
+import time
+
+
+class TabPool:
+    """Пул вкладок браузера для параллельной загрузки страниц товаров
+
+    Страницы открываются через window.open (не более max_tabs одновременно) и грузятся
+    браузером параллельно, пока основной цикл обрабатывает выдачу. poll() обходит открытые
+    вкладки: если extract_script вернул {'ready': true, ...} или истек page_timeout,
+    результат сохраняется, вкладка закрывается, а на ее место открывается следующий URL из очереди.
+    После каждого обхода драйвер возвращается на исходную вкладку.
+    """
+
+    def __init__(self, driver, extract_script, max_tabs=4, page_timeout=20, poll_interval=0.3):
+        self.driver = driver
+        self.extract_script = extract_script
+        self.max_tabs = max_tabs
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.home_window = driver.current_window_handle
+        self.queue = []
+        self.active = {}  # handle -> (url, время открытия)
+        self.results = {}
+
+    def submit(self, url):
+        """Ставит URL в очередь загрузки (повторные URL игнорируются)"""
+        if not url or url in self.results or url in self.queue:
+            return
+        if any(active_url == url for active_url, _ in self.active.values()):
+            return
+        self.queue.append(url)
+
+    def save_result(self, url, data):
+        """Сохраняет результат загрузки страницы (переопределяется, например, для кэширования)"""
+        self.results[url] = data
+
+    @property
+    def pending(self):
+        return len(self.queue) + len(self.active)
+
+    def open_tabs(self):
+        """Открывает вкладки из очереди до заполнения пула"""
+        while self.queue and len(self.active) < self.max_tabs:
+            url = self.queue.pop(0)
+            handles_before = set(self.driver.window_handles)
+            self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+            new_handles = set(self.driver.window_handles) - handles_before
+            if not new_handles:
+                print(f"⚠️ Не удалось открыть вкладку для {url}")
+                self.save_result(url, None)
+                continue
+            self.active[new_handles.pop()] = (url, time.monotonic())
+
+    def poll(self):
+        """Один обход вкладок; возвращает число страниц, загруженных за этот обход"""
+        finished = 0
+        try:
+            self.open_tabs()
+
+            for handle, (url, started_at) in list(self.active.items()):
+                data = None
+                try:
+                    self.driver.switch_to.window(handle)
+                    data = self.driver.execute_script(self.extract_script)
+                except Exception as e:
+                    print(f"⚠️ Ошибка чтения вкладки {url}: {e}")
+
+                ready = bool(data and data.get('ready'))
+                if not ready:
+                    if time.monotonic() - started_at <= self.page_timeout:
+                        continue
+                    print(f"⏰ Страница не загрузилась за {self.page_timeout} с: {url}")
+
+                self.save_result(url, data)
+                del self.active[handle]
+                finished += 1
+                try:
+                    self.driver.close()
+                except Exception:
+                    pass
+
+            self.open_tabs()
+        finally:
+            self.driver.switch_to.window(self.home_window)
+
+        return finished
+
+    def result(self, url, timeout=None):
+        """Результат для URL; пока он не готов, продолжаем обходить вкладки"""
+        deadline = time.monotonic() + (timeout or self.page_timeout * 2)
+        while url not in self.results:
+            if url not in self.queue and not any(active_url == url for active_url, _ in self.active.values()):
+                return None
+            if time.monotonic() > deadline:
+                return None
+            if not self.poll():
+                time.sleep(self.poll_interval)
+        return self.results[url]
+
+    def drain(self, timeout=None):
+        """Дожидается загрузки всех поставленных в очередь страниц"""
+        deadline = time.monotonic() + (timeout or self.page_timeout * 2)
+        while self.pending and time.monotonic() < deadline:
+            if not self.poll():
+                time.sleep(self.poll_interval)
+        return self.results
+
+    def close(self):
+        """Закрывает все вкладки пула и возвращается на исходную"""
+        for handle in list(self.active):
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.active.clear()
+        self.queue.clear()
+        try:
+            self.driver.switch_to.window(self.home_window)
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,108 @@
+import time
+
+from parsing.resource_policy import apply_resource_policy
+
+
+# Сколько карточек с ценой уже отрисовано на странице вкладки
+CARD_PROBE_JS = """
+var cardSelector = arguments[0];
+var priceSelector = arguments[1];
+var cards = document.querySelectorAll(cardSelector);
+var priced = 0;
+for (var i = 0; i < cards.length; i++) {
+    var price = priceSelector ? cards[i].querySelector(priceSelector) : cards[i];
+    if (price && /\\d/.test(price.textContent || '')) {
+        priced++;
+    }
+}
+return {cards: priced, title: document.title, url: location.href};
+"""
+
+
+def probe_cards(driver, card_selector, price_selector=None):
+    try:
+        return driver.execute_script(CARD_PROBE_JS, card_selector, price_selector)
+    except Exception:
+        return None
+
+
+def close_tabs(driver, handles):
+    for handle in handles:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+
+
+def open_tab(driver, url, resource_policy=None):
+    """Открывает url в новой вкладке, не дожидаясь загрузки; возвращает дескриптор вкладки или None
+
+    Блокировка ресурсов через CDP действует только на вкладку, поэтому с resource_policy
+    вкладка сначала открывается пустой, получает политику и только потом переходит на url.
+    """
+    handles_before = set(driver.window_handles)
+    driver.execute_script("window.open(arguments[0], '_blank');", 'about:blank' if resource_policy else url)
+    new_handles = set(driver.window_handles) - handles_before
+    if not new_handles:
+        return None
+
+    handle = new_handles.pop()
+    if resource_policy:
+        driver.switch_to.window(handle)
+        apply_resource_policy(driver, resource_policy)
+        driver.execute_script("window.location.href = arguments[0];", url)
+    return handle
+
+
+def race_urls(driver, urls, card_selector, price_selector=None, min_cards=1, title_words=(), timeout=30,
+              poll_interval=0.3, resource_policy=None):
+    """Открывает адреса-кандидаты одновременно, каждый в своей вкладке, и оставляет первый рабочий
+
+    urls - адреса в порядке приоритета. Рабочий адрес - тот, на котором отрисовано не меньше
+    min_cards карточек с ценой (и в заголовке есть одно из title_words, если они заданы).
+    Если за один обход готовы несколько вкладок, выигрывает более приоритетная.
+    Остальные вкладки (и исходная) закрываются, драйвер остается на вкладке победителя.
+    resource_policy - политика загрузки ресурсов (см. parsing.resource_policy), которая задается
+    каждой вкладке до начала загрузки.
+    Возвращает адрес победителя или None - тогда драйвер на исходной вкладке.
+    """
+    home_window = driver.current_window_handle
+    tabs = []
+    for url in urls:
+        handle = open_tab(driver, url, resource_policy)
+        if handle:
+            tabs.append((handle, url))
+        else:
+            print(f"⚠️ Не удалось открыть вкладку для {url}")
+
+    start_time = time.monotonic()
+    winner = None
+    while tabs and winner is None and time.monotonic() - start_time < timeout:
+        for handle, url in tabs:
+            try:
+                driver.switch_to.window(handle)
+            except Exception:
+                continue
+            state = probe_cards(driver, card_selector, price_selector)
+            if not state or state['cards'] < min_cards:
+                continue
+            if title_words and not any(word in state['title'].lower() for word in title_words):
+                continue
+            winner = (handle, url)
+            break
+        else:
+            time.sleep(poll_interval)
+
+    if winner is None:
+        print(f"❌ Ни один из {len(urls)} адресов не показал карточки за {timeout} с")
+        close_tabs(driver, [handle for handle, _ in tabs])
+        driver.switch_to.window(home_window)
+        return None
+
+    handle, url = winner
+    close_tabs(driver, [other for other, _ in tabs if other != handle] + [home_window])
+    driver.switch_to.window(handle)
+    print(f"🏁 Выбран адрес {url} (вариант {urls.index(url) + 1} из {len(urls)}), "
+          f"первые карточки через {time.monotonic() - start_time:.1f} с")
+    return url
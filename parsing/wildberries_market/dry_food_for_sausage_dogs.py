@@ -9,12 +9,49 @@ import time
 import re
 import random
 import os
+import argparse
 import json
 from datetime import datetime
 
-
-def setup_driver():
-    """Настройка драйвера для Wildberries"""
+from parsing.card_context import CardContext, card_memo, card_remember, refresh_card, unwrap_element
+from parsing.card_watch import wait_for_new_cards
+from parsing.scroll_state import ScrollProgress, restore_scroll_depth
+from parsing.wildberries_market.wildberries_cards import (
+    WILDBERRIES_CARD_SELECTOR, WILDBERRIES_CARD_SELECTORS, WILDBERRIES_PRICE_SELECTOR, WILDBERRIES_HEALTH_FIELDS,
+    extract_wildberries_cards, extract_wildberries_cards_snapshot, extract_wildberries_element_ids,
+    is_wildberries_card_loaded
+)
+try:
+    # aiohttp нужен только для запросов к JSON-адресам Wildberries
+    from parsing.wildberries_market.wildberries_api import (
+        enrich_wildberries_cards, fetch_wildberries_api_cards, fetch_wildberries_card_details
+    )
+except ImportError:
+    enrich_wildberries_cards = fetch_wildberries_api_cards = fetch_wildberries_card_details = None
+from parsing.wildberries_market.wildberries_catalog import WildberriesCatalogCapture, accept_new_catalog_cards
+from parsing.wildberries_market.wildberries_product_pages import (
+    create_wildberries_product_fetcher, wildberries_product_url, build_wildberries_page_name
+)
+from parsing.product_cache import ProductCache
+from parsing.driver_pool import acquire_driver, release_driver
+from parsing.resource_policy import apply_resource_options, apply_resource_policy
+from parsing.rate_control import get_rate_controller
+from parsing.selector_health import SelectorDriftError, SelectorHealthCheck
+from parsing.checkpoint import (
+    append_checkpoint, read_checkpoint, clear_checkpoint, resume_checkpoint, finish_checkpoint,
+    checkpoint_filename
+)
+
+# Задача сбора: по ней называется журнал контрольных точек и сверяется --resume
+CHECKPOINT_JOB = 'wildberries_dog_food'
+CHECKPOINT_FILE = checkpoint_filename(CHECKPOINT_JOB)
+
+
+def setup_driver(resource_policy='wildberries'):
+    """Настройка драйвера для Wildberries
+
+    resource_policy - какие ресурсы не загружать (см. parsing.resource_policy; None - загружать все)
+    """
     options = Options()
 
     # Базовые настройки
@@ -35,7 +72,14 @@ def setup_driver():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
 
+    # Журнал производительности: по нему темп запросов замечает ответы HTTP 429
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Картинки, шрифты, видео и счетчики карточкам не нужны
+    apply_resource_options(options, resource_policy)
+
     driver = webdriver.Chrome(options=options)
+    apply_resource_policy(driver, resource_policy)
 
     # Применяем stealth режим
     stealth(driver,
@@ -652,7 +696,7 @@ def debug_element_text(element, element_index):
         print(f"Ошибка отладки элемента: {e}")
 
 
-def extract_wildberries_product_name(element, driver=None):
+def extract_wildberries_product_name(element, driver=None, fetcher=None, product_url=None):
     """Извлечение названия товара на Wildberries с сохранением полного названия с брендом"""
     try:
         # Сохраняем оригинальный текст элемента для поиска бренда
@@ -681,7 +725,7 @@ def extract_wildberries_product_name(element, driver=None):
                     break
 
         # Пробуем сначала извлечь полное название в формате Wildberries
-        full_name = extract_wildberries_full_name(element)
+        full_name = card_memo(element, 'full_name', lambda: extract_wildberries_full_name(element))
         if full_name:
             return full_name
 
@@ -771,8 +815,13 @@ def extract_wildberries_product_name(element, driver=None):
         # Получаем полное название если доступен драйвер
         full_name = None
         if driver and base_name:
-            print("🔄 Пробуем получить полное название со страницы товара...")
-            full_name = get_full_product_name(driver, element)
+            if fetcher:
+                # Страница товара уже грузится в пуле вкладок - забираем готовый результат
+                if product_url:
+                    full_name = build_wildberries_page_name(fetcher.result(product_url), ['корм', 'такса'])
+            else:
+                print("🔄 Пробуем получить полное название со страницы товара...")
+                full_name = get_full_product_name(driver, element)
 
         # Выбираем лучшее название
         final_name = None
@@ -897,7 +946,7 @@ def extract_wildberries_price(element, driver):
         return null;
         """
 
-        price = driver.execute_script(js_script, element)
+        price = driver.execute_script(js_script, unwrap_element(element))
         if price:
             print(f"Цена из JavaScript: {price}")
             return price
@@ -971,59 +1020,46 @@ def extract_wildberries_reviews(element, driver):
         return 0
 
 
-def save_to_temp_file(data, filename='temp_wildberries_dog_food.json'):
-    """Сохраняет данные во временный файл"""
-    try:
-        existing_data = []
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-
-        existing_data.extend(data)
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+def save_to_temp_file(data, filename=CHECKPOINT_FILE, progress=None):
+    """Дописывает данные в журнал контрольных точек (NDJSON), не перечитывая его
 
-        print(f"💾 Сохранено {len(data)} записей во временный файл. Всего: {len(existing_data)}")
-        return True
-    except Exception as e:
-        print(f"❌ Ошибка сохранения во временный файл: {e}")
-        return False
+    progress - состояние прокрутки (ScrollProgress), сохраняется для --resume
+    """
+    return append_checkpoint(filename, data, progress.to_state() if progress else None)
 
 
-def load_from_temp_file(filename='temp_wildberries_dog_food.json'):
-    """Загружает данные из временного файла"""
+def load_from_temp_file(filename=CHECKPOINT_FILE):
+    """Загружает данные из журнала контрольных точек"""
     try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        return read_checkpoint(filename)
     except Exception as e:
-        print(f"❌ Ошибка загрузки из временного файл: {e}")
+        print(f"❌ Ошибка загрузки из временного файла: {e}")
         return []
 
 
-def clear_temp_file(filename='temp_wildberries_dog_food.json'):
-    """Очищает временный файл"""
+def clear_temp_file(filename=CHECKPOINT_FILE):
+    """Очищает журнал контрольных точек"""
     try:
-        if os.path.exists(filename):
-            os.remove(filename)
-            print("🗑️ Временный файл очищен")
+        clear_checkpoint(filename)
     except Exception as e:
         print(f"❌ Ошибка очистки временного файла: {e}")
 
 
-def find_wildberries_products(driver):
-    """Поиск товаров на Wildberries с улучшенной фильтрацией"""
+def find_wildberries_products(driver, wait=True):
+    """Поиск товаров на Wildberries с улучшенной фильтрацией
+
+    wait=False - не ждать появления карточек (вызывающий код уже дождался их через wait_for_new_cards)
+    """
     print("🔍 Ищем товары на странице...")
 
     # Ждем загрузки товаров
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".product-card, .card, [data-nm-id]"))
-        )
-    except:
-        print("⏳ Товары загружаются медленно...")
+    if wait:
+        try:
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-card, .card, [data-nm-id]"))
+            )
+        except:
+            print("⏳ Товары загружаются медленно...")
 
     # Селекторы для товаров Wildberries (обновленные)
     product_selectors = [
@@ -1045,15 +1081,18 @@ def find_wildberries_products(driver):
 
             for element in elements:
                 try:
+                    # Текст и атрибуты карточки читаются один раз и переиспользуются при извлечении данных
+                    card = CardContext(element)
+
                     # Пробуем извлечь название для проверки
-                    name = extract_wildberries_product_name(element)
+                    name = card.memo('name', lambda: extract_wildberries_product_name(card))
 
                     # Проверяем, что это корм для такс и название не повторяется
                     if (name != "Неизвестный корм для собак" and
                             name not in seen_names and
                             len(name) > 10):
                         seen_names.add(name)
-                        products.append(element)
+                        products.append(card)
                         print(f"✅ Добавлен корм для такс: {name[:80]}...")
 
                 except Exception as e:
@@ -1068,25 +1107,62 @@ def find_wildberries_products(driver):
     return products
 
 
-def extract_wildberries_products_data(driver, products, existing_count=0):
+def extract_wildberries_products_data(driver, products, existing_count=0, fetcher=None):
     """Извлечение данных из товаров Wildberries с улучшенным логированием"""
     products_data = []
-
-    for i, product in enumerate(products, existing_count + 1):
+    pacer = get_rate_controller('wildberries')
+
+    # Для карточек без полного названия бренд и название берем пачкой из API карточек;
+    # если есть пул вкладок, оставшиеся страницы товаров сразу ставим в его очередь,
+    # чтобы они грузились параллельно с обработкой выдачи
+    product_urls = [None] * len(products)
+    if fetcher or fetch_wildberries_card_details:
+        nm_ids = extract_wildberries_element_ids(driver, products)
+        missing = [index for index, product in enumerate(products)
+                   if not card_memo(product, 'full_name', lambda: extract_wildberries_full_name(product))]
+
+        details = {}
+        if missing and fetch_wildberries_card_details:
+            try:
+                details = fetch_wildberries_card_details([nm_ids[index] for index in missing])
+            except Exception as e:
+                print(f"⚠️ Ошибка получения данных карточек через API: {e}")
+
+        for index in missing:
+            card = details.get(str(nm_ids[index]))
+            if card and card['name']:
+                card_remember(products[index], 'full_name', clean_product_name(card['name']))
+            elif fetcher:
+                product_urls[index] = wildberries_product_url(nm_ids[index])
+                fetcher.submit(product_urls[index])
+
+    for i, (product, product_url) in enumerate(zip(products, product_urls), existing_count + 1):
         try:
+            if fetcher:
+                fetcher.poll()
+
             print(f"\n{'=' * 60}")
             print(f"🛒 Обрабатываем товар {i}/{len(products)}")
             print(f"{'=' * 60}")
 
             # Прокручиваем к товару
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", product)
-            human_like_delay(1, 2)
+            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                                  unwrap_element(product))
+            pacer.pace('card')
+            # Цена и название догружаются при прокрутке: если до нее их в карточке не было, кэш устарел
+            refresh_card(product, is_loaded=is_wildberries_card_loaded)
 
             # Отладочная информация
             debug_element_text(product, i)
 
             # Извлекаем информацию (передаем driver для получения полного названия)
-            name = extract_wildberries_product_name(product, driver)
+            if fetcher and not product_url:
+                # Страница товара не нужна - полное название есть в карточке или пришло из API,
+                # иначе берем название, посчитанное при поиске карточек
+                name = (card_memo(product, 'full_name', lambda: extract_wildberries_full_name(product)) or
+                        card_memo(product, 'name', lambda: extract_wildberries_product_name(product)))
+            else:
+                name = extract_wildberries_product_name(product, driver, fetcher, product_url)
             price = extract_wildberries_price(product, driver)
 
             print(f"📝 Название: {name}")
@@ -1110,54 +1186,148 @@ def extract_wildberries_products_data(driver, products, existing_count=0):
     return products_data
 
 
-def scroll_wildberries_page(driver, max_scrolls=2):
-    """Прокрутка страницы Wildberries с обнаружением товаров"""
+def extract_wildberries_products_data_from_cards(cards, existing_count=0):
+    """Построение записей из уже извлеченных карточек (JavaScript или снимок страницы)"""
+    products_data = []
+
+    for i, card in enumerate(cards, existing_count + 1):
+        try:
+            name = clean_product_name(card['name']) if card['name'] else None
+            price = card['price']
+
+            if name and price and 100 <= price <= 10000:  # Диапазон цен для кормов
+                product_data = {
+                    'Название товара': name,
+                    'Цена': price,
+                    'Источник': 'Wildberries'
+                }
+                products_data.append(product_data)
+                print(f"✅ [{i}] {name[:80]}... - {price} руб.")
+            else:
+                print(f"❌ [{i}] ПРОПУСК: Неполные данные ({card['nm_id']})")
+
+        except Exception as e:
+            print(f"⚠️ Ошибка обработки карточки {i}: {e}")
+            continue
+
+    return products_data
+
+
+def scroll_wildberries_page(driver, max_scrolls=2, extraction_mode='xhr', progress=None, products_data=None,
+                            max_tabs=4, product_cache_file='product_cache.sqlite'):
+    """Прокрутка страницы Wildberries с обнаружением товаров
+
+    extraction_mode='xhr' - карточки из JSON ответов каталога, перехваченных через журнал
+    производительности Chrome (пока ни одного ответа не перехвачено - как 'js'),
+    extraction_mode='js' - все карточки одним вызовом JavaScript,
+    extraction_mode='snapshot' - разбор одного снимка page_source через lxml,
+    extraction_mode='elements' - старый режим с обходом каждого элемента
+    (страницы товаров для полных названий грузятся параллельно в max_tabs вкладках
+    и берутся из кэша product_cache_file, если уже открывались; None - без кэша)
+
+    progress и products_data передаются при возобновлении сбора из журнала
+    """
     print(f"📜 Начинаем прокрутку страницы Wildberries... (максимум {max_scrolls} прокрутки)")
 
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    scroll_attempts = 0
+    all_products_data = list(products_data or [])
+    # Уже обработанные карточки (по nm-id) - на каждой прокрутке берем только новые
+    progress = progress or ScrollProgress(job=CHECKPOINT_JOB)
+    progress.url = driver.current_url
+    temp_filename = CHECKPOINT_FILE
+
+    # При возобновлении подгружаем ленту до места остановки
+    restore_scroll_depth(driver, progress.scroll_count)
+
+    # После первой страницы нового сбора сверяем селекторы с базовыми значениями
+    health = None if progress.scroll_count else SelectorHealthCheck('wildberries', WILDBERRIES_CARD_SELECTORS,
+                                                                    WILDBERRIES_HEALTH_FIELDS)
+
+    scroll_attempts = progress.scroll_count
     no_new_content_count = 0
     max_no_new_content = 2
 
-    all_products_data = []
-    temp_filename = 'temp_wildberries_dog_food.json'
+    # Паузы задает контроллер темпа: начинает быстро и замедляется при признаках блокировки
+    pacer = get_rate_controller('wildberries')
+
+    catalog_capture = WildberriesCatalogCapture(driver) if extraction_mode == 'xhr' else None
+
+    fetcher = None
+    product_cache = None
+    if extraction_mode == 'elements':
+        product_cache = ProductCache(product_cache_file) if product_cache_file else None
+        fetcher = create_wildberries_product_fetcher(driver, max_tabs, cache=product_cache)
 
     while scroll_attempts < max_scrolls and no_new_content_count < max_no_new_content:
+        pacer.pace('scroll')
+
         # Прокручиваем вниз
         scroll_height = random.randint(800, 1200)
         driver.execute_script(f"window.scrollBy(0, {scroll_height});")
 
-        human_like_delay(2, 4)
+        # Ждем новые карточки с ценами: дальше идем, как только сайт их отрисовал или лента затихла
+        cards_state = wait_for_new_cards(driver, WILDBERRIES_CARD_SELECTOR, WILDBERRIES_PRICE_SELECTOR)
+        print(f"⏱️ Новых карточек на странице: {cards_state['new']} (ожидание {cards_state['waited']} с)")
         scroll_attempts += 1
-
-        # Проверяем высоту страницы
-        new_height = driver.execute_script("return document.body.scrollHeight")
-
-        # Ищем товары после прокрутки
-        current_products = find_wildberries_products(driver)
-        current_count = len(current_products)
-
-        print(f"📊 После прокрутки {scroll_attempts}: найдено {current_count} товаров")
-
-        # Собираем данные с новых товаров
-        if current_products:
-            new_data = extract_wildberries_products_data(driver, current_products, len(all_products_data))
-            if new_data:
-                all_products_data.extend(new_data)
-                # Сохраняем во временный файл
-                save_to_temp_file(new_data, temp_filename)
-                print(f"💾 Сразу сохранено {len(new_data)} новых товаров")
-
-        # Проверяем появление нового контента
-        if new_height == last_height:
+        progress.scroll_count = scroll_attempts
+
+        # Собираем данные с товаров
+        log_entries = None
+        if extraction_mode in ('xhr', 'js', 'snapshot'):
+            if extraction_mode == 'xhr':
+                # Журнал читается один раз за прокрутку: его же проверяет контроллер темпа
+                log_entries = catalog_capture.read_log()
+                cards = accept_new_catalog_cards(catalog_capture.process(log_entries), progress)
+                if not catalog_capture.responses:
+                    print("⚠️ Ответы каталога не перехвачены, берем карточки из DOM")
+                    cards = extract_wildberries_cards(driver, progress)
+            elif extraction_mode == 'js':
+                cards = extract_wildberries_cards(driver, progress)
+            else:
+                cards = extract_wildberries_cards_snapshot(driver, progress)
+            # Карточки без бренда или названия дополняем пачкой из API карточек
+            if enrich_wildberries_cards:
+                enrich_wildberries_cards(cards)
+            new_data = extract_wildberries_products_data_from_cards(cards, len(all_products_data))
+            print(f"📊 После прокрутки {scroll_attempts}: извлечено {len(new_data)} новых товаров")
+        else:
+            # Ищем товары после прокрутки
+            current_products = find_wildberries_products(driver, wait=False)
+            current_count = len(current_products)
+
+            # Отбрасываем карточки, обработанные на прошлых прокрутках
+            current_ids = extract_wildberries_element_ids(driver, current_products)
+            new_products = []
+            for product, nm_id in zip(current_products, current_ids):
+                if not progress.is_seen(nm_id):
+                    progress.mark_seen(nm_id)
+                    new_products.append(product)
+            current_products = new_products
+
+            print(f"📊 После прокрутки {scroll_attempts}: найдено {current_count} товаров, новых {len(current_products)}")
+
+            new_data = []
+            if current_products:
+                new_data = extract_wildberries_products_data(driver, current_products, len(all_products_data), fetcher)
+
+        if new_data:
+            all_products_data.extend(new_data)
+            # Сохраняем во временный файл
+            save_to_temp_file(new_data, temp_filename, progress)
+            print(f"💾 Сразу сохранено {len(new_data)} новых товаров")
+
+        # Первая страница без товаров - разметка изменилась, дальше не крутим
+        if health and health.due(scroll_attempts):
+            health.check(driver, len(all_products_data))
+
+        # Капча, HTTP 429 или пустая выдача - замедляемся, иначе ускоряемся
+        pacer.check(driver, empty_listing=not progress.seen_ids, log_entries=log_entries)
+
+        # Проверяем, не кончилась ли лента
+        if cards_state['ended']:
             no_new_content_count += 1
             print(f"⚠️ Нет нового контента ({no_new_content_count}/{max_no_new_content})")
         else:
             no_new_content_count = 0
-            last_height = new_height
-
-        # Случайная пауза
-        human_like_delay(1, 2)
 
         # Пытаемся найти кнопку "Показать еще"
         try:
@@ -1174,24 +1344,47 @@ def scroll_wildberries_page(driver, max_scrolls=2):
                     if button.is_displayed():
                         driver.execute_script("arguments[0].click();", button)
                         print("🔘 Нажата кнопка 'Показать еще'")
-                        human_like_delay(3, 5)
+                        pacer.pace('click')
                         break
                 except:
                     continue
         except:
             pass
 
+    if catalog_capture:
+        print(f"📡 Перехвачено ответов каталога: {catalog_capture.responses}, "
+              f"товаров в них: {catalog_capture.products}")
+    if fetcher:
+        fetcher.close()
+    if product_cache:
+        product_cache.close()
+
     print(f"✅ Прокрутка завершена. Всего прокруток: {scroll_attempts}")
     return all_products_data
 
 
-def parse_wildberries_dog_food():
-    """Основная функция парсинга кормов для такс с Wildberries"""
-    driver = setup_driver()
-    temp_filename = 'temp_wildberries_dog_food.json'
+def parse_wildberries_dog_food(resume=False, pool=None, fetch_mode='browser'):
+    """Основная функция парсинга кормов для такс с Wildberries
+
+    resume=True - продолжить прерванный сбор с последней контрольной точки журнала
+    pool - пул драйверов (DriverPool); без него создается и закрывается свой драйвер
+    fetch_mode='api' - без браузера, через JSON-адреса каталога Wildberries (resume и pool не нужны);
+    выдача собирается целиком по полосам цен
+    """
+    if fetch_mode == 'api':
+        if fetch_wildberries_api_cards is None:
+            raise ImportError("Для fetch_mode='api' нужен пакет aiohttp")
+        cards = fetch_wildberries_api_cards(search_query='сухой корм для таксы', price_range=(100, 100000))
+        return extract_wildberries_products_data_from_cards(cards)
+
+    driver = acquire_driver(setup_driver, pool)
+    pacer = get_rate_controller('wildberries')
+    temp_filename = CHECKPOINT_FILE
 
-    # Очищаем временный файл перед началом
-    clear_temp_file(temp_filename)
+    resumed_data, progress = resume_checkpoint(temp_filename, job=CHECKPOINT_JOB) if resume else ([], None)
+    if progress is None:
+        # Очищаем временный файл перед началом
+        clear_temp_file(temp_filename)
 
     all_data = []
 
@@ -1199,10 +1392,14 @@ def parse_wildberries_dog_food():
         # URL для поиска через поисковую строку Wildberries
         search_url = "https://www.wildberries.ru/catalog/0/search.aspx?search=%D1%81%D1%83%D1%85%D0%BE%D0%B9%20%D0%BA%D0%BE%D1%80%D0%BC%20%D0%B4%D0%BB%D1%8F%20%D1%82%D0%B0%D0%BA%D1%81%D1%8B"
 
+        # При возобновлении открываем ту страницу, с которой шел сбор
+        if progress and progress.url:
+            search_url = progress.url
+
         print(f"🌐 Открываем Wildberries через поиск: {search_url}")
         driver.get(search_url)
         wait_for_page_load(driver)
-        human_like_delay(5, 8)
+        pacer.pace('page')
 
         # Закрываем попапы
         close_wildberries_popups(driver)
@@ -1215,17 +1412,25 @@ def parse_wildberries_dog_food():
             print("⚠️ Возможно неправильная страница, проверяем результаты поиска...")
 
         # Используем улучшенную прокрутку (только 2 прокрутки)
-        all_data = scroll_wildberries_page(driver, max_scrolls=2)
+        all_data = scroll_wildberries_page(driver, max_scrolls=2, progress=progress, products_data=resumed_data)
+        # Прокрутка дошла до конца - журнал не нужно возобновлять
+        finish_checkpoint(temp_filename, CHECKPOINT_JOB)
 
         print(f"\n📊 Парсинг завершен. Всего собрано: {len(all_data)} кормов для такс")
 
+    except SelectorDriftError:
+        # Сбор прерывается целиком: отчет о селекторах уже напечатан и уходит вызывающему коду
+        driver.save_screenshot('wildberries_error.png')
+        raise
     except Exception as e:
         print(f"🚨 Критическая ошибка: {e}")
+        print(f"💡 Собранное сохранено в {temp_filename}, продолжить сбор: --resume")
         import traceback
         traceback.print_exc()
         driver.save_screenshot('wildberries_error.png')
     finally:
-        driver.quit()
+        pacer.report()
+        release_driver(driver, pool)
 
     return all_data
 
@@ -1282,8 +1487,8 @@ def save_to_excel(data, filename_base='wildberries_dog_food'):
     print(f"💾 Сохранено {len(df_clean)} кормов для такс (без дубликатов) в файл {main_filename}")
 
     # Удаляем временный файл
-    if os.path.exists('temp_wildberries_dog_food.json'):
-        os.remove('temp_wildberries_dog_food.json')
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
         print("🗑️ Временный файл удален")
 
     # Для вывода в консоль используем форматирование
@@ -1310,13 +1515,20 @@ def save_to_excel(data, filename_base='wildberries_dog_food'):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванный сбор с последней контрольной точки журнала')
+    parser.add_argument('--fetch-mode', choices=['browser', 'api'], default='browser',
+                        help='api - без браузера, через JSON-адреса каталога')
+    args = parser.parse_args()
+
     print("🚀 Запускаем парсинг кормов для такс с Wildberries...")
     print("⏳ Ищем именно СУХИЕ КОРМА для ТАКС (исключаем другие товары для животных)...")
     print("=" * 80)
 
     start_time = time.time()
 
-    dog_food_data = parse_wildberries_dog_food()
+    dog_food_data = parse_wildberries_dog_food(resume=args.resume, fetch_mode=args.fetch_mode)
 
     end_time = time.time()
     execution_time = end_time - start_time
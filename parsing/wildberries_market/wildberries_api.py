@@ -0,0 +1,301 @@
+import asyncio
+import random
+
+import aiohttp
+
+from parsing.price_shards import PRICE_RANGE_PARAMS, PriceShardPlanner
+from parsing.wildberries_market.wildberries_cards import build_wildberries_card_name
+from parsing.wildberries_market.wildberries_catalog import normalize_wildberries_catalog_product
+
+
+# Публичные JSON-адреса, которыми пользуется сама страница Wildberries.
+# Базовые адреса можно подменить (например, на локальный сервер с записанными ответами).
+WILDBERRIES_API_URLS = {
+    'search': 'https://search.wb.ru/exactmatch/ru/common/v4/search',
+    'catalog': 'https://catalog.wb.ru/catalog/{shard}/v2/catalog',
+    'detail': 'https://card.wb.ru/cards/v2/detail',
+    'menu': 'https://static-basket-01.wbbasket.ru/vol0/data/main-menu-ru-ru-v3.json'
+}
+
+WILDBERRIES_API_PARAMS = {
+    'appType': 1,
+    'curr': 'rub',
+    'dest': -1257786,
+    'sort': 'popular',
+    'spp': 30
+}
+
+WILDBERRIES_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Товаров на одной странице выдачи API
+WILDBERRIES_API_PAGE_SIZE = 100
+
+
+def find_wildberries_menu_node(nodes, path):
+    """Узел меню каталога с адресом path (ищется рекурсивно по childs)"""
+    for node in nodes or []:
+        if node.get('url') == path:
+            return node
+        found = find_wildberries_menu_node(node.get('childs'), path)
+        if found:
+            return found
+    return None
+
+
+def extract_wildberries_api_products(data):
+    """Товары из ответа поиска или каталога (data.products или products)"""
+    if not isinstance(data, dict):
+        return []
+    return (data.get('data') or {}).get('products') or data.get('products') or []
+
+
+class WildberriesApiClient:
+    """Клиент JSON-адресов Wildberries без браузера
+
+    Одна сессия aiohttp на все запросы, не больше concurrency запросов одновременно,
+    повтор с нарастающей паузой (retry_delay * номер попытки) при 429/5xx и сетевых ошибках.
+    Страницы, не загрузившиеся и после повторов, копятся в failed_pages (выдача при этом не обрывается).
+    Возвращает карточки в том же виде, что и normalize_wildberries_card.
+    С price_range=(от, до) выдача делится на полосы цен (фильтр priceU), каждая из которых
+    помещается в max_pages страниц, и полосы загружаются параллельно.
+    """
+
+    def __init__(self, concurrency=4, timeout=20, retries=3, api_urls=None, retry_delay=2):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.api_urls = dict(WILDBERRIES_API_URLS, **(api_urls or {}))
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+        self.requests = 0
+        self.failed_pages = []
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            headers=WILDBERRIES_API_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.session.close()
+
+    async def fetch_json(self, url, params=None):
+        """JSON по адресу; None, если все попытки неудачны"""
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self.semaphore:
+                    self.requests += 1
+                    async with self.session.get(url, params=params) as response:
+                        if response.status == 200:
+                            # Wildberries отдает JSON с типом text/plain
+                            return await response.json(content_type=None)
+                        if response.status not in RETRY_STATUSES:
+                            print(f"❌ {url}: HTTP {response.status}")
+                            return None
+                        print(f"⚠️ {url}: HTTP {response.status}, попытка {attempt}/{self.retries}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"⚠️ {url}: {e}, попытка {attempt}/{self.retries}")
+
+            if attempt < self.retries:
+                await asyncio.sleep(attempt * self.retry_delay + random.uniform(0, self.retry_delay / 2))
+        return None
+
+    async def fetch_pages(self, url, params, max_pages):
+        """Страницы выдачи пачками по concurrency до первой пустой страницы
+
+        Конец выдачи - только страница без товаров; страница, не загрузившаяся после всех повторов,
+        пропускается с предупреждением и попадает в failed_pages.
+        """
+        cards = []
+        seen = set()
+        failed = []
+        page = 1
+
+        while page <= max_pages:
+            pages = range(page, min(page + self.concurrency, max_pages + 1))
+            results = await asyncio.gather(*[
+                self.fetch_json(url, dict(params, page=page_number)) for page_number in pages
+            ])
+
+            finished = False
+            for page_number, data in zip(pages, results):
+                if data is None:
+                    failed.append(page_number)
+                    print(f"❌ Страница {page_number} не загрузилась после {self.retries} попыток, пропускаем")
+                    continue
+                products = extract_wildberries_api_products(data)
+                if not products:
+                    finished = True
+                    break
+                for product in products:
+                    card = normalize_wildberries_catalog_product(product)
+                    if card['nm_id'] and card['nm_id'] not in seen:
+                        seen.add(card['nm_id'])
+                        cards.append(card)
+                print(f"📄 Страница {page_number}: {len(products)} товаров")
+
+            if finished:
+                break
+            page += len(pages)
+
+        if failed:
+            self.failed_pages.extend((url, page_number) for page_number in failed)
+            print(f"⚠️ Не загружены страницы {failed}: выдача может быть неполной")
+        return cards
+
+    async def count(self, url, params):
+        """Число товаров выдачи: data.total, а без него - товары первой страницы, если она неполная"""
+        data = await self.fetch_json(url, dict(params, page=1))
+        if not isinstance(data, dict):
+            return None
+        total = (data.get('data') or {}).get('total') or data.get('total')
+        if total is not None:
+            return int(total)
+        products = extract_wildberries_api_products(data)
+        return len(products) if len(products) < WILDBERRIES_API_PAGE_SIZE else None
+
+    async def fetch_price_shards(self, url, params, price_range, max_pages):
+        """Выдача по полосам цен: полосы, не помещающиеся в max_pages страниц, делятся надвое"""
+        def band_params(low, high):
+            return dict(params, **PRICE_RANGE_PARAMS['wildberries'](low, high))
+
+        planner = PriceShardPlanner(*price_range, max_results=max_pages * WILDBERRIES_API_PAGE_SIZE)
+        while planner.pending:
+            counts = await asyncio.gather(*[self.count(url, band_params(low, high)) for low, high in planner.pending])
+            planner.update(counts)
+        planner.report()
+
+        results = await asyncio.gather(*[
+            self.fetch_pages(url, band_params(low, high), max_pages) for low, high, _ in planner.shards
+        ])
+
+        # Товар на границе полос может попасть в обе
+        cards = {}
+        for shard_cards in results:
+            for card in shard_cards:
+                cards.setdefault(card['nm_id'], card)
+        return list(cards.values())
+
+    async def fetch_listing(self, url, params, max_pages, price_range=None):
+        if price_range:
+            return await self.fetch_price_shards(url, params, price_range, max_pages)
+        return await self.fetch_pages(url, params, max_pages)
+
+    async def search(self, query, max_pages=10, price_range=None):
+        """Карточки поисковой выдачи (аналог search.aspx?search=...)"""
+        params = dict(WILDBERRIES_API_PARAMS, query=query, resultset='catalog')
+        return await self.fetch_listing(self.api_urls['search'], params, max_pages, price_range)
+
+    async def category(self, path, max_pages=10, price_range=None):
+        """Карточки категории по ее адресу на сайте, например /catalog/bitovaya-tehnika/kuhnya/plity/plity-gazovye"""
+        menu = await self.fetch_json(self.api_urls['menu'])
+        node = find_wildberries_menu_node(menu, path)
+        if not node or not node.get('shard') or not node.get('query'):
+            print(f"❌ Категория {path} не найдена в меню каталога")
+            return []
+
+        url = self.api_urls['catalog'].format(shard=node['shard'])
+        params = dict(WILDBERRIES_API_PARAMS)
+        for pair in node['query'].split('&'):
+            key, _, value = pair.partition('=')
+            params[key] = value
+        return await self.fetch_listing(url, params, max_pages, price_range)
+
+    async def details(self, nm_ids, batch_size=100):
+        """Карточки по артикулам: nm=1;2;3 - до batch_size артикулов за запрос, пачки параллельно"""
+        nm_ids = list(dict.fromkeys(str(nm_id) for nm_id in nm_ids if nm_id))
+        batches = [nm_ids[start:start + batch_size] for start in range(0, len(nm_ids), batch_size)]
+        results = await asyncio.gather(*[
+            self.fetch_json(self.api_urls['detail'], dict(WILDBERRIES_API_PARAMS, nm=';'.join(batch)))
+            for batch in batches
+        ])
+
+        cards = {}
+        for data in results:
+            for product in extract_wildberries_api_products(data):
+                card = normalize_wildberries_catalog_product(product)
+                if card['nm_id']:
+                    cards[card['nm_id']] = card
+        return cards
+
+
+async def collect_wildberries_api_cards(category_path=None, search_query=None, max_pages=10, concurrency=4,
+                                        api_urls=None, price_range=None):
+    """Карточки категории, а если категория пуста или не задана - поисковой выдачи
+
+    price_range=(от, до) - собирать всю выдачу по полосам цен, а не только первые max_pages страниц
+    """
+    async with WildberriesApiClient(concurrency=concurrency, api_urls=api_urls) as client:
+        cards = await client.category(category_path, max_pages, price_range) if category_path else []
+        if not cards and search_query:
+            cards = await client.search(search_query, max_pages, price_range)
+        print(f"🌐 API Wildberries: {len(cards)} карточек за {client.requests} запросов")
+        if client.failed_pages:
+            print(f"⚠️ API Wildberries: не загружено страниц - {len(client.failed_pages)}")
+        return cards
+
+
+def fetch_wildberries_api_cards(category_path=None, search_query=None, max_pages=10, concurrency=4, api_urls=None,
+                                price_range=None):
+    """Синхронная обертка над collect_wildberries_api_cards"""
+    return asyncio.run(collect_wildberries_api_cards(category_path, search_query, max_pages, concurrency, api_urls,
+                                                     price_range))
+
+
+async def collect_wildberries_card_details(nm_ids, batch_size=100, concurrency=4, api_urls=None):
+    """Бренд, название и цена для списка артикулов: {nm_id: карточка}"""
+    async with WildberriesApiClient(concurrency=concurrency, api_urls=api_urls) as client:
+        cards = await client.details(nm_ids, batch_size)
+        print(f"🌐 Данные {len(cards)} товаров получены за {client.requests} запросов")
+        return cards
+
+
+def fetch_wildberries_card_details(nm_ids, batch_size=100, concurrency=4, api_urls=None):
+    """Синхронная обертка над collect_wildberries_card_details"""
+    if not nm_ids:
+        return {}
+    return asyncio.run(collect_wildberries_card_details(nm_ids, batch_size, concurrency, api_urls))
+
+
+def needs_wildberries_card_details(card):
+    """В карточке выдачи нет бренда или названия, а артикул есть"""
+    return bool(card.get('nm_id')) and not (card.get('brand') and card.get('title'))
+
+
+def enrich_wildberries_cards(cards, batch_size=100, concurrency=4, api_urls=None):
+    """Дополняет бренд и название карточек выдачи (JavaScript, снимок) из API карточек
+
+    Артикулы без бренда или названия запрашиваются пачками по batch_size; карточки меняются на месте.
+    """
+    missing = [card for card in cards if needs_wildberries_card_details(card)]
+    if not missing:
+        return cards
+
+    try:
+        details = fetch_wildberries_card_details([card['nm_id'] for card in missing], batch_size, concurrency,
+                                                 api_urls)
+    except Exception as e:
+        print(f"⚠️ Ошибка получения данных карточек через API: {e}")
+        return cards
+
+    enriched = 0
+    for card in missing:
+        detail = details.get(str(card['nm_id']))
+        if not detail:
+            continue
+        card['brand'] = card.get('brand') or detail['brand']
+        card['title'] = card.get('title') or detail['title']
+        card['name'] = build_wildberries_card_name(card['brand'], card['title']) or card.get('name')
+        enriched += 1
+    print(f"🏷️ Бренд и название из API: {enriched} из {len(missing)} карточек")
+    return cards
@@ -0,0 +1,269 @@
+import json
+import re
+
+from parsing.card_context import unwrap_element
+from parsing.html_snapshot import parse_html, first_text, first_attr, node_text, outermost
+
+
+WILDBERRIES_CARD_SELECTORS = ['article.product-card', 'div.product-card', '.j-card-item', '[data-nm-id]']
+
+WILDBERRIES_CARD_SELECTOR = ', '.join(WILDBERRIES_CARD_SELECTORS)
+
+WILDBERRIES_CARD_FIELDS = {
+    'title': ['.product-card__name', '.card__name', '.goods-name', '.j-card-name'],
+    'brand': ['.product-card__brand', '.product-card__brand-name', '.brand-name'],
+    'price': ['.price__lower-price', '.price-block__final-price', '.final-price',
+              '.lower-price', '.j-final-price', '.product-card__price ins'],
+    'old_price': ['.price__old-price', '.product-card__price del', 'del'],
+    'rating': ['.address-rate-mini', '.product-card__rating', '.j-rating', '.rating'],
+    'reviews': ['.product-card__count', '.j-feedback-count', '.review-count', '.product-card__feedback']
+}
+
+# Карточка считается догруженной, когда в ней появилась цена
+WILDBERRIES_PRICE_SELECTOR = ', '.join(WILDBERRIES_CARD_FIELDS['price'])
+
+WILDBERRIES_LINK_SELECTORS = ['a.product-card__link', 'a.j-card-link', 'a[href*="/catalog/"]']
+
+# Списки селекторов, которые проверяются после первой страницы (см. selector_health)
+WILDBERRIES_HEALTH_FIELDS = {
+    'title': WILDBERRIES_CARD_FIELDS['title'],
+    'brand': WILDBERRIES_CARD_FIELDS['brand'],
+    'price': WILDBERRIES_CARD_FIELDS['price'],
+    'link': WILDBERRIES_LINK_SELECTORS
+}
+
+# Один вызов execute_script вместо десятков find_elements/.text на каждую карточку.
+# Возвращает JSON: общее число карточек в DOM и данные карточек начиная с позиции startIndex
+# (поля считаются только для новых карточек, старые лишь пересчитываются по порядку).
+WILDBERRIES_CARDS_JS = """
+var startIndex = arguments[0] || 0;
+var cardSelector = 'article.product-card, div.product-card, .j-card-item, [data-nm-id]';
+
+function firstText(root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var node = root.querySelector(selectors[i]);
+        if (node) {
+            var text = (node.innerText || node.textContent || '').trim();
+            if (text) {
+                return text;
+            }
+        }
+    }
+    return null;
+}
+
+var nodes = document.querySelectorAll(cardSelector);
+var entries = [];
+var seen = {};
+
+for (var i = 0; i < nodes.length; i++) {
+    var card = nodes[i];
+
+    // Берем только внешнюю карточку: вложенные [data-nm-id] дублируют родителя
+    var outer = card.parentElement ? card.parentElement.closest(cardSelector) : null;
+    if (outer) {
+        continue;
+    }
+
+    var link = card.querySelector('a.product-card__link, a.j-card-link, a[href*="/catalog/"]');
+    var url = link ? link.href : null;
+
+    var nmId = card.getAttribute('data-nm-id');
+    if (!nmId && url) {
+        var match = url.match(/\\/catalog\\/(\\d+)\\//);
+        nmId = match ? match[1] : null;
+    }
+    if (!nmId || seen[nmId]) {
+        continue;
+    }
+    seen[nmId] = true;
+    entries.push({card: card, nmId: nmId, url: url});
+}
+
+// Список перестроен - начинаем сначала
+if (startIndex > entries.length) {
+    startIndex = 0;
+}
+
+var result = [];
+for (var j = startIndex; j < entries.length; j++) {
+    var entry = entries[j];
+    var card = entry.card;
+    result.push({
+        nm_id: entry.nmId,
+        url: entry.url,
+        title: firstText(card, ['.product-card__name', '.card__name', '.goods-name', '.j-card-name']),
+        brand: firstText(card, ['.product-card__brand', '.product-card__brand-name', '.brand-name']),
+        price: firstText(card, ['.price__lower-price', '.price-block__final-price', '.final-price',
+                                '.lower-price', '.j-final-price', '.product-card__price ins']),
+        old_price: firstText(card, ['.price__old-price', '.product-card__price del', 'del']),
+        rating: firstText(card, ['.address-rate-mini', '.product-card__rating', '.j-rating', '.rating']),
+        reviews: firstText(card, ['.product-card__count', '.j-feedback-count', '.review-count',
+                                  '.product-card__feedback']),
+        text: (card.innerText || '').slice(0, 1000)
+    });
+}
+
+return JSON.stringify({total: entries.length, start: startIndex, cards: result});
+"""
+
+
+def parse_wildberries_number(text):
+    """Извлекает целое число из текста цены или количества отзывов"""
+    if not text:
+        return None
+    digits = re.sub(r'[^\d]', '', str(text))
+    return int(digits) if digits else None
+
+
+def parse_wildberries_rating(text):
+    """Извлекает рейтинг (0-5) из текста"""
+    if not text:
+        return 0
+    rating_match = re.search(r'(\d+[.,]\d+|\d+)', str(text))
+    if rating_match:
+        rating = float(rating_match.group(1).replace(',', '.'))
+        if 0 <= rating <= 5:
+            return rating
+    return 0
+
+
+def build_wildberries_card_name(brand, title):
+    """Собирает название в формате Wildberries "БРЕНД / Название" """
+    title = (title or '').strip().lstrip('/').strip()
+    brand = (brand or '').strip()
+    if brand and title and brand.lower() not in title.lower():
+        return f"{brand} / {title}"
+    return title or brand or None
+
+
+def normalize_wildberries_card(raw_card):
+    """Приводит сырые данные карточки из JavaScript к числам и единому названию"""
+    return {
+        'nm_id': raw_card.get('nm_id'),
+        'url': raw_card.get('url'),
+        'title': raw_card.get('title'),
+        'brand': raw_card.get('brand'),
+        'name': build_wildberries_card_name(raw_card.get('brand'), raw_card.get('title')),
+        'price': parse_wildberries_number(raw_card.get('price')),
+        'old_price': parse_wildberries_number(raw_card.get('old_price')),
+        'rating': parse_wildberries_rating(raw_card.get('rating')),
+        'reviews': parse_wildberries_number(raw_card.get('reviews')) or 0,
+        'text': raw_card.get('text') or ''
+    }
+
+
+def is_wildberries_card_loaded(card):
+    """Карточка (CardContext) догружена: посчитанные названия непустые и в тексте есть цена
+
+    Текст берется из кэша, а если его еще не читали - из браузера уже после прокрутки.
+    """
+    names_loaded = all(card.derived.get(key) for key in ('name', 'full_name') if key in card.derived)
+    return names_loaded and '₽' in (card.text or '')
+
+
+def accept_new_wildberries_cards(cards, progress, start_index):
+    """Оставляет только новые карточки (по nm-id) и сдвигает водяной знак прогресса"""
+    if progress is None:
+        return cards
+    return progress.accept(cards, key=lambda card: card['nm_id'], start_index=start_index,
+                           is_complete=lambda card: card['price'] is not None)
+
+
+def extract_wildberries_cards(driver, progress=None):
+    """Извлекает карточки страницы одним вызовом JavaScript
+
+    Если передан progress (ScrollProgress), обрабатываются только карточки после
+    водяного знака и не встречавшиеся ранее.
+    """
+    try:
+        start_index = progress.watermark if progress else 0
+        raw_json = driver.execute_script(WILDBERRIES_CARDS_JS, start_index)
+        raw_result = json.loads(raw_json) if raw_json else {'total': 0, 'start': 0, 'cards': []}
+
+        if progress:
+            progress.start_index(raw_result['total'])
+
+        cards = [normalize_wildberries_card(raw_card) for raw_card in raw_result['cards']]
+        cards = accept_new_wildberries_cards(cards, progress, raw_result['start'])
+        print(f"⚡ JS-извлечение: {len(cards)} новых карточек из {raw_result['total']} за один вызов")
+        return cards
+    except Exception as e:
+        print(f"⚠️ Ошибка JS-извлечения карточек: {e}")
+        return []
+
+
+def extract_wildberries_nm_id(url):
+    """Артикул (nm-id) из ссылки вида /catalog/123456/detail.aspx"""
+    if not url:
+        return None
+    match = re.search(r'/catalog/(\d+)/', url)
+    return match.group(1) if match else None
+
+
+def find_wildberries_card_nodes(tree):
+    """Внешние узлы карточек с nm-id и ссылкой, без вложенных и повторов"""
+    entries = []
+    seen = set()
+
+    for node in outermost(tree.cssselect(WILDBERRIES_CARD_SELECTOR)):
+        url = first_attr(node, WILDBERRIES_LINK_SELECTORS, 'href')
+        if url and url.startswith('/'):
+            url = f"https://www.wildberries.ru{url}"
+
+        nm_id = node.get('data-nm-id') or extract_wildberries_nm_id(url)
+        if not nm_id or nm_id in seen:
+            continue
+        seen.add(nm_id)
+        entries.append((nm_id, url, node))
+
+    return entries
+
+
+def parse_wildberries_card_node(nm_id, url, node):
+    """Данные одной карточки из узла lxml"""
+    raw_card = {field: first_text(node, selectors) for field, selectors in WILDBERRIES_CARD_FIELDS.items()}
+    raw_card.update({'nm_id': nm_id, 'url': url, 'text': node_text(node)[:1000]})
+    return normalize_wildberries_card(raw_card)
+
+
+def parse_wildberries_cards_html(html, start_index=0):
+    """Разбор карточек из снимка page_source без обращений к браузеру"""
+    entries = find_wildberries_card_nodes(parse_html(html))
+    return [parse_wildberries_card_node(*entry) for entry in entries[start_index:]]
+
+
+def extract_wildberries_cards_snapshot(driver, progress=None):
+    """Извлекает карточки по одному снимку page_source (с учетом прогресса, если он передан)"""
+    try:
+        entries = find_wildberries_card_nodes(parse_html(driver.page_source))
+        start_index = progress.start_index(len(entries)) if progress else 0
+
+        cards = [parse_wildberries_card_node(*entry) for entry in entries[start_index:]]
+        cards = accept_new_wildberries_cards(cards, progress, start_index)
+        print(f"📸 Разбор снимка страницы: {len(cards)} новых карточек из {len(entries)}")
+        return cards
+    except Exception as e:
+        print(f"⚠️ Ошибка разбора снимка страницы: {e}")
+        return []
+
+
+def extract_wildberries_element_ids(driver, elements):
+    """nm-id для списка WebElement одним вызовом JavaScript"""
+    if not elements:
+        return []
+    try:
+        return driver.execute_script("""
+            return arguments[0].map(function(card) {
+                var nmId = card.getAttribute('data-nm-id');
+                if (!nmId) {
+                    var link = card.querySelector('a[href*="/catalog/"]');
+                    var match = link ? link.href.match(/\\/catalog\\/(\\d+)\\//) : null;
+                    nmId = match ? match[1] : null;
+                }
+                return nmId;
+            });
+        """, [unwrap_element(element) for element in elements])
+    except Exception as e:
+        print(f"⚠️ Ошибка получения nm-id карточек: {e}")
+        return [None] * len(elements)
@@ -0,0 +1,151 @@
+import base64
+import json
+import re
+
+from parsing.wildberries_market.wildberries_cards import build_wildberries_card_name
+
+
+# Ответы API каталога и поиска, из которых страница выдачи строит карточки
+WILDBERRIES_CATALOG_URL_PATTERN = re.compile(
+    r'(?:catalog|search)\.wb\.ru/.*/(?:catalog|search)\?'
+    r'|/__internal/u-(?:catalog|search)/.*/(?:catalog|search)\?'
+)
+
+
+def is_wildberries_catalog_url(url):
+    return bool(url and WILDBERRIES_CATALOG_URL_PATTERN.search(url))
+
+
+def kopecks_to_rubles(value):
+    return int(value) // 100 if value else None
+
+
+def wildberries_catalog_prices(product):
+    """Цена и старая цена в рублях: из sizes[].price (новый формат) или salePriceU/priceU"""
+    size_prices = [size['price'] for size in product.get('sizes') or [] if size.get('price')]
+    final_prices = [price.get('product') or price.get('total') for price in size_prices]
+    basic_prices = [price.get('basic') for price in size_prices]
+
+    final_prices = [price for price in final_prices if price]
+    basic_prices = [price for price in basic_prices if price]
+
+    price = min(final_prices) if final_prices else product.get('salePriceU')
+    old_price = min(basic_prices) if basic_prices else product.get('priceU')
+    return kopecks_to_rubles(price), kopecks_to_rubles(old_price)
+
+
+def normalize_wildberries_catalog_product(product):
+    """Карточка из JSON каталога в том же виде, что и normalize_wildberries_card"""
+    nm_id = str(product['id']) if product.get('id') else None
+    price, old_price = wildberries_catalog_prices(product)
+    rating = product.get('reviewRating') or product.get('rating') or 0
+
+    return {
+        'nm_id': nm_id,
+        'url': f"https://www.wildberries.ru/catalog/{nm_id}/detail.aspx" if nm_id else None,
+        'title': product.get('name'),
+        'brand': product.get('brand'),
+        'name': build_wildberries_card_name(product.get('brand'), product.get('name')),
+        'price': price,
+        'old_price': old_price,
+        'rating': float(rating) if 0 <= float(rating) <= 5 else 0,
+        'reviews': product.get('feedbacks') or product.get('nmFeedbacks') or 0,
+        'text': ''
+    }
+
+
+def parse_wildberries_catalog_body(body):
+    """Товары из тела ответа каталога (data.products или products)"""
+    try:
+        data = json.loads(body)
+    except (TypeError, ValueError):
+        return []
+
+    products = (data.get('data') or {}).get('products') or data.get('products') or []
+    return [normalize_wildberries_catalog_product(product) for product in products if product.get('id')]
+
+
+def accept_new_catalog_cards(cards, progress=None):
+    """Новые карточки с ценой (по nm-id); водяной знак DOM не трогаем - порядок ответов другой"""
+    fresh_cards = []
+    for card in cards:
+        if card['price'] is None:
+            continue
+        if progress is not None:
+            if progress.is_seen(card['nm_id']):
+                continue
+            progress.mark_seen(card['nm_id'])
+        fresh_cards.append(card)
+    return fresh_cards
+
+
+class WildberriesCatalogCapture:
+    """Перехват JSON каталога Wildberries из журнала производительности Chrome
+
+    Драйвер должен быть запущен с goog:loggingPrefs {'performance': 'ALL'} (см. setup_driver).
+    process() получает записи журнала, запоминает запросы каталога и после их загрузки
+    забирает тела ответов через Network.getResponseBody.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = {}
+        self.finished = set()
+        self.responses = 0
+        self.products = 0
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception as e:
+            print(f"⚠️ Не удалось включить Network для перехвата каталога: {e}")
+
+    def read_log(self):
+        try:
+            return self.driver.get_log('performance')
+        except Exception as e:
+            print(f"⚠️ Журнал производительности недоступен: {e}")
+            return []
+
+    def track(self, log_entries):
+        for entry in log_entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params') or {}
+            request_id = params.get('requestId')
+
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url')
+                if is_wildberries_catalog_url(url):
+                    self.pending[request_id] = url
+            elif method == 'Network.loadingFinished' and request_id in self.pending:
+                self.finished.add(request_id)
+            elif method == 'Network.loadingFailed':
+                self.pending.pop(request_id, None)
+
+    def process(self, log_entries=None):
+        """Карточки из ответов каталога, загруженных с прошлого вызова"""
+        self.track(self.read_log() if log_entries is None else log_entries)
+
+        cards = []
+        for request_id in list(self.finished):
+            self.finished.discard(request_id)
+            url = self.pending.pop(request_id, None)
+            try:
+                response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception as e:
+                print(f"⚠️ Тело ответа каталога недоступно ({url}): {e}")
+                continue
+
+            body = response.get('body')
+            if response.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+
+            body_cards = parse_wildberries_catalog_body(body)
+            self.responses += 1
+            self.products += len(body_cards)
+            cards.extend(body_cards)
+
+        return cards
@@ -0,0 +1,144 @@
+import re
+
+from parsing.tab_pool import TabPool
+from parsing.wildberries_market.wildberries_cards import extract_wildberries_nm_id
+
+
+# Все, что нужно со страницы товара, одним вызовом JavaScript:
+# заголовок h1, последняя хлебная крошка (бренд), title, og:title и JSON-LD.
+# ready = true, когда документ загружен и на странице уже есть название.
+WILDBERRIES_PRODUCT_PAGE_JS = """
+function firstText(selectors, minLength) {
+    for (var i = 0; i < selectors.length; i++) {
+        try {
+            var nodes = document.querySelectorAll(selectors[i]);
+            for (var j = 0; j < nodes.length; j++) {
+                var text = (nodes[j].innerText || '').trim();
+                if (text && text.length > minLength) {
+                    return text;
+                }
+            }
+        } catch (e) {}
+    }
+    return null;
+}
+
+var h1 = firstText([
+    'h1.product-page__title', 'h1.same-part-kt__header', '.product-page__header h1',
+    'h1.product-card__name', 'h1', '.product-name', '.product__name',
+    "[data-link*='text{:product^goodsName}']", '.product-title', '.goods-name'
+], 10);
+
+var excludeWords = ['главная', 'каталог', 'поиск', 'отзывы', 'акции', 'скидки', 'новинки'];
+var breadcrumb = null;
+var breadcrumbSelectors = [
+    '.breadcrumbs__item:last-child', '.bread-crumbs__item:last-child', '.breadcrumb__item:last-child',
+    '.breadcrumbs li:last-child', "[data-tag='breadcrumbLastItem']", '.j-breadcrumb-last'
+];
+for (var i = 0; i < breadcrumbSelectors.length && !breadcrumb; i++) {
+    var crumbs = document.querySelectorAll(breadcrumbSelectors[i]);
+    for (var j = 0; j < crumbs.length; j++) {
+        var candidate = (crumbs[j].innerText || '').trim();
+        if (candidate.length > 1 && candidate.length < 50 && excludeWords.indexOf(candidate.toLowerCase()) === -1) {
+            breadcrumb = candidate;
+            break;
+        }
+    }
+}
+
+var ldName = null;
+var ldBrand = null;
+var scripts = document.querySelectorAll("script[type='application/ld+json']");
+for (var k = 0; k < scripts.length && !ldName; k++) {
+    try {
+        var data = JSON.parse(scripts[k].innerHTML);
+        if (data && data.name) {
+            ldName = data.name;
+            ldBrand = data.brand ? (data.brand.name || data.brand) : null;
+        }
+    } catch (e) {}
+}
+
+var ogTitle = document.querySelector("meta[property='og:title']");
+var bodyLines = [];
+if (!h1 && !ldName && document.body) {
+    bodyLines = document.body.innerText.split('\\n').map(function(line) {
+        return line.trim();
+    }).filter(function(line) {
+        return line.length > 20 && line.length < 200;
+    }).slice(0, 300);
+}
+
+return {
+    ready: document.readyState === 'complete' && !!(h1 || ldName),
+    h1: h1,
+    breadcrumb: breadcrumb,
+    title: document.title,
+    og_title: ogTitle ? ogTitle.getAttribute('content') : null,
+    ld_name: ldName,
+    ld_brand: typeof ldBrand === 'string' ? ldBrand : null,
+    body_lines: bodyLines
+};
+"""
+
+
+class WildberriesProductPageFetcher(TabPool):
+    """Пул вкладок для страниц товаров Wildberries с проверкой кэша (ProductCache) по nm-id
+
+    При попадании в кэш страница не открывается, загруженные страницы сохраняются в кэш.
+    """
+
+    def __init__(self, driver, max_tabs=4, page_timeout=20, cache=None):
+        super().__init__(driver, WILDBERRIES_PRODUCT_PAGE_JS, max_tabs=max_tabs, page_timeout=page_timeout)
+        self.cache = cache
+
+    def submit(self, url):
+        if self.cache and url and url not in self.results:
+            cached_page = self.cache.get('wildberries', extract_wildberries_nm_id(url))
+            if cached_page:
+                self.results[url] = cached_page
+                return
+        super().submit(url)
+
+    def save_result(self, url, data):
+        super().save_result(url, data)
+        if self.cache and data and data.get('ready'):
+            self.cache.put('wildberries', extract_wildberries_nm_id(url), data)
+
+
+def create_wildberries_product_fetcher(driver, max_tabs=4, page_timeout=20, cache=None):
+    """Пул вкладок для параллельной загрузки страниц товаров Wildberries"""
+    return WildberriesProductPageFetcher(driver, max_tabs=max_tabs, page_timeout=page_timeout, cache=cache)
+
+
+def wildberries_product_url(nm_id):
+    """Ссылка на страницу товара по nm-id"""
+    return f"https://www.wildberries.ru/catalog/{nm_id}/detail.aspx" if nm_id else None
+
+
+def add_brand(brand, name):
+    """Добавляет бренд в начало названия в формате Wildberries, если его там нет"""
+    if brand and brand.lower() not in name.lower():
+        return f"{brand} / {name}"
+    return name
+
+
+def build_wildberries_page_name(page, keywords=()):
+    """Полное название с брендом по данным страницы товара (как в get_full_product_name)"""
+    if not page:
+        return None
+
+    brand = page.get('breadcrumb') or page.get('ld_brand')
+
+    title = re.sub(r'\s*[–-]\s*Wildberries.*$', '', page.get('title') or '')
+    for candidate_name in (page.get('h1'), title, page.get('og_title'), page.get('ld_name')):
+        if candidate_name and len(candidate_name) > 10:
+            return add_brand(brand, candidate_name.strip())
+
+    # Нашли только бренд - ищем название в тексте страницы
+    if brand:
+        for line in page.get('body_lines') or []:
+            if any(keyword in line.lower() for keyword in keywords):
+                return f"{brand} / {line}"
+
+    return None
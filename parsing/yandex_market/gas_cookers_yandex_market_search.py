@@ -5,13 +5,45 @@ from selenium_stealth import stealth
 import pandas as pd
 import time
 import re
-import json
-import os
+import argparse
 from datetime import datetime
 
-
-def setup_driver():
-    """Настройка драйвера с stealth режимом"""
+from parsing.scroll_state import ScrollProgress
+from parsing.yandex_market.yandex_snippets import (YANDEX_HEALTH_FIELDS, YANDEX_SNIPPET_SELECTOR,
+                                                   YANDEX_SNIPPET_SELECTORS, extract_yandex_snippets_snapshot,
+                                                   find_yandex_snippets, describe_yandex_layout_drift,
+                                                   yandex_snippet_key)
+from parsing.yandex_market.yandex_crawl import YandexScrollBudget
+from parsing.price_shards import crawl_price_shards
+from parsing.page_crawler import page_number, page_url, crawl_pages
+from parsing.card_watch import wait_for_new_cards
+from parsing.driver_pool import acquire_driver, release_driver
+from parsing.resource_policy import apply_resource_options, apply_resource_policy
+from parsing.rate_control import get_rate_controller
+from parsing.selector_health import SelectorDriftError, SelectorHealthCheck
+from parsing.checkpoint import (
+    append_checkpoint, read_checkpoint, clear_checkpoint, resume_checkpoint, finish_checkpoint,
+    checkpoint_filename
+)
+
+# URL поиска газовых плит
+SEARCH_URL = "https://market.yandex.ru/search?text=газовые%20плиты&hid=16147374&onstock=1"
+# Диапазон цен для разбиения выдачи на полосы (--price-shards)
+PRICE_RANGE = (1000, 500000)
+
+# Ключевые слова для поиска названия в тексте сниппета
+NAME_KEYWORDS = ['плита', 'газов', 'gorenje', 'bosch', 'electrolux', 'indesit',
+                 'darina', 'гефест', 'аристон', 'hotpoint']
+# Задача сбора: по ней называется журнал контрольных точек и сверяется --resume
+CHECKPOINT_JOB = 'yandex_gas_stoves'
+CHECKPOINT_FILE = checkpoint_filename(CHECKPOINT_JOB)
+
+
+def setup_driver(resource_policy='yandex'):
+    """Настройка драйвера с stealth режимом
+
+    resource_policy - какие ресурсы не загружать (см. parsing.resource_policy; None - загружать все)
+    """
     options = Options()
 
     # Базовые настройки
@@ -34,7 +66,14 @@ def setup_driver():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
 
+    # Журнал производительности: по нему темп запросов замечает ответы HTTP 429
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Картинки, шрифты, видео и счетчики карточкам не нужны
+    apply_resource_options(options, resource_policy)
+
     driver = webdriver.Chrome(options=options)
+    apply_resource_policy(driver, resource_policy)
 
     # Применяем stealth режим
     stealth(driver,
@@ -77,257 +116,319 @@ def close_popups(driver):
         print(f"Ошибка при закрытии попапов: {e}")
 
 
-def save_to_temp_file(data, filename='temp_gas_stoves.json'):
-    """Сохраняет данные во временный файл"""
-    try:
-        # Читаем существующие данные
-        existing_data = []
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-
-        # Добавляем новые данные
-        existing_data.extend(data)
-
-        # Сохраняем обратно
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+def save_to_temp_file(data, filename=CHECKPOINT_FILE, progress=None):
+    """Дописывает данные в журнал контрольных точек (NDJSON), не перечитывая его
 
-        print(f"💾 Сохранено {len(data)} записей во временный файл. Всего записей: {len(existing_data)}")
-        return True
-    except Exception as e:
-        print(f"❌ Ошибка сохранения во временный файл: {e}")
-        return False
+    progress - состояние прокрутки (ScrollProgress), сохраняется для --resume
+    """
+    return append_checkpoint(filename, data, progress.to_state() if progress else None)
 
 
-def load_from_temp_file(filename='temp_gas_stoves.json'):
-    """Загружает данные из временного файла"""
+def load_from_temp_file(filename=CHECKPOINT_FILE):
+    """Загружает данные из журнала контрольных точек"""
     try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        return read_checkpoint(filename)
     except Exception as e:
         print(f"❌ Ошибка загрузки из временного файла: {e}")
         return []
 
 
-def clear_temp_file(filename='temp_gas_stoves.json'):
-    """Очищает временный файл"""
+def clear_temp_file(filename=CHECKPOINT_FILE):
+    """Очищает журнал контрольных точек"""
     try:
-        if os.path.exists(filename):
-            os.remove(filename)
-            print("🗑️ Временный файл очищен")
+        clear_checkpoint(filename)
     except Exception as e:
         print(f"❌ Ошибка очистки временного файла: {e}")
 
 
-def parse_gas_stoves():
-    """Парсинг газовых плит через поиск с сохранением во временный файл"""
-    driver = setup_driver()
-    temp_filename = 'temp_gas_stoves.json'
+def build_product_record(name, price_num, scroll_number):
+    """Формирование записи о товаре"""
+    return {
+        'Категория товара': 'Газовая плита',
+        'Модель': name,
+        'Цена': price_num,
+        'Время сбора': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'Прокрутка': scroll_number
+    }
+
+
+def parse_gas_stoves_pages(pool=None, workers=3, max_pages=5, price_range=None):
+    """Параллельный обход страниц выдачи (&page=N): каждая страница открывается в своем драйвере пула
+
+    Страницы разбираются снимком page_source, повторы между страницами отсекаются по id сниппета.
+    price_range=(от, до) - выдача делится на полосы цен, каждая помещается в max_pages страниц
+    """
+    pacer = get_rate_controller('yandex')
+    # Сломанная разметка обнаруживается на первой странице, а не после обхода всех страниц
+    health = SelectorHealthCheck('yandex', YANDEX_SNIPPET_SELECTORS, YANDEX_HEALTH_FIELDS)
+
+    def extract_page(driver, page):
+        close_popups(driver)
+        # Нижняя часть страницы догружается при прокрутке - доводим до конца и ждем сниппеты
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_new_cards(driver, YANDEX_SNIPPET_SELECTOR)
+        snippets = extract_yandex_snippets_snapshot(driver, name_keywords=NAME_KEYWORDS,
+                                                     min_text_length=50, min_name_length=10, min_line_length=20)
+        return [dict(snippet, page=page) for snippet in snippets]
+
+    try:
+        if price_range:
+            snippets = crawl_price_shards(setup_driver, SEARCH_URL, 'yandex', extract_page, yandex_snippet_key,
+                                          price_range, pool=pool, workers=workers, max_pages=max_pages, pacer=pacer,
+                                          health=health)
+        else:
+            snippets = crawl_pages(setup_driver, SEARCH_URL, extract_page, yandex_snippet_key, pool=pool,
+                                   workers=workers, max_pages=max_pages, pacer=pacer, health=health)
+    finally:
+        pacer.report()
+
+    return [build_product_record(snippet['name'], snippet['price'], snippet['page']) for snippet in snippets]
+
 
-    # Очищаем временный файл перед началом нового парсинга
-    clear_temp_file(temp_filename)
+def parse_gas_stoves(extraction_mode='snapshot', resume=False, pool=None, idle_limit=2, max_scrolls=30, max_pages=5,
+                     crawl_mode='scroll', workers=3, price_range=None):
+    """Парсинг газовых плит через поиск с сохранением во временный файл
+
+    extraction_mode='snapshot' - разбор одного снимка page_source через lxml,
+    extraction_mode='elements' - старый режим с обходом каждого элемента
+    resume=True - продолжить прерванный сбор с последней контрольной точки журнала
+    pool - пул драйверов (DriverPool); без него создается и закрывается свой драйвер
+    idle_limit - сколько прокруток подряд без новых сниппетов считать концом страницы,
+    max_scrolls и max_pages - предельная глубина прокрутки и число страниц выдачи (&page=N)
+    crawl_mode='pages' - страницы выдачи обходятся параллельно на workers драйверах (parse_gas_stoves_pages)
+    price_range=(от, до) - в режиме pages обходить выдачу по полосам цен
+    """
+    if crawl_mode == 'pages':
+        return parse_gas_stoves_pages(pool=pool, workers=workers, max_pages=max_pages, price_range=price_range)
+
+    driver = acquire_driver(setup_driver, pool)
+    # Паузы задает контроллер темпа: начинает быстро и замедляется при признаках блокировки
+    pacer = get_rate_controller('yandex')
+    temp_filename = CHECKPOINT_FILE
+
+    resumed_data, progress = resume_checkpoint(temp_filename, job=CHECKPOINT_JOB) if resume else ([], None)
+    if progress is None:
+        # Очищаем временный файл перед началом нового парсинга
+        clear_temp_file(temp_filename)
 
     try:
-        # URL поиска газовых плит
-        url = "https://market.yandex.ru/search?text=газовые%20плиты&hid=16147374&onstock=1"
+        url = SEARCH_URL
 
         print("Открываем страницу поиска газовых плит...")
+        # При возобновлении открываем ту страницу, с которой шел сбор
+        if progress and progress.url:
+            url = progress.url
+
         driver.get(url)
-        time.sleep(5)
+        pacer.pace('page')
 
         # Закрываем попапы
         close_popups(driver)
-        time.sleep(2)
 
         # Проверяем заголовок страницы
         page_title = driver.title.lower()
         print(f"Заголовок страницы: {driver.title}")
 
-        all_products_data = []
+        all_products_data = list(resumed_data)
+        # После первой страницы нового сбора сверяем селекторы с базовыми значениями
+        health = None if progress else SelectorHealthCheck('yandex', YANDEX_SNIPPET_SELECTORS, YANDEX_HEALTH_FIELDS)
+        # Уже обработанные сниппеты (по id сниппета) за весь прогон
+        progress = progress or ScrollProgress(job=CHECKPOINT_JOB)
+        progress.url = driver.current_url
 
         # Прокручиваем страницу для загрузки товаров и сохраняем данные после каждой прокрутки
         print("Прокручиваем страницу для загрузки товаров...")
-        for scroll_iteration in range(5):  # Увеличим количество прокруток
+        # Прокрутка идет на абсолютную позицию, поэтому при возобновлении просто пропускаем пройденные.
+        # Крутим, пока прокрутки дают новые сниппеты, затем переходим на следующую страницу выдачи
+        budget = YandexScrollBudget(idle_limit=idle_limit, max_scrolls=max_scrolls, max_pages=max_pages,
+                                    page=page_number(progress.url))
+        while True:
+            # Первая страница без товаров - разметка изменилась, дальше не крутим
+            if health and health.due(progress.scroll_count):
+                health.check(driver, len(all_products_data))
+
+            if budget.page_exhausted(progress.scroll_count):
+                if not budget.next_page():
+                    break
+                driver.get(page_url(url, budget.page))
+                pacer.pace('page')
+                close_popups(driver)
+                progress.url = driver.current_url
+                progress.scroll_count = 0
+                progress.watermark = 0
+                continue
+
+            scroll_iteration = progress.scroll_count
             print(f"\n--- Прокрутка {scroll_iteration + 1} ---")
 
+            pacer.pace('scroll')
+
             # Прокручиваем страницу
             driver.execute_script(f"window.scrollTo(0, {2000 * (scroll_iteration + 1)});")
-            time.sleep(3)
 
-            # Даем время для загрузки контента
-            time.sleep(2)
+            # Ждем новые сниппеты с ценами: дальше идем, как только сайт их отрисовал или лента затихла
+            cards_state = wait_for_new_cards(driver, YANDEX_SNIPPET_SELECTOR)
+            print(f"⏱️ Новых сниппетов на странице: {cards_state['new']} (ожидание {cards_state['waited']} с)")
 
             print("Ищем товары на текущей позиции...")
 
-            # Селекторы для товаров
-            product_selectors = [
-                'article',
-                '[data-zone-name="snippet"]',
-                '[data-autotest-id="product-snippet"]',
-                '._2U08a',
-                '.n-snippet-cell',
-                '[data-zone-data*="snippet"]'
-            ]
-
-            products = []
-            for selector in product_selectors:
-                try:
-                    found_products = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if found_products:
-                        print(f"Найдено товаров с селектором '{selector}': {len(found_products)}")
-                        products = found_products
-                        break
-                except:
-                    continue
+            current_scroll_data = []
+
+            progress.scroll_count = scroll_iteration + 1
+
+            if extraction_mode == 'snapshot':
+                snippets = extract_yandex_snippets_snapshot(driver, progress, name_keywords=NAME_KEYWORDS,
+                                                            min_text_length=50, min_name_length=10, min_line_length=20)
+
+                # Снимок возвращает только новые сниппеты, повторная проверка дубликатов не нужна
+                for snippet in snippets:
+                    name = snippet['name']
+                    price_num = snippet['price']
+                    current_scroll_data.append(build_product_record(name, price_num, scroll_iteration + 1))
+                    print(f"✅ Обработан: {name[:50]}... - {price_num} руб.")
+
+            else:
+                # Сниппеты и их текст - одним вызовом JavaScript вместо перебора всего DOM
+                discovery = find_yandex_snippets(driver, min_name_length=10)
+                products = discovery['elements']
+                payloads = discovery['payloads']
+
+                drift = describe_yandex_layout_drift(discovery)
+                if drift:
+                    print(f"🚨 Похоже, изменилась разметка Яндекс Маркета: {drift}")
 
-            if not products:
-                # Пробуем найти любые товары на странице
-                print("Пробуем альтернативный поиск товаров...")
-                all_elements = driver.find_elements(By.CSS_SELECTOR, 'div, article, section')
-                products = [p for p in all_elements if p.get_attribute('data-zone-name') == 'snippet']
                 if not products:
                     print("❌ Не удалось найти товары на этой прокрутке. Продолжаем...")
+                    pacer.check(driver, empty_listing=not all_products_data)
+                    budget.record(0)
                     continue
 
-            print(f"✅ Найдено {len(products)} товаров для обработки на прокрутке {scroll_iteration + 1}")
-
-            current_scroll_data = []
-            processed_models = set()  # Для отслеживания дубликатов в текущей прокрутке
-
-            for i, product in enumerate(products, 1):
-                try:
-                    # Прокручиваем к товару
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
-                                          product)
-                    time.sleep(0.5)
+                # Уже собранные, пустые и слишком короткие сниппеты отбрасываем до прокрутки к ним
+                fresh_snippets = [
+                    (product, payload) for product, payload in zip(products, payloads)
+                    if not progress.is_seen(payload['snippet_id']) and len(payload['text'] or '') >= 50
+                ]
+                print(f"✅ Найдено {len(products)} товаров, новых для обработки: {len(fresh_snippets)} "
+                      f"на прокрутке {scroll_iteration + 1}")
 
-                    # Получаем весь текст элемента
-                    product_text = product.text
-                    if not product_text or len(product_text) < 50:
-                        continue  # Пропускаем пустые или слишком короткие элементы
-
-                    # Поиск названия
-                    name = None
-                    name_selectors = [
-                        'h3',
-                        'a[href*="/product/"]',
-                        '[data-zone-name="title"]',
-                        '.n-snippet-card2__title',
-                        '._3EX9a',
-                        '.N9L7oc'
-                    ]
-
-                    for selector in name_selectors:
-                        try:
-                            name_elem = product.find_element(By.CSS_SELECTOR, selector)
-                            candidate_name = name_elem.text.strip()
-                            if candidate_name and len(candidate_name) > 10:
-                                name = candidate_name
-                                break
-                        except:
-                            continue
-
-                    # Если не нашли по селекторам, ищем в тексте
-                    if not name and product_text:
-                        lines = [line.strip() for line in product_text.split('\n') if line.strip()]
-                        for line in lines:
-                            if len(line) > 20 and any(word in line.lower() for word in
-                                                      ['плита', 'газов', 'gorenje', 'bosch', 'electrolux', 'indesit',
-                                                       'darina', 'гефест', 'аристон', 'hotpoint']):
-                                name = line
-                                break
-
-                    # Если все еще не нашли, берем первую длинную строку
-                    if not name and product_text:
-                        lines = [line.strip() for line in product_text.split('\n') if len(line.strip()) > 20]
-                        if lines:
-                            name = lines[0]
-
-                    if not name:
-                        continue  # Пропускаем если не нашли название
-
-                    # Поиск цены
-                    price = None
+                for i, (product, payload) in enumerate(fresh_snippets, 1):
                     try:
-                        # Ищем цену регулярным выражением
-                        price_pattern = r'(\d{1,3}(?:\s?\d{3})*(?:\s?\d{3})*)\s*[₽рруб]'
-                        matches = re.findall(price_pattern, product_text, re.IGNORECASE)
-                        if matches:
-                            price = matches[0].replace(' ', '').replace(' ', '').replace(' ', '')
-                        else:
-                            # Пробуем селекторы цены
-                            price_selectors = [
-                                '[data-zone-name="price"]',
-                                '.price',
-                                '._1u3jP',
-                                '.n-snippet-card2__price',
-                                '.N9L7oc+div'
-                            ]
-                            for selector in price_selectors:
-                                try:
-                                    price_elem = product.find_element(By.CSS_SELECTOR, selector)
-                                    price_text = price_elem.text
-                                    price_match = re.search(price_pattern, price_text, re.IGNORECASE)
-                                    if price_match:
-                                        price = price_match.group(1).replace(' ', '').replace(' ', '').replace(' ', '')
-                                        break
-                                except:
-                                    continue
+                        # Прокручиваем к товару
+                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                                              product)
+                        pacer.pace('card')
+
+                        # Текст и название уже получены при поиске сниппетов
+                        product_text = payload['text']
+
+                        # Поиск названия
+                        name = payload['name']
+
+                        # Если не нашли по селекторам, ищем в тексте
+                        if not name and product_text:
+                            lines = [line.strip() for line in product_text.split('\n') if line.strip()]
+                            for line in lines:
+                                if len(line) > 20 and any(word in line.lower() for word in NAME_KEYWORDS):
+                                    name = line
+                                    break
+
+                        # Если все еще не нашли, берем первую длинную строку
+                        if not name and product_text:
+                            lines = [line.strip() for line in product_text.split('\n') if len(line.strip()) > 20]
+                            if lines:
+                                name = lines[0]
+
+                        if not name:
+                            continue  # Пропускаем если не нашли название
+
+                        # Поиск цены
+                        price = None
+                        try:
+                            # Ищем цену регулярным выражением
+                            price_pattern = r'(\d{1,3}(?:\s?\d{3})*(?:\s?\d{3})*)\s*[₽рруб]'
+                            matches = re.findall(price_pattern, product_text, re.IGNORECASE)
+                            if matches:
+                                price = matches[0].replace(' ', '').replace(' ', '').replace(' ', '')
+                            else:
+                                # Пробуем селекторы цены
+                                price_selectors = [
+                                    '[data-zone-name="price"]',
+                                    '.price',
+                                    '._1u3jP',
+                                    '.n-snippet-card2__price',
+                                    '.N9L7oc+div'
+                                ]
+                                for selector in price_selectors:
+                                    try:
+                                        price_elem = product.find_element(By.CSS_SELECTOR, selector)
+                                        price_text = price_elem.text
+                                        price_match = re.search(price_pattern, price_text, re.IGNORECASE)
+                                        if price_match:
+                                            price = price_match.group(1).replace(' ', '').replace(' ', '').replace(' ', '')
+                                            break
+                                    except:
+                                        continue
 
-                    except Exception as e:
-                        print(f"Ошибка поиска цены: {e}")
+                        except Exception as e:
+                            print(f"Ошибка поиска цены: {e}")
 
-                    # Сохраняем данные
-                    if name and price:
-                        try:
-                            # Преобразуем цену в число
-                            price_num = int(price) if price.isdigit() else 0
+                        # Сохраняем данные
+                        if name and price:
+                            try:
+                                # Преобразуем цену в число
+                                price_num = int(price) if price.isdigit() else 0
 
-                            # Создаем уникальный идентификатор для проверки дубликатов
-                            product_id = f"{name[:100]}_{price_num}"
+                                # Идентификатор сниппета (или название и цена) - дубликаты отсекаются за весь прогон
+                                product_id = yandex_snippet_key({'snippet_id': payload['snippet_id'],
+                                                                 'name': name, 'price': price_num})
 
-                            if product_id not in processed_models:
-                                product_data = {
-                                    'Категория товара': 'Газовая плита',
-                                    'Модель': name,
-                                    'Цена': price_num,
-                                    'Время сбора': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                    'Прокрутка': scroll_iteration + 1
-                                }
+                                if not progress.is_seen(product_id):
+                                    product_data = build_product_record(name, price_num, scroll_iteration + 1)
 
-                                current_scroll_data.append(product_data)
-                                processed_models.add(product_id)
+                                    current_scroll_data.append(product_data)
+                                    progress.mark_seen(product_id)
 
-                                print(f"✅ Обработан: {name[:50]}... - {price_num} руб.")
+                                    print(f"✅ Обработан: {name[:50]}... - {price_num} руб.")
 
-                        except Exception as e:
-                            print(f"❌ Ошибка преобразования цены: {e}")
+                            except Exception as e:
+                                print(f"❌ Ошибка преобразования цены: {e}")
 
-                except Exception as e:
-                    print(f"⚠️ Ошибка обработки товара {i}: {e}")
-                    continue
+                    except Exception as e:
+                        print(f"⚠️ Ошибка обработки товара {i}: {e}")
+                        continue
 
             # Сохраняем данные текущей прокрутки во временный файл
             if current_scroll_data:
-                save_to_temp_file(current_scroll_data, temp_filename)
+                save_to_temp_file(current_scroll_data, temp_filename, progress)
                 all_products_data.extend(current_scroll_data)
                 print(f"💾 Добавлено {len(current_scroll_data)} записей из прокрутки {scroll_iteration + 1}")
 
+            # Капча, HTTP 429 или пустая выдача - замедляемся, иначе ускоряемся
+            pacer.check(driver, empty_listing=not all_products_data)
+
+            budget.record(len(current_scroll_data), ended=cards_state['ended'])
+
+        # Прокрутка дошла до конца - журнал не нужно возобновлять
+        finish_checkpoint(temp_filename, CHECKPOINT_JOB)
+
         # Загружаем все данные из временного файла для итоговой обработки
         final_data = load_from_temp_file(temp_filename)
         return final_data
 
+    except SelectorDriftError:
+        # Сбор прерывается целиком: отчет о селекторах уже напечатан и уходит вызывающему коду
+        driver.save_screenshot('error.png')
+        raise
     except Exception as e:
         print(f"🚨 Критическая ошибка: {e}")
+        print(f"💡 Собранное сохранено в {temp_filename}, продолжить сбор: --resume")
         driver.save_screenshot('error.png')
         # Возвращаем данные, которые успели сохранить
         return load_from_temp_file(temp_filename)
 
     finally:
-        driver.quit()
+        pacer.report()
+        release_driver(driver, pool)
 
 
 def save_to_excel(data, filename_base='yandex_market_gas_stoves'):
@@ -383,10 +484,25 @@ def save_to_excel(data, filename_base='yandex_market_gas_stoves'):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванный сбор с последней контрольной точки журнала')
+    parser.add_argument('--idle-scrolls', type=int, default=2,
+                        help='сколько прокруток подряд без новых товаров считать концом страницы')
+    parser.add_argument('--max-pages', type=int, default=5, help='предельное число страниц выдачи')
+    parser.add_argument('--crawl-mode', choices=['scroll', 'pages'], default='scroll',
+                        help='scroll - прокрутка одной вкладки, pages - параллельный обход страниц выдачи')
+    parser.add_argument('--workers', type=int, default=3, help='число драйверов для --crawl-mode pages')
+    parser.add_argument('--price-shards', action='store_true',
+                        help='в режиме pages делить выдачу на полосы цен (PRICE_RANGE), чтобы собрать ее целиком')
+    args = parser.parse_args()
+
     print("🚀 Начинаем парсинг газовых плит...")
     print("📝 Данные будут сохраняться во временный файл при каждой прокрутке")
 
-    gas_stoves_data = parse_gas_stoves()
+    gas_stoves_data = parse_gas_stoves(resume=args.resume, idle_limit=args.idle_scrolls, max_pages=args.max_pages,
+                                       crawl_mode=args.crawl_mode, workers=args.workers,
+                                       price_range=PRICE_RANGE if args.price_shards else None)
 
     print(f"\n📊 Итоговое количество собранных записей: {len(gas_stoves_data)}")
 
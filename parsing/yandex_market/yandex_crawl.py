@@ -0,0 +1,48 @@
+class YandexScrollBudget:
+    """Когда прекращать прокрутку выдачи Яндекс Маркета
+
+    Страница считается исчерпанной после idle_limit прокруток подряд без новых сниппетов,
+    по концу ленты или после max_scrolls прокруток. Следующая страница (&page=N)
+    открывается, только если исчерпанная страница дала хотя бы один новый товар.
+    """
+
+    def __init__(self, idle_limit=2, max_scrolls=30, max_pages=5, page=1):
+        self.idle_limit = idle_limit
+        self.max_scrolls = max_scrolls
+        self.max_pages = max_pages
+        self.page = page
+        self.idle_scrolls = 0
+        self.page_products = 0
+        self.ended = False
+
+    def record(self, new_count, ended=False):
+        """Итог одной прокрутки: сколько новых товаров она дала и кончилась ли лента"""
+        if new_count:
+            self.idle_scrolls = 0
+            self.page_products += new_count
+        else:
+            self.idle_scrolls += 1
+            print(f"💤 Прокрутка без новых сниппетов ({self.idle_scrolls}/{self.idle_limit})")
+
+        if ended:
+            print("🏁 Достигнут конец списка товаров")
+            self.ended = True
+
+    def page_exhausted(self, scroll_count):
+        return self.ended or self.idle_scrolls >= self.idle_limit or scroll_count >= self.max_scrolls
+
+    def next_page(self):
+        """Переход на следующую страницу, если текущая еще давала товары"""
+        if not self.page_products:
+            print(f"🏁 Страница {self.page} не дала новых товаров - сбор завершен")
+            return False
+        if self.page >= self.max_pages:
+            print(f"🏁 Достигнут предел в {self.max_pages} страниц выдачи")
+            return False
+
+        self.page += 1
+        self.idle_scrolls = 0
+        self.page_products = 0
+        self.ended = False
+        print(f"\n📄 Переходим на страницу {self.page}")
+        return True
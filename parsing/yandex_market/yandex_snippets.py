@@ -0,0 +1,262 @@
+import json
+import re
+
+from parsing.html_snapshot import parse_html, first_attr, node_text, outermost
+
+
+YANDEX_SNIPPET_SELECTORS = [
+    'article',
+    '[data-zone-name="snippet"]',
+    '[data-autotest-id="product-snippet"]',
+    '._2U08a',
+    '.n-snippet-cell',
+    '[data-zone-data*="snippet"]'
+]
+
+YANDEX_SNIPPET_SELECTOR = ', '.join(YANDEX_SNIPPET_SELECTORS)
+
+YANDEX_NAME_SELECTORS = [
+    'h3',
+    'a[href*="/product/"]',
+    '[data-zone-name="title"]',
+    '.n-snippet-card2__title',
+    '._3EX9a',
+    '.N9L7oc'
+]
+
+# Списки селекторов, которые проверяются после первой страницы (см. selector_health)
+YANDEX_HEALTH_FIELDS = {
+    'name': YANDEX_NAME_SELECTORS,
+    'link': ['a[href*="/product"]', 'a[href*="/card/"]']
+}
+
+YANDEX_RUBLE_PRICE_PATTERN = r'(\d{1,3}(?:\s?\d{3})*)\s*₽'
+YANDEX_PRICE_PATTERN = r'(\d{1,3}(?:\s?\d{3})*(?:\s?\d{3})*)\s*[₽рруб]'
+
+
+def extract_yandex_snippet_id(zone_data=None, url=None):
+    """Стабильный идентификатор сниппета: id из data-zone-data или из ссылки на товар"""
+    if zone_data:
+        try:
+            data = json.loads(zone_data)
+            for key in ('skuId', 'productId', 'offerId', 'id'):
+                if data.get(key):
+                    return str(data[key])
+        except (ValueError, AttributeError):
+            pass
+
+    if url:
+        sku_match = re.search(r'[?&]sku=(\d+)', url)
+        if sku_match:
+            return sku_match.group(1)
+        path_match = re.search(r'/(?:product--[^/]*|product|card/[^/]*)/(\d+)', url)
+        if path_match:
+            return path_match.group(1)
+
+    return None
+
+
+def parse_yandex_price(text):
+    """Цена из текста сниппета"""
+    if not text:
+        return None
+    # Сначала цена со знаком рубля, чтобы не принять номер модели ("3200-08 белая") за цену
+    matches = re.findall(YANDEX_RUBLE_PRICE_PATTERN, text) or re.findall(YANDEX_PRICE_PATTERN, text, re.IGNORECASE)
+    if matches:
+        price = re.sub(r'\s', '', matches[0])
+        return int(price) if price.isdigit() else None
+    return None
+
+
+def parse_yandex_snippet_name(node, text, name_keywords=(), min_name_length=10, min_line_length=20):
+    """Название из сниппета: селекторы, затем строка с ключевым словом, затем первая длинная строка"""
+    for selector in YANDEX_NAME_SELECTORS:
+        try:
+            found = node.cssselect(selector)
+            if found:
+                candidate_name = re.sub(r'\s+', ' ', found[0].text_content()).strip()
+                if candidate_name and len(candidate_name) > min_name_length:
+                    return candidate_name
+        except Exception:
+            continue
+
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    for line in lines:
+        if len(line) > min_line_length and any(word in line.lower() for word in name_keywords):
+            return line
+
+    long_lines = [line for line in lines if len(line) > min_line_length]
+    return long_lines[0] if long_lines else None
+
+
+def find_yandex_snippet_nodes(tree):
+    """Внешние узлы сниппетов по первому сработавшему селектору"""
+    nodes = []
+    for selector in YANDEX_SNIPPET_SELECTORS:
+        nodes = tree.cssselect(selector)
+        if nodes:
+            break
+    return outermost(nodes)
+
+
+def parse_yandex_snippet_node(node, name_keywords=(), min_name_length=10, min_line_length=20):
+    """Данные одного сниппета из узла lxml"""
+    text = node_text(node)
+    url = first_attr(node, ['a[href*="/product"]', 'a[href*="/card/"]', 'a[href]'], 'href')
+    if url and url.startswith('/'):
+        url = f"https://market.yandex.ru{url}"
+
+    return {
+        'snippet_id': extract_yandex_snippet_id(node.get('data-zone-data'), url),
+        'url': url,
+        'name': parse_yandex_snippet_name(node, text, name_keywords, min_name_length, min_line_length),
+        'price': parse_yandex_price(text),
+        'text': text[:1000]
+    }
+
+
+def yandex_snippet_key(snippet):
+    """Ключ сниппета: его id, а если id нет - название и цена"""
+    if snippet['snippet_id']:
+        return snippet['snippet_id']
+    return f"{(snippet['name'] or '')[:100]}_{snippet['price']}"
+
+
+def is_complete_yandex_snippet(snippet):
+    """Сниппет догружен: есть и название, и цена"""
+    return bool(snippet['name'] and snippet['price'])
+
+
+def parse_yandex_snippets_html(html, name_keywords=(), min_text_length=50, min_name_length=10, min_line_length=20,
+                               start_index=0):
+    """Разбор сниппетов из снимка page_source без обращений к браузеру"""
+    snippets = []
+    for node in find_yandex_snippet_nodes(parse_html(html))[start_index:]:
+        snippet = parse_yandex_snippet_node(node, name_keywords, min_name_length, min_line_length)
+        if len(snippet['text']) >= min_text_length:  # Пропускаем пустые или слишком короткие элементы
+            snippets.append(snippet)
+    return snippets
+
+
+def extract_yandex_snippets_snapshot(driver, progress=None, min_text_length=50, **parse_options):
+    """Извлекает сниппеты по одному снимку page_source
+
+    Возвращаются только сниппеты с названием, ценой и текстом не короче min_text_length.
+    Если передан progress (ScrollProgress) - еще и только после водяного знака и с id,
+    не встречавшимися ранее; недогруженные сниппеты не помечаются просмотренными.
+    """
+    def is_complete(snippet):
+        return is_complete_yandex_snippet(snippet) and len(snippet['text']) >= min_text_length
+
+    try:
+        tree = parse_html(driver.page_source)
+        nodes = find_yandex_snippet_nodes(tree)
+        if not nodes and tree.cssselect('a[href*="/product"], a[href*="/card/"]'):
+            print("🚨 Похоже, изменилась разметка Яндекс Маркета: ссылки на товары есть, "
+                  "но ни один селектор сниппета не совпал")
+        start_index = progress.start_index(len(nodes)) if progress else 0
+
+        snippets = [parse_yandex_snippet_node(node, **parse_options) for node in nodes[start_index:]]
+        if progress:
+            snippets = progress.accept(snippets, key=yandex_snippet_key, start_index=start_index,
+                                       is_complete=is_complete)
+        else:
+            snippets = [snippet for snippet in snippets if is_complete(snippet)]
+        print(f"📸 Разбор снимка страницы: {len(snippets)} новых сниппетов из {len(nodes)}")
+        return snippets
+    except Exception as e:
+        print(f"⚠️ Ошибка разбора снимка страницы: {e}")
+        return []
+
+
+# Сниппеты размечены атрибутами data-zone-name / data-autotest-id / data-zone-data.
+# Классы ('._2U08a', '.n-snippet-cell') и 'article' - старая разметка, только запасной вариант.
+YANDEX_SNIPPET_ATTRIBUTE_SELECTOR = ', '.join(
+    selector for selector in YANDEX_SNIPPET_SELECTORS if selector.startswith('[')
+)
+
+# Один проход по странице: внешние сниппеты и их данные (текст, название, ссылка, data-zone-data),
+# плюс счетчики для распознавания смены разметки
+YANDEX_SNIPPETS_JS = """
+var attributeSelector = arguments[0];
+var legacySelector = arguments[1];
+var nameSelectors = arguments[2];
+var minNameLength = arguments[3];
+
+var source = 'attributes';
+var nodes = document.querySelectorAll(attributeSelector);
+var selector = attributeSelector;
+if (!nodes.length) {
+    source = 'legacy';
+    nodes = document.querySelectorAll(legacySelector);
+    selector = legacySelector;
+}
+
+var elements = [];
+var payloads = [];
+for (var i = 0; i < nodes.length; i++) {
+    var node = nodes[i];
+    // Вложенные совпадения (article внутри сниппета и т.п.) пропускаем
+    if (node.parentElement && node.parentElement.closest(selector)) {
+        continue;
+    }
+
+    var name = null;
+    for (var j = 0; j < nameSelectors.length && !name; j++) {
+        var nameNode = node.querySelector(nameSelectors[j]);
+        var candidate = nameNode ? (nameNode.innerText || '').trim() : '';
+        if (candidate.length > minNameLength) {
+            name = candidate;
+        }
+    }
+    var link = node.querySelector('a[href*="/product"], a[href*="/card/"], a[href]');
+
+    elements.push(node);
+    payloads.push({
+        text: node.innerText || '',
+        name: name,
+        url: link ? link.href : null,
+        zone_data: node.getAttribute('data-zone-data')
+    });
+}
+
+return {
+    source: elements.length ? source : null,
+    elements: elements,
+    payloads: payloads,
+    product_links: document.querySelectorAll('a[href*="/product"], a[href*="/card/"]').length,
+    prices: (document.body.innerText.match(/\\d\\s?₽/g) || []).length
+};
+"""
+
+
+def find_yandex_snippets(driver, min_name_length=10):
+    """Сниппеты и их данные за один вызов JavaScript
+
+    Возвращает словарь: elements (WebElement), payloads (text, name, url, snippet_id),
+    source ('attributes', 'legacy' или None) и счетчики product_links / prices для
+    describe_yandex_layout_drift.
+    """
+    try:
+        result = driver.execute_script(YANDEX_SNIPPETS_JS, YANDEX_SNIPPET_ATTRIBUTE_SELECTOR,
+                                       YANDEX_SNIPPET_SELECTOR, YANDEX_NAME_SELECTORS, min_name_length)
+    except Exception as e:
+        print(f"⚠️ Ошибка поиска сниппетов: {e}")
+        return {'source': None, 'elements': [], 'payloads': [], 'product_links': 0, 'prices': 0}
+
+    for payload in result['payloads']:
+        payload['snippet_id'] = extract_yandex_snippet_id(payload.get('zone_data'), payload.get('url'))
+    return result
+
+
+def describe_yandex_layout_drift(discovery):
+    """Описание смены разметки или None, если сниппеты найдены по атрибутам либо страница просто пуста"""
+    if discovery['source'] == 'attributes':
+        return None
+    if discovery['source'] == 'legacy':
+        return (f"сниппеты найдены только по старым селекторам ({len(discovery['elements'])}), "
+                f"атрибуты data-zone-name/data-autotest-id не совпали")
+    if discovery['product_links'] or discovery['prices']:
+        return (f"на странице {discovery['product_links']} ссылок на товары и {discovery['prices']} цен, "
+                f"но ни один селектор сниппета не совпал")
+    return None
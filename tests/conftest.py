@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def load_recorded(name):
+    """Записанный ответ Wildberries из tests/data"""
+    with open(os.path.join(DATA_DIR, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+class WildberriesStub:
+    """Локальный сервер вместо JSON-адресов Wildberries
+
+    routes - {путь: функция(query) -> (статус, тело)}; тело-словарь отдается как JSON с типом text/plain,
+    как у настоящего API. requests - все запросы в порядке поступления: (путь, query).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                with stub.lock:
+                    stub.requests.append((parts.path, query))
+                route = stub.routes.get(parts.path)
+                status, body = route(query) if route else (404, {})
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_urls(self):
+        return {
+            'search': f"{self.base_url}/search",
+            'catalog': f"{self.base_url}/catalog/{{shard}}/catalog",
+            'detail': f"{self.base_url}/detail",
+            'menu': f"{self.base_url}/menu"
+        }
+
+    def requests_to(self, path):
+        return [query for request_path, query in self.requests if request_path == path]
+
+
+@pytest.fixture
+def wildberries_stub():
+    stub = WildberriesStub()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,52 @@
+from parsing.card_context import CardContext, refresh_card
+from parsing.wildberries_market.wildberries_cards import is_wildberries_card_loaded
+
+
+class FakeElement:
+    """Карточка, у которой цена появляется после прокрутки; считает обращения к браузеру"""
+
+    def __init__(self, text):
+        self.current_text = text
+        self.reads = 0
+
+    @property
+    def text(self):
+        self.reads += 1
+        return self.current_text
+
+
+def read_before_scroll(element):
+    card = CardContext(element)
+    card.memo('name', lambda: card.text.split('\n')[0])
+    return card
+
+
+def test_loaded_card_keeps_cache_after_scroll():
+    element = FakeElement('GEFEST / Газовая плита ПГ 3200-08\n26 790 ₽')
+    card = read_before_scroll(element)
+
+    refresh_card(card, is_loaded=is_wildberries_card_loaded)
+
+    assert card.text.endswith('26 790 ₽')
+    assert card.derived == {'name': 'GEFEST / Газовая плита ПГ 3200-08'}
+    assert element.reads == 1
+
+
+def test_card_without_price_is_read_again():
+    element = FakeElement('GEFEST / Газовая плита ПГ 3200-08')
+    card = read_before_scroll(element)
+    element.current_text += '\n26 790 ₽'
+
+    refresh_card(card, is_loaded=is_wildberries_card_loaded)
+
+    assert card.text.endswith('26 790 ₽')
+    assert card.derived == {}
+
+
+def test_remembered_name_survives_refresh():
+    card = read_before_scroll(FakeElement('Плита'))
+    card.remember('full_name', 'GEFEST / Газовая плита ПГ 3200-08')
+
+    refresh_card(card, is_loaded=is_wildberries_card_loaded)
+
+    assert card.derived == {'full_name': 'GEFEST / Газовая плита ПГ 3200-08'}
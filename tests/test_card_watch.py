@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+from parsing.card_watch import DEFAULT_SCRIPT_TIMEOUT, wait_for_new_cards
+
+
+class FakeDriver:
+    """Драйвер, который отдает заданные результаты ожидания и запоминает таймауты скриптов"""
+
+    def __init__(self, states, script_timeout=None):
+        self.states = list(states)
+        self.script_timeouts = []
+        self.installs = 0
+        if script_timeout is not None:
+            self.timeouts = SimpleNamespace(script=script_timeout)
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        state = self.states.pop(0)
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+    def execute_script(self, script, *args):
+        self.installs += 1
+        return 0
+
+
+def test_script_timeout_is_restored():
+    driver = FakeDriver([{'new': 8, 'total': 8, 'idle': False, 'ended': False}], script_timeout=3)
+
+    state = wait_for_new_cards(driver, 'article', max_wait=10)
+
+    assert state['new'] == 8
+    assert driver.script_timeouts == [15, 3]
+
+
+def test_watch_is_installed_after_navigation():
+    driver = FakeDriver([None, {'new': 2, 'total': 2, 'idle': True, 'ended': False}])
+
+    state = wait_for_new_cards(driver, 'article', max_wait=4)
+
+    assert (state['new'], driver.installs) == (2, 1)
+    assert driver.script_timeouts == [9, DEFAULT_SCRIPT_TIMEOUT]
+
+
+def test_script_timeout_is_restored_on_error():
+    driver = FakeDriver([TimeoutError('script timeout')], script_timeout=7)
+
+    with pytest.raises(TimeoutError):
+        wait_for_new_cards(driver, 'article', max_wait=10)
+
+    assert driver.script_timeouts == [15, 7]
@@ -0,0 +1,145 @@
+from parsing.checkpoint import (
+    CHECKPOINT_STATE_KEY, CheckpointWriter, append_checkpoint, clear_checkpoint, finish_checkpoint,
+    is_checkpoint_finished, iter_checkpoint, load_checkpoint, read_checkpoint, resume_checkpoint
+)
+from parsing.scroll_state import ScrollProgress
+
+
+def records(*names):
+    return [{'Название': name, 'Цена': 1000 + index} for index, name in enumerate(names)]
+
+
+def test_writer_round_trip(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+
+    with CheckpointWriter(filename, flush_every=2) as writer:
+        writer.write(records('Плита 1', 'Плита 2', 'Плита 3'))
+    with CheckpointWriter(filename) as writer:
+        writer.write(records('Плита 4'))
+
+    assert read_checkpoint(filename) == records('Плита 1', 'Плита 2', 'Плита 3') + records('Плита 4')
+    assert writer.written == 1
+
+
+def test_state_lines_are_not_records(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+
+    append_checkpoint(filename, records('Плита 1'), state={'scroll_count': 1})
+    append_checkpoint(filename, records('Плита 2'), state={'scroll_count': 2})
+
+    assert read_checkpoint(filename) == records('Плита 1') + records('Плита 2')
+    assert load_checkpoint(filename)[1]['scroll_count'] == 2
+
+
+def test_load_truncates_at_last_state_line(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    append_checkpoint(filename, records('Плита 1', 'Плита 2'), state={'scroll_count': 1})
+    # Пакет, после которого процесс упал до записи строки состояния
+    append_checkpoint(filename, records('Плита 3'))
+
+    committed, state = load_checkpoint(filename)
+
+    assert committed == records('Плита 1', 'Плита 2')
+    assert state['scroll_count'] == 1
+    # Для итоговых данных недописанный пакет не теряется
+    assert len(read_checkpoint(filename)) == 3
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    append_checkpoint(filename, records('Плита 1'), state={'scroll_count': 1})
+    with open(filename, 'a', encoding='utf-8') as f:
+        f.write('{"Название":"Плита 2","Це')
+
+    assert read_checkpoint(filename) == records('Плита 1')
+    committed, state = load_checkpoint(filename)
+    assert (committed, state['scroll_count']) == (records('Плита 1'), 1)
+
+
+def test_journal_without_state(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    append_checkpoint(filename, records('Плита 1'))
+
+    assert load_checkpoint(filename) == (records('Плита 1'), None)
+
+
+def test_missing_and_cleared_journal(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    assert read_checkpoint(filename) == []
+    assert load_checkpoint(filename) == ([], None)
+
+    append_checkpoint(filename, records('Плита 1'))
+    clear_checkpoint(filename)
+
+    assert not (tmp_path / 'journal.ndjson').exists()
+
+
+def test_resume_restores_progress_and_drops_unsaved_tail(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    progress = ScrollProgress(url='https://www.ozon.ru/search/?text=плита', job='ozon_gas_stoves_search')
+    progress.mark_seen('101')
+    progress.mark_seen('102')
+    progress.scroll_count = 3
+    append_checkpoint(filename, records('Плита 1', 'Плита 2'), progress.to_state())
+    append_checkpoint(filename, records('Плита 3'))
+
+    resumed, restored = resume_checkpoint(filename, job='ozon_gas_stoves_search')
+
+    assert resumed == records('Плита 1', 'Плита 2')
+    assert restored.seen_ids == {'101', '102'}
+    assert (restored.scroll_count, restored.url, restored.job) == (3, progress.url, 'ozon_gas_stoves_search')
+    # Недописанный хвост удален из журнала, чтобы не попасть в итоговые данные дважды
+    assert read_checkpoint(filename) == records('Плита 1', 'Плита 2')
+
+
+def test_resume_ignores_journal_of_another_job(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    append_checkpoint(filename, records('Корм 1'), ScrollProgress(job='ozon_dog_food').to_state())
+
+    assert resume_checkpoint(filename, job='ozon_gas_stoves_search') == ([], None)
+    # Без проверки задачи журнал принимается
+    assert resume_checkpoint(filename)[1].job == 'ozon_dog_food'
+
+
+def test_resume_without_state(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    append_checkpoint(filename, records('Плита 1'))
+
+    assert resume_checkpoint(filename, job='ozon_gas_stoves_search') == ([], None)
+
+
+def test_state_lines_hold_only_new_ids(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    progress = ScrollProgress(job='yandex_gas_stoves')
+    for batch in (['1', '2'], ['3'], ['4', '5']):
+        for item_id in batch:
+            progress.mark_seen(item_id)
+        append_checkpoint(filename, records(*batch), progress.to_state())
+    progress.mark_seen('6')
+    append_checkpoint(filename, records('6'))
+
+    deltas = [entry[CHECKPOINT_STATE_KEY]['seen_ids'] for entry in iter_checkpoint(filename)
+              if CHECKPOINT_STATE_KEY in entry]
+    _, state = load_checkpoint(filename)
+
+    assert deltas == [['1', '2'], ['3'], ['4', '5']]
+    # Набор восстанавливается объединением строк до последней строки состояния
+    assert state['seen_ids'] == ['1', '2', '3', '4', '5']
+    assert resume_checkpoint(filename)[1].seen_ids == {'1', '2', '3', '4', '5'}
+    # После возобновления журнал сжат до одной строки состояния с полным набором
+    assert len([entry for entry in iter_checkpoint(filename) if CHECKPOINT_STATE_KEY in entry]) == 1
+
+
+def test_finished_journal_is_not_resumed(tmp_path):
+    filename = str(tmp_path / 'journal.ndjson')
+    progress = ScrollProgress(job='yandex_dog_food')
+    progress.mark_seen('1')
+    append_checkpoint(filename, records('Корм 1'), progress.to_state())
+    assert not is_checkpoint_finished(filename)
+
+    finish_checkpoint(filename, 'yandex_dog_food')
+
+    assert is_checkpoint_finished(filename)
+    assert read_checkpoint(filename) == records('Корм 1')
+    assert resume_checkpoint(filename, job='yandex_dog_food') == ([], None)
+    assert not is_checkpoint_finished(str(tmp_path / 'missing.ndjson'))
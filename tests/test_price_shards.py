@@ -0,0 +1,42 @@
+import random
+
+from parsing.price_shards import (
+    estimate_band_results, parse_result_total, plan_price_shards, price_band_url
+)
+
+
+def test_parse_result_total_from_header_texts():
+    assert parse_result_total(['{"text":"Найдено 1 234 товара по запросу «газовая плита»"}']) == 1234
+    assert parse_result_total(['Газовые плиты', '<b>12 456</b> предложений']) == 12456
+    assert parse_result_total(['Газовые плиты']) is None
+    assert parse_result_total(None) is None
+
+
+def test_estimate_prefers_page_counter():
+    assert estimate_band_results(5000, 3, max_pages=20, page_size=36) == 5000
+
+
+def test_estimate_treats_visible_max_page_as_overflow():
+    # Пагинация показывает только соседние страницы: страница 20 из 20 - полоса может быть намного больше
+    assert estimate_band_results(None, 20, max_pages=20, page_size=36) > 20 * 36
+    assert estimate_band_results(None, 7, max_pages=20, page_size=36) == 7 * 36
+    assert estimate_band_results(None, None, max_pages=20, page_size=36) == 36
+
+
+def test_planned_bands_cover_range_and_fit_limit():
+    generator = random.Random(7)
+    prices = [min(500000, max(1000, int(generator.lognormvariate(10, 0.8)))) for _ in range(5000)]
+
+    def count_band(low, high):
+        return sum(low <= price <= high for price in prices)
+
+    shards = plan_price_shards(count_band, 1000, 500000, max_results=300)
+
+    assert sum(count for _, _, count in shards) == len(prices)
+    assert all(count <= 300 for _, _, count in shards)
+    assert all(previous[1] < current[0] for previous, current in zip(shards, shards[1:]))
+
+
+def test_price_band_url_replaces_existing_filter():
+    url = 'https://www.ozon.ru/search/?text=плита&currency_price=1.000;2.000'
+    assert price_band_url(url, 'ozon', 1000, 5000).endswith('currency_price=1000.000%3B5000.000')
@@ -0,0 +1,31 @@
+import threading
+import time
+
+from parsing import rate_control
+from parsing.rate_control import RateController, get_rate_controller
+
+
+def test_threads_share_one_controller(monkeypatch):
+    class SlowController(RateController):
+        def __init__(self, market, **settings):
+            # Медленное создание расширяет окно гонки между проверкой и вставкой
+            time.sleep(0.01)
+            super().__init__(market, **settings)
+
+    monkeypatch.setattr(rate_control, 'RateController', SlowController)
+    monkeypatch.setattr(rate_control, 'RATE_CONTROLLERS', {})
+    barrier = threading.Barrier(8)
+    controllers = []
+
+    def worker():
+        barrier.wait()
+        controllers.append(get_rate_controller('ozon'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(controller) for controller in controllers}) == 1
+    assert rate_control.RATE_CONTROLLERS == {'ozon': controllers[0]}
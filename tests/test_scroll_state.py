@@ -0,0 +1,80 @@
+from parsing.scroll_state import ScrollProgress
+
+
+def card(nm_id, price=1000):
+    return {'nm_id': nm_id, 'price': price}
+
+
+def accept(progress, cards, start_index=None):
+    return progress.accept(cards, key=lambda item: item['nm_id'], start_index=start_index,
+                           is_complete=lambda item: item['price'] is not None)
+
+
+def test_watermark_advances_over_complete_cards():
+    progress = ScrollProgress()
+
+    fresh = accept(progress, [card('1'), card('2'), card('3')])
+
+    assert [item['nm_id'] for item in fresh] == ['1', '2', '3']
+    assert progress.watermark == 3
+
+
+def test_watermark_stops_at_first_incomplete_card():
+    progress = ScrollProgress()
+
+    fresh = accept(progress, [card('1'), card('2', price=None), card('3')])
+
+    # Карточка 3 уже догружена и собрана, но водяной знак стоит перед карточкой 2
+    assert [item['nm_id'] for item in fresh] == ['1', '3']
+    assert progress.watermark == 1
+    assert not progress.is_seen('2')
+
+    fresh = accept(progress, [card('2'), card('3'), card('4')], start_index=progress.watermark)
+
+    assert [item['nm_id'] for item in fresh] == ['2', '4']
+    assert progress.watermark == 4
+
+
+def test_seen_ids_drop_repeats_across_scrolls():
+    progress = ScrollProgress()
+    accept(progress, [card('1'), card('2')])
+
+    # Лента перестроилась: те же товары снова с начала DOM
+    progress.start_index(1)
+    fresh = accept(progress, [card('2'), card('1'), card('5')], start_index=0)
+
+    assert [item['nm_id'] for item in fresh] == ['5']
+    assert progress.watermark == 3
+
+
+def test_start_index_resets_when_dom_shrinks():
+    progress = ScrollProgress(watermark=40)
+
+    assert progress.start_index(60) == 40
+    assert progress.start_index(12) == 0
+    assert progress.watermark == 0
+
+
+def test_items_without_key_are_not_deduplicated():
+    progress = ScrollProgress()
+
+    fresh = accept(progress, [card(None), card(None)])
+
+    assert len(fresh) == 2
+    assert progress.seen_ids == set()
+
+
+def test_state_round_trip_skips_watermark():
+    progress = ScrollProgress(url='https://www.wildberries.ru/catalog/0/search.aspx?search=плита',
+                              job='wildberries_gas_stoves')
+    accept(progress, [card('1'), card('2')])
+    progress.scroll_count = 4
+
+    restored = ScrollProgress.from_state(progress.to_state())
+
+    assert restored.seen_ids == {'1', '2'}
+    assert (restored.scroll_count, restored.url, restored.job) == (4, progress.url, progress.job)
+    # Порядок карточек после перезагрузки может измениться - водяной знак начинается с нуля
+    assert restored.watermark == 0
+    # Следующая строка состояния несет только новые товары
+    assert progress.to_state()['seen_ids'] == []
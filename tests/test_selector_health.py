@@ -0,0 +1,138 @@
+import pickle
+
+import pytest
+
+from parsing.driver_pool import DriverPool
+from parsing.page_crawler import PageCrawler
+from parsing.price_shards import crawl_price_shards
+from parsing.selector_health import SelectorDriftError, SelectorHealthCheck, build_selector_report
+
+
+WORKING_PROBE = {
+    'url': 'https://www.ozon.ru/search/?text=плита', 'title': 'Газовые плиты', 'cards': 24,
+    'card_hits': {"div[class*='tile-root']": 24},
+    'fields': {'title': {'hits': {'span.title': 20}, 'cards': 20}, 'price': {'hits': {'span.price': 24}, 'cards': 24}}
+}
+
+BROKEN_PROBE = {
+    'url': 'https://www.ozon.ru/search/?text=плита', 'title': 'Газовые плиты', 'cards': 0,
+    'card_hits': {"div[class*='tile-root']": 0},
+    'fields': {'title': {'hits': {'span.title': 0}, 'cards': 0}, 'price': {'hits': {'span.price': 0}, 'cards': 0}}
+}
+
+
+class FakeDriver:
+    """Драйвер, который отдает заданный результат проверки селекторов и ничего не грузит"""
+
+    def __init__(self, probe):
+        self.probe = probe
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        if 'cardSelectors' in script:
+            return self.probe
+        return None
+
+    def quit(self):
+        pass
+
+
+def make_pool(probe, size=2):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver(probe))
+        return drivers[-1]
+
+    return DriverPool(factory, size=size), drivers
+
+
+def make_health():
+    return SelectorHealthCheck('ozon', ["div[class*='tile-root']"], {'title': ['span.title'], 'price': ['span.price']})
+
+
+def test_report_lists_empty_selector_lists():
+    report = build_selector_report('ozon', BROKEN_PROBE, rows=0)
+
+    assert report['status'] == 'broken'
+    assert report['empty_lists'] == ['cards', 'title', 'price']
+    assert report['selectors']['cards'] == {"div[class*='tile-root']": 0}
+
+
+def test_degraded_layout_keeps_running():
+    # Названия нашлись в 25% плиток при ожидаемых 30% - просадка, но не поломка
+    probe = dict(WORKING_PROBE, fields={'title': {'hits': {'span.title': 6}, 'cards': 6},
+                                        'price': {'hits': {'span.price': 24}, 'cards': 24}})
+    report = build_selector_report('ozon', probe, rows=10)
+
+    assert report['status'] == 'degraded'
+    assert report['hit_rates']['title'] == 0.25
+
+
+def test_field_far_below_baseline_is_broken():
+    empty_title = dict(WORKING_PROBE, fields={'title': {'hits': {'span.title': 0}, 'cards': 0},
+                                              'price': {'hits': {'span.price': 24}, 'cards': 24}})
+    rare_price = dict(WORKING_PROBE, fields={'title': {'hits': {'span.title': 20}, 'cards': 20},
+                                             'price': {'hits': {'span.price': 5}, 'cards': 5}})
+
+    report = build_selector_report('ozon', empty_title, rows=10)
+    assert report['status'] == 'broken'
+    assert report['empty_lists'] == ['title']
+    # 21% при ожидаемых 50% - меньше половины ожидаемой доли
+    assert build_selector_report('ozon', rare_price, rows=10)['status'] == 'broken'
+
+
+def test_too_few_cards_is_broken():
+    probe = dict(WORKING_PROBE, cards=2, fields={'title': {'hits': {'span.title': 2}, 'cards': 2},
+                                                 'price': {'hits': {'span.price': 2}, 'cards': 2}})
+
+    assert build_selector_report('ozon', probe, rows=2)['status'] == 'broken'
+
+
+def test_drift_error_survives_process_boundary():
+    error = SelectorDriftError(build_selector_report('ozon', BROKEN_PROBE, rows=0))
+
+    restored = pickle.loads(pickle.dumps(error))
+
+    assert restored.report == error.report
+    assert 'ozon' in str(restored)
+
+
+def test_page_crawler_stops_on_broken_first_page():
+    pool, drivers = make_pool(BROKEN_PROBE)
+    crawler = PageCrawler(pool, 'https://www.ozon.ru/search/?text=плита', lambda driver, page: [],
+                          key=lambda item: item, max_pages=20, health=make_health())
+
+    with pytest.raises(SelectorDriftError):
+        crawler.crawl()
+
+    assert sum(len(driver.visited) for driver in drivers) == 1
+    pool.close()
+
+
+def test_page_crawler_checks_only_first_page():
+    pool, drivers = make_pool(WORKING_PROBE)
+    health = make_health()
+    crawler = PageCrawler(pool, 'https://www.ozon.ru/search/?text=плита',
+                          lambda driver, page: [f'{page}-1', f'{page}-2'] if page <= 3 else [], key=lambda item: item,
+                          max_pages=5, workers=1, health=health)
+
+    items = crawler.crawl()
+
+    assert len(items) == 6
+    assert health.report['status'] == 'ok'
+    pool.close()
+
+
+def test_price_shards_stop_before_splitting_bands():
+    pool, drivers = make_pool(BROKEN_PROBE)
+
+    with pytest.raises(SelectorDriftError):
+        crawl_price_shards(None, 'https://www.ozon.ru/search/?text=плита', 'ozon', lambda driver, page: [],
+                           key=lambda item: item, price_range=(1000, 500000), pool=pool, health=make_health())
+
+    assert sum(len(driver.visited) for driver in drivers) == 1
+    pool.close()
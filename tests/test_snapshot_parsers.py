@@ -0,0 +1,118 @@
+import os
+
+from conftest import DATA_DIR
+from parsing.html_snapshot import load_snapshot
+from parsing.ozon_market.ozon_tiles import extract_ozon_tiles_snapshot, parse_ozon_tiles_html
+from parsing.scroll_state import ScrollProgress
+from parsing.wildberries_market.wildberries_cards import (
+    extract_wildberries_cards_snapshot, parse_wildberries_cards_html
+)
+from parsing.yandex_market.yandex_snippets import extract_yandex_snippets_snapshot, parse_yandex_snippets_html
+
+
+def fixture_html(name):
+    return load_snapshot(os.path.join(DATA_DIR, name))
+
+
+class SnapshotDriver:
+    """Драйвер, который отдает заданный HTML как page_source"""
+
+    def __init__(self, html):
+        self.page_source = html
+
+
+def test_wildberries_cards_from_snapshot():
+    cards = parse_wildberries_cards_html(fixture_html('wildberries_listing.html'))
+
+    # Повтор карточки и баннер без ссылки отброшены
+    assert [card['nm_id'] for card in cards] == ['178462931', '23569341', '99887766']
+    first, second, loading = cards
+    assert first['url'] == 'https://www.wildberries.ru/catalog/178462931/detail.aspx'
+    assert first['name'] == 'GEFEST / Газовая плита ПГ 3200-08 К85'
+    assert (first['price'], first['old_price'], first['rating'], first['reviews']) == (26790, 32990, 4.8, 312)
+    # nm-id из ссылки, относительная ссылка дополнена доменом, бренд не дублируется в названии
+    assert second['url'].startswith('https://www.wildberries.ru/catalog/23569341/')
+    assert second['name'] == 'Darina / Плита газовая 1D1 GM241 014W'
+    assert (loading['price'], loading['reviews']) == (None, 0)
+
+
+def test_wildberries_snapshot_start_index():
+    cards = parse_wildberries_cards_html(fixture_html('wildberries_listing.html'), start_index=2)
+
+    assert [card['nm_id'] for card in cards] == ['99887766']
+
+
+def test_wildberries_snapshot_extractor_waits_for_price():
+    html = fixture_html('wildberries_listing.html')
+    progress = ScrollProgress()
+
+    first = extract_wildberries_cards_snapshot(SnapshotDriver(html), progress)
+    repeated = extract_wildberries_cards_snapshot(SnapshotDriver(html), progress)
+    loaded_html = html.replace('<span class="product-card__name">Плита газовая настольная</span>',
+                               '<ins class="price__lower-price">8 990 ₽</ins>')
+    loaded = extract_wildberries_cards_snapshot(SnapshotDriver(loaded_html), progress)
+
+    assert [card['nm_id'] for card in first] == ['178462931', '23569341']
+    assert repeated == []
+    assert [(card['nm_id'], card['price']) for card in loaded] == [('99887766', 8990)]
+    assert progress.watermark == 3
+
+
+def test_ozon_tiles_from_snapshot():
+    tiles = parse_ozon_tiles_html(fixture_html('ozon_search.html'))
+
+    assert [tile['sku'] for tile in tiles] == ['123456789', '987654321', '555000111']
+    first, second, loading = tiles
+    # Параметры ссылки отброшены, относительная ссылка дополнена доменом
+    assert first['url'] == 'https://www.ozon.ru/product/gazovaya-plita-gefest-3200-08-k85-123456789/'
+    assert (first['name'], first['price']) == ('Газовая плита GEFEST ПГ 3200-08 К85, белая', 24990)
+    # Платеж в рассрочку не принят за цену
+    assert second['price'] == 23880
+    assert (loading['name'], loading['price']) == ('Плита газовая Лысьва ГП 400 М2С-2у', None)
+
+
+def test_ozon_price_range_filter():
+    tiles = parse_ozon_tiles_html(fixture_html('ozon_search.html'), min_price=24000)
+
+    assert [tile['price'] for tile in tiles] == [24990, None, None]
+
+
+def test_ozon_snapshot_extractor_skips_tiles_without_price():
+    progress = ScrollProgress()
+
+    tiles = extract_ozon_tiles_snapshot(SnapshotDriver(fixture_html('ozon_search.html')), progress=progress)
+
+    assert [tile['sku'] for tile in tiles] == ['123456789', '987654321']
+    assert progress.watermark == 2
+    assert progress.seen_ids == {'123456789', '987654321'}
+
+
+def test_yandex_snippets_from_snapshot():
+    snippets = parse_yandex_snippets_html(fixture_html('yandex_search.html'))
+
+    # Сниппеты короче 50 символов (недогруженный и реклама) пропущены
+    assert [snippet['snippet_id'] for snippet in snippets] == ['101442352', '777888']
+    first, second = snippets
+    assert first['url'] == 'https://market.yandex.ru/product--gazovaya-plita-gefest-3200-08/555?sku=101442352'
+    assert (first['name'], first['price']) == ('Газовая плита GEFEST ПГ 3200-08 К85 белая', 18990)
+    # id из ссылки, если в data-zone-data его нет; цена до "от 1 500 ₽" в тексте доставки
+    assert (second['name'], second['price']) == ('Плита газовая Darina 1D1 GM241 014W', 14350)
+
+
+def test_yandex_snapshot_extractor_returns_complete_snippets():
+    snippets = extract_yandex_snippets_snapshot(SnapshotDriver(fixture_html('yandex_search.html')))
+
+    assert [snippet['snippet_id'] for snippet in snippets] == ['101442352', '777888']
+
+
+def test_yandex_short_snippet_is_collected_once_loaded():
+    html = fixture_html('yandex_search.html')
+    short_html = html.replace('<span>Рейтинг 4.8 · 312 отзывов · доставка завтра</span>', '')
+    progress = ScrollProgress()
+
+    first = extract_yandex_snippets_snapshot(SnapshotDriver(short_html), progress=progress, min_text_length=70)
+    loaded = extract_yandex_snippets_snapshot(SnapshotDriver(html), progress=progress, min_text_length=70)
+
+    # Короткий (еще грузящийся) сниппет не помечается просмотренным и собирается после догрузки
+    assert [snippet['snippet_id'] for snippet in first] == ['777888']
+    assert [snippet['snippet_id'] for snippet in loaded] == ['101442352']
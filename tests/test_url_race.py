@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from parsing.url_race import race_urls
+
+
+class FakeTabsDriver:
+    """Драйвер с вкладками: адрес каждой вкладки, заблокированные ресурсы и готовые карточки по адресу"""
+
+    def __init__(self, ready):
+        self.ready = ready
+        self.tabs = {'home': {'url': 'about:blank', 'blocked': None}}
+        self.current = 'home'
+        self.loads = []
+        self.switch_to = SimpleNamespace(window=self.switch)
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    @property
+    def current_window_handle(self):
+        return self.current
+
+    def switch(self, handle):
+        self.current = handle
+
+    def close(self):
+        del self.tabs[self.current]
+
+    def navigate(self, handle, url):
+        tab = self.tabs[handle]
+        tab['url'] = url
+        if url != 'about:blank':
+            # Запоминаем, с какой блокировкой вкладка начала грузить страницу
+            self.loads.append((url, tab['blocked']))
+
+    def execute_script(self, script, *args):
+        if 'window.open' in script:
+            handle = f'tab{len(self.tabs)}'
+            self.tabs[handle] = {'url': None, 'blocked': None}
+            self.navigate(handle, args[0])
+        elif 'querySelectorAll' in script:
+            url = self.tabs[self.current]['url']
+            return {'cards': self.ready.get(url, 0), 'title': 'Газовые плиты', 'url': url}
+        elif 'location.href' in script:
+            self.navigate(self.current, args[0])
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.setBlockedURLs':
+            self.tabs[self.current]['blocked'] = params['urls']
+
+
+def test_policy_is_applied_before_each_tab_loads():
+    driver = FakeTabsDriver({'https://backup': 12})
+
+    winner = race_urls(driver, ['https://main', 'https://backup'], 'article', timeout=1, poll_interval=0.01,
+                       resource_policy='wildberries')
+
+    assert winner == 'https://backup'
+    assert [url for url, _ in driver.loads] == ['https://main', 'https://backup']
+    assert all(blocked and '*.jpg' in blocked for _, blocked in driver.loads)
+    # Остались только вкладка победителя, драйвер на ней
+    assert driver.window_handles == [driver.current_window_handle]
+    assert driver.tabs[driver.current]['url'] == 'https://backup'
+
+
+def test_without_policy_tabs_open_url_directly():
+    driver = FakeTabsDriver({'https://main': 3, 'https://backup': 3})
+
+    winner = race_urls(driver, ['https://main', 'https://backup'], 'article', timeout=1, poll_interval=0.01)
+
+    assert winner == 'https://main'
+    assert driver.loads == [('https://main', None), ('https://backup', None)]
+
+
+def test_no_winner_returns_to_home_tab():
+    driver = FakeTabsDriver({})
+
+    assert race_urls(driver, ['https://main'], 'article', timeout=0.05, poll_interval=0.01) is None
+    assert driver.window_handles == ['home'] and driver.current_window_handle == 'home'
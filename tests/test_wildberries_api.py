@@ -0,0 +1,137 @@
+import asyncio
+import copy
+
+from conftest import load_recorded
+from parsing.wildberries_market.wildberries_api import WildberriesApiClient
+from parsing.wildberries_market.wildberries_catalog import normalize_wildberries_catalog_product
+
+
+CARD_KEYS = {'nm_id', 'url', 'title', 'brand', 'name', 'price', 'old_price', 'rating', 'reviews', 'text'}
+
+
+def recorded_page(page):
+    """Записанная страница выдачи с артикулами, уникальными для номера страницы"""
+    data = copy.deepcopy(load_recorded('wildberries_catalog_page.json'))
+    for product in data['data']['products']:
+        product['id'] += page * 1000
+    return data
+
+
+def empty_page():
+    return {'state': 0, 'data': {'products': []}}
+
+
+def listing_route(last_page):
+    def route(query):
+        page = int(query['page'])
+        return 200, recorded_page(page) if page <= last_page else empty_page()
+    return route
+
+
+def run_client(stub, method, *args, **client_options):
+    async def run():
+        async with WildberriesApiClient(api_urls=stub.api_urls, retry_delay=0, **client_options) as client:
+            return await getattr(client, method)(*args), client
+    return asyncio.run(run())
+
+
+def test_normalize_catalog_product_schema():
+    products = load_recorded('wildberries_catalog_page.json')['data']['products']
+    new_format, old_format = [normalize_wildberries_catalog_product(product) for product in products]
+
+    assert set(new_format) == CARD_KEYS
+    assert new_format == {
+        'nm_id': '178462931',
+        'url': 'https://www.wildberries.ru/catalog/178462931/detail.aspx',
+        'title': 'Газовая плита ПГ 3200-08 К85',
+        'brand': 'GEFEST',
+        'name': 'GEFEST / Газовая плита ПГ 3200-08 К85',
+        'price': 26790,
+        'old_price': 32990,
+        'rating': 4.8,
+        'reviews': 312,
+        'text': ''
+    }
+    # Старый формат: цены в salePriceU/priceU, отзывы в nmFeedbacks
+    assert (old_format['price'], old_format['old_price'], old_format['reviews']) == (15490, 18990, 57)
+    assert old_format['name'] == 'Darina / Плита газовая 1D1 GM241 014W'
+
+
+def test_search_pages_until_first_empty_page(wildberries_stub):
+    wildberries_stub.routes['/search'] = listing_route(last_page=3)
+
+    cards, client = run_client(wildberries_stub, 'search', 'газовая плита', 10, concurrency=2)
+
+    assert len(cards) == 6
+    assert len({card['nm_id'] for card in cards}) == 6
+    requested = wildberries_stub.requests_to('/search')
+    assert sorted(int(query['page']) for query in requested) == [1, 2, 3, 4]
+    assert all(query['query'] == 'газовая плита' and query['resultset'] == 'catalog' for query in requested)
+    assert client.failed_pages == []
+
+
+def test_search_respects_max_pages(wildberries_stub):
+    wildberries_stub.routes['/search'] = listing_route(last_page=50)
+
+    cards, _ = run_client(wildberries_stub, 'search', 'газовая плита', 3)
+
+    assert len(cards) == 6
+    assert sorted(int(query['page']) for query in wildberries_stub.requests_to('/search')) == [1, 2, 3]
+
+
+def test_category_resolves_menu_node_and_pages(wildberries_stub):
+    menu = [{'id': 1, 'url': '/catalog/bitovaya-tehnika', 'childs': [
+        {'id': 2, 'url': '/catalog/bitovaya-tehnika/kuhnya/plity/plity-gazovye',
+         'shard': 'appliances2', 'query': 'cat=130495&subject=1523'}
+    ]}]
+    wildberries_stub.routes['/menu'] = lambda query: (200, menu)
+    wildberries_stub.routes['/catalog/appliances2/catalog'] = listing_route(last_page=2)
+
+    cards, _ = run_client(wildberries_stub, 'category', '/catalog/bitovaya-tehnika/kuhnya/plity/plity-gazovye', 10)
+
+    assert len(cards) == 4
+    requested = wildberries_stub.requests_to('/catalog/appliances2/catalog')
+    assert {(query['cat'], query['subject']) for query in requested} == {('130495', '1523')}
+    assert sorted(int(query['page']) for query in requested) == [1, 2, 3, 4]
+
+
+def test_category_missing_from_menu(wildberries_stub):
+    wildberries_stub.routes['/menu'] = lambda query: (200, [])
+
+    cards, _ = run_client(wildberries_stub, 'category', '/catalog/unknown', 10)
+
+    assert cards == []
+
+
+def test_retries_on_429_and_5xx(wildberries_stub):
+    statuses = {1: [429, 503]}
+
+    def route(query):
+        page = int(query['page'])
+        if statuses.get(page):
+            return statuses[page].pop(0), {}
+        return 200, recorded_page(page) if page == 1 else empty_page()
+
+    wildberries_stub.routes['/search'] = route
+
+    cards, client = run_client(wildberries_stub, 'search', 'газовая плита', 10, concurrency=1)
+
+    assert len(cards) == 2
+    assert [int(query['page']) for query in wildberries_stub.requests_to('/search')] == [1, 1, 1, 2]
+    assert client.failed_pages == []
+
+
+def test_failed_page_is_reported_and_does_not_end_listing(wildberries_stub):
+    def route(query):
+        page = int(query['page'])
+        if page == 2:
+            return 500, {}
+        return 200, recorded_page(page) if page <= 3 else empty_page()
+
+    wildberries_stub.routes['/search'] = route
+
+    cards, client = run_client(wildberries_stub, 'search', 'газовая плита', 10, concurrency=1, retries=2)
+
+    assert len(cards) == 4
+    assert client.failed_pages == [(wildberries_stub.api_urls['search'], 2)]
+    assert [int(query['page']) for query in wildberries_stub.requests_to('/search')] == [1, 2, 2, 3, 4]
@@ -0,0 +1,73 @@
+import asyncio
+
+from parsing.wildberries_market.wildberries_api import (
+    WildberriesApiClient, enrich_wildberries_cards, fetch_wildberries_card_details
+)
+
+
+def detail_product(nm_id):
+    return {'id': int(nm_id), 'brand': 'GEFEST', 'name': f'Газовая плита ПГ {nm_id}', 'reviewRating': 4.5,
+            'feedbacks': 3, 'sizes': [{'price': {'basic': 2500000, 'product': 2100000}}]}
+
+
+def detail_route(query):
+    return 200, {'data': {'products': [detail_product(nm_id) for nm_id in query['nm'].split(';')]}}
+
+
+def test_details_are_requested_in_batches_of_100(wildberries_stub):
+    wildberries_stub.routes['/detail'] = detail_route
+    nm_ids = [str(100000 + index) for index in range(250)]
+
+    cards = fetch_wildberries_card_details(nm_ids + nm_ids[:10], api_urls=wildberries_stub.api_urls)
+
+    batches = [query['nm'].split(';') for query in wildberries_stub.requests_to('/detail')]
+    assert sorted(len(batch) for batch in batches) == [50, 100, 100]
+    assert sorted(nm_id for batch in batches for nm_id in batch) == sorted(nm_ids)
+    assert set(cards) == set(nm_ids)
+    assert cards['100007']['name'] == 'GEFEST / Газовая плита ПГ 100007'
+    assert cards['100007']['price'] == 21000
+
+
+def test_details_retry_on_5xx(wildberries_stub):
+    statuses = [502, 429]
+
+    def route(query):
+        if statuses:
+            return statuses.pop(0), {}
+        return detail_route(query)
+
+    wildberries_stub.routes['/detail'] = route
+
+    async def run():
+        async with WildberriesApiClient(api_urls=wildberries_stub.api_urls, retry_delay=0) as client:
+            return await client.details(['42', '43'])
+
+    cards = asyncio.run(run())
+
+    assert set(cards) == {'42', '43'}
+    assert len(wildberries_stub.requests_to('/detail')) == 3
+
+
+def test_enrich_fills_only_cards_without_brand_or_title(wildberries_stub):
+    wildberries_stub.routes['/detail'] = detail_route
+    cards = [
+        {'nm_id': '501', 'brand': None, 'title': 'Газовая плита ПГ 501', 'name': 'Газовая плита ПГ 501'},
+        {'nm_id': '502', 'brand': 'Darina', 'title': 'Плита 502', 'name': 'Darina / Плита 502'},
+        {'nm_id': '503', 'brand': None, 'title': None, 'name': None},
+        {'nm_id': None, 'brand': None, 'title': None, 'name': None}
+    ]
+
+    enrich_wildberries_cards(cards, api_urls=wildberries_stub.api_urls)
+
+    assert [query['nm'] for query in wildberries_stub.requests_to('/detail')] == ['501;503']
+    assert [card['name'] for card in cards] == [
+        'GEFEST / Газовая плита ПГ 501', 'Darina / Плита 502', 'GEFEST / Газовая плита ПГ 503', None
+    ]
+
+
+def test_enrich_skips_api_when_cards_are_complete(wildberries_stub):
+    cards = [{'nm_id': '1', 'brand': 'Darina', 'title': 'Плита', 'name': 'Darina / Плита'}]
+
+    enrich_wildberries_cards(cards, api_urls=wildberries_stub.api_urls)
+
+    assert wildberries_stub.requests == []